@@ -0,0 +1,18 @@
+from django.contrib import admin
+from . import models
+
+
+class AlertRuleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'expiring_within', 'kanban', 'location_site', 'active')
+    list_filter = ('kind', 'active')
+    search_fields = ('name',)
+
+
+class AlertAdmin(admin.ModelAdmin):
+    list_display = ('rule', 'inventory', 'first_seen_at', 'last_seen_at', 'resolved_at')
+    list_filter = ('rule', 'resolved_at')
+    list_select_related = ('rule', 'inventory__item', 'inventory__location__om')
+
+
+admin.site.register(models.AlertRule, AlertRuleAdmin)
+admin.site.register(models.Alert, AlertAdmin)
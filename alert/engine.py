@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from inventory.models import Inventory
+from reports.cache import bump_generation
+from .models import Alert, AlertRule
+
+
+# Limite de ids por cláusula IN (compatível com SQLite e PostgreSQL)
+BATCH_SIZE = 500
+
+
+# Indicador de Inventory lido por cada tipo de regra; cada um tem índice parcial
+KIND_FLAGS = {
+    "BELOW_MINIMUM": Q(below_minimum=True),
+    "EXPIRED": Q(expired=True),
+    "EXPIRING_SOON": Q(expiring_soon__isnull=False),
+}
+
+
+def _flagged_inventory(rules):
+    """Linhas com algum indicador usado pelas regras, em uma consulta."""
+    condition = Q(pk__in=[])
+    for kind in {rule.kind for rule in rules} & KIND_FLAGS.keys():
+        condition |= KIND_FLAGS[kind]
+    return Inventory.objects.filter(condition).order_by().values(
+        'id', 'kanban', 'below_minimum', 'expired', 'expiring_soon', 'location__om_id',
+    )
+
+
+def evaluate_rules(now=None):
+    """
+    Avalia todas as regras ativas.
+
+    Os indicadores de situação do estoque são recalculados antes, para que
+    vencidos e vence em breve reflitam a data de hoje mesmo que o comando
+    refresh_inventory_status não tenha rodado. Depois, em uma única passagem, as
+    linhas sinalizadas são lidas com uma consulta e comparadas em memória com
+    todas as regras (AlertRule.matches). O número de consultas não depende da
+    quantidade de regras nem de linhas: uma para as regras, uma para o estoque
+    sinalizado, uma para os alertas abertos e gravações em lote para criar,
+    atualizar e resolver alertas.
+    """
+    now = now or timezone.now()
+
+    if Inventory.objects.refresh_status_flags(today=timezone.localdate(now)):
+        # Atualizações em lote não disparam signals: invalida o dashboard manualmente
+        bump_generation('inventory.inventory')
+
+    rules = list(AlertRule.objects.filter(active=True))
+
+    matches = set()
+    if rules:
+        for row in _flagged_inventory(rules).iterator(chunk_size=2000):
+            matches.update((rule.id, row['id']) for rule in rules if rule.matches(row))
+
+    open_alerts = {
+        (rule_id, inventory_id): alert_id
+        for alert_id, rule_id, inventory_id in Alert.objects.filter(
+            resolved_at__isnull=True
+        ).values_list('id', 'rule_id', 'inventory_id')
+    }
+
+    new_keys = matches - open_alerts.keys()
+    resolved_ids = [alert_id for key, alert_id in open_alerts.items() if key not in matches]
+
+    with transaction.atomic():
+        for start in range(0, len(resolved_ids), BATCH_SIZE):
+            Alert.objects.filter(id__in=resolved_ids[start:start + BATCH_SIZE]).update(resolved_at=now)
+
+        Alert.objects.filter(resolved_at__isnull=True).update(last_seen_at=now)
+
+        Alert.objects.bulk_create(
+            [Alert(rule_id=rule_id, inventory_id=inventory_id, last_seen_at=now) for rule_id, inventory_id in new_keys],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+    return {
+        'rules': len(rules),
+        'created': len(new_keys),
+        'resolved': len(resolved_ids),
+        'open': len(matches),
+    }
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from alert.engine import evaluate_rules
+
+
+class Command(BaseCommand):
+    help = "Avalia as regras de alerta de estoque (mínimo e validade) em uma única passagem"
+
+    def handle(self, *args, **options):
+        summary = evaluate_rules()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{'='*60}\n"
+                f"AVALIAÇÃO DE ALERTAS FINALIZADA\n"
+                f"{'='*60}\n"
+                f"📏 Regras ativas: {summary['rules']}\n"
+                f"🔔 Alertas novos: {summary['created']}\n"
+                f"✅ Alertas resolvidos: {summary['resolved']}\n"
+                f"📋 Alertas abertos: {summary['open']}\n"
+                f"{'='*60}"
+            )
+        )
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0008_inventory_status_flags'),
+        ('location', '0007_alter_locationsite_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Nome')),
+                ('kind', models.CharField(choices=[('BELOW_MINIMUM', 'Abaixo do mínimo'), ('EXPIRED', 'Vencido'), ('EXPIRING_SOON', 'Vence em breve')], max_length=20, verbose_name='Tipo')),
+                ('expiring_within', models.CharField(blank=True, choices=[('30', '30'), ('60', '60'), ('90', '90')], max_length=2, null=True, verbose_name='Vence em até (dias)')),
+                ('kanban', models.CharField(blank=True, choices=[('ENGINE', 'Motor'), ('CELL', 'Célula'), ('NOT', 'Não')], max_length=10, null=True, verbose_name='Kanban')),
+                ('active', models.BooleanField(default=True, verbose_name='Ativa')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alert_rules_created', to=settings.AUTH_USER_MODEL)),
+                ('location_site', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='alert_rules', to='location.locationsite')),
+            ],
+            options={
+                'verbose_name': 'Regra de Alerta',
+                'verbose_name_plural': 'Regras de Alerta',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_seen_at', models.DateTimeField(auto_now_add=True, verbose_name='Detectado em')),
+                ('last_seen_at', models.DateTimeField(verbose_name='Última verificação')),
+                ('resolved_at', models.DateTimeField(blank=True, null=True, verbose_name='Resolvido em')),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='inventory.inventory')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='alert.alertrule')),
+            ],
+            options={
+                'verbose_name': 'Alerta',
+                'verbose_name_plural': 'Alertas',
+                'ordering': ['-first_seen_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('rule', 'inventory'), name='unique_open_alert')],
+            },
+        ),
+    ]
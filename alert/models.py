@@ -0,0 +1,77 @@
+from django.db import models
+from django.contrib.auth.models import User
+from inventory.models import Inventory
+from location.models import LocationSite
+
+
+class AlertRule(models.Model):
+    KIND_CHOICES = [
+        ("BELOW_MINIMUM", "Abaixo do mínimo"),
+        ("EXPIRED", "Vencido"),
+        ("EXPIRING_SOON", "Vence em breve"),
+    ]
+
+    name = models.CharField("Nome", max_length=255)
+    kind = models.CharField("Tipo", max_length=20, choices=KIND_CHOICES)
+    expiring_within = models.CharField(
+        "Vence em até (dias)", max_length=2, choices=[(bucket, bucket) for bucket, _ in Inventory.EXPIRING_SOON_CHOICES],
+        null=True, blank=True,
+    )
+    kanban = models.CharField("Kanban", max_length=10, choices=Inventory.KANBAN_CHOICES, null=True, blank=True)
+    location_site = models.ForeignKey(
+        LocationSite, on_delete=models.PROTECT, null=True, blank=True, related_name='alert_rules'
+    )
+    active = models.BooleanField("Ativa", default=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='alert_rules_created')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Regra de Alerta"
+        verbose_name_plural = "Regras de Alerta"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def matches(self, row):
+        """
+        Verifica se uma linha de estoque (dict com os indicadores de situação,
+        o kanban e a OM da localização em `location__om_id`) atende à regra.
+        """
+        if self.kanban and row['kanban'] != self.kanban:
+            return False
+        if self.location_site_id and row['location__om_id'] != self.location_site_id:
+            return False
+
+        if self.kind == "BELOW_MINIMUM":
+            return row['below_minimum']
+        if self.kind == "EXPIRED":
+            return row['expired']
+        if self.kind == "EXPIRING_SOON":
+            bucket = row['expiring_soon']
+            return bucket is not None and int(bucket) <= int(self.expiring_within or 90)
+        return False
+
+
+class Alert(models.Model):
+    rule = models.ForeignKey(AlertRule, on_delete=models.CASCADE, related_name='alerts')
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name='alerts')
+    first_seen_at = models.DateTimeField("Detectado em", auto_now_add=True)
+    last_seen_at = models.DateTimeField("Última verificação")
+    resolved_at = models.DateTimeField("Resolvido em", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Alerta"
+        verbose_name_plural = "Alertas"
+        ordering = ['-first_seen_at']
+        constraints = [
+            # Um único alerta aberto por regra e item de estoque
+            models.UniqueConstraint(
+                fields=['rule', 'inventory'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='unique_open_alert',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.rule} - {self.inventory}"
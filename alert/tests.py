@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from inventory.models import Inventory
+from item.models import Item
+from location.models import Location, LocationSite
+from .engine import evaluate_rules
+from .models import Alert, AlertRule
+
+
+class EvaluateRulesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        cls.other_site = LocationSite.objects.create(location_site='2bavex', location_sub_site='spu', type='internal')
+        cls.location = Location.objects.create(om=cls.site, section='S1', shelf=1)
+        cls.other_location = Location.objects.create(om=cls.other_site, section='S2', shelf=1)
+        cls.item = Item.objects.create(mpn='ALERT-1', name='Item 1')
+
+    def inventory(self, **kwargs):
+        kwargs.setdefault('item', self.item)
+        kwargs.setdefault('location', self.location)
+        kwargs.setdefault('kanban', 'NOT')
+        return Inventory.objects.create(**kwargs)
+
+    def open_alerts(self, rule):
+        return set(Alert.objects.filter(rule=rule, resolved_at__isnull=True).values_list('inventory_id', flat=True))
+
+    def test_below_minimum_with_kanban_and_site(self):
+        rule = AlertRule.objects.create(name='Mínimo', kind='BELOW_MINIMUM', kanban='ENGINE', location_site=self.site)
+        match = self.inventory(quantity=1, minimum_quantity=2, kanban='ENGINE')
+        self.inventory(quantity=1, minimum_quantity=2, kanban='CELL')
+        self.inventory(quantity=1, minimum_quantity=2, kanban='ENGINE', location=self.other_location)
+        self.inventory(quantity=5, minimum_quantity=2, kanban='ENGINE')
+
+        summary = evaluate_rules()
+
+        self.assertEqual(self.open_alerts(rule), {match.pk})
+        self.assertEqual(summary['created'], 1)
+
+    def test_expiring_soon_respects_window(self):
+        rule = AlertRule.objects.create(name='Vence', kind='EXPIRING_SOON', expiring_within='60')
+        now = timezone.now()
+        soon = self.inventory(expiration_date=now + timedelta(days=10))
+        later = self.inventory(expiration_date=now + timedelta(days=45))
+        self.inventory(expiration_date=now + timedelta(days=80))
+
+        evaluate_rules()
+
+        self.assertEqual(self.open_alerts(rule), {soon.pk, later.pk})
+
+    def test_refreshes_date_dependent_flags_first(self):
+        rule = AlertRule.objects.create(name='Vencidos', kind='EXPIRED')
+        inventory = self.inventory(expiration_date=timezone.now() + timedelta(days=2))
+        self.assertFalse(inventory.expired)
+
+        # Sem rodar refresh_inventory_status: a avaliação recalcula os indicadores
+        evaluate_rules(now=timezone.now() + timedelta(days=5))
+
+        self.assertEqual(self.open_alerts(rule), {inventory.pk})
+        inventory.refresh_from_db()
+        self.assertTrue(inventory.expired)
+
+    def test_resolves_alerts_that_no_longer_match(self):
+        rule = AlertRule.objects.create(name='Mínimo', kind='BELOW_MINIMUM')
+        inventory = self.inventory(quantity=1, minimum_quantity=2)
+        evaluate_rules()
+
+        inventory.quantity = 10
+        inventory.save()
+        summary = evaluate_rules()
+
+        self.assertEqual(summary['resolved'], 1)
+        self.assertEqual(self.open_alerts(rule), set())
+
+    def test_query_count_does_not_depend_on_rules(self):
+        self.inventory(quantity=1, minimum_quantity=2)
+        self.inventory(expiration_date=timezone.now() + timedelta(days=10))
+
+        def queries(rule_count):
+            for index in range(rule_count):
+                kind = ('BELOW_MINIMUM', 'EXPIRED', 'EXPIRING_SOON')[index % 3]
+                AlertRule.objects.create(name=f'{kind} {index}', kind=kind, location_site=self.site)
+            evaluate_rules()
+            with CaptureQueriesContext(connection) as captured:
+                evaluate_rules()
+            return len(captured)
+
+        # Indicadores (8 UPDATEs), regras, estoque sinalizado, alertas
+        # abertos e a gravação em lote (savepoint, UPDATE de last_seen_at, release)
+        self.assertEqual(queries(3), 14)
+        self.assertEqual(queries(30), 14)
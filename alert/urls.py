@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('alert/digest/', views.AlertDigestView.as_view(), name='alert_digest'),
+]
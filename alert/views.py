@@ -0,0 +1,42 @@
+from django.views.generic import ListView
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.db.models import Count, Max
+from . import models
+
+
+class AlertDigestView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+    """Resumo dos alertas abertos, agrupados por regra."""
+    model = models.Alert
+    template_name = 'alert_digest.html'
+    context_object_name = 'alerts'
+    paginate_by = 25
+    permission_required = 'alert.view_alert'
+
+    def get_queryset(self):
+        queryset = models.Alert.objects.filter(resolved_at__isnull=True).select_related(
+            'rule',
+            'inventory__item',
+            'inventory__location__om',
+        ).order_by('rule__name', '-first_seen_at')
+
+        rule = self.request.GET.get('rule', '').strip()
+        if rule.isdigit():
+            queryset = queryset.filter(rule_id=rule)
+
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # Uma consulta agrupada para o resumo por regra
+        context['rules_summary'] = models.Alert.objects.filter(
+            resolved_at__isnull=True
+        ).order_by().values(
+            'rule_id', 'rule__name', 'rule__kind'
+        ).annotate(
+            total=Count('id'),
+            last_seen=Max('last_seen_at'),
+        ).order_by('rule__name')
+
+        context['active_rule'] = self.request.GET.get('rule', '')
+        return context
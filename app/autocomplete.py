@@ -0,0 +1,98 @@
+"""
+Autocomplete (busca enquanto digita) para campos de chave estrangeira.
+
+`AutocompleteSelect` renderiza apenas a opção selecionada e deixa o Select2
+buscar as demais em um endpoint JSON (`AutocompleteView`), em vez de
+serializar a tabela inteira no HTML. A validação continua sendo feita pelo
+ModelChoiceField do formulário, sobre o queryset completo.
+"""
+from django import forms
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views import View
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select com Select2 via AJAX. `url_name` é a rota do endpoint de busca e
+    `select_related` evita consultas extras ao montar o rótulo da opção
+    selecionada.
+    """
+
+    def __init__(self, url_name, attrs=None, select_related=(), minimum_input_length=0):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.select_related = select_related
+        self.minimum_input_length = minimum_input_length
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse(self.url_name)
+        attrs['data-minimum-input-length'] = self.minimum_input_length
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        # Só a opção vazia e as selecionadas; as demais vêm do endpoint
+        selected = {str(v) for v in value if v not in (None, '')}
+        options = []
+
+        field = getattr(self.choices, 'field', None)
+        if field is not None and field.empty_label is not None:
+            options.append(self.create_option(name, '', field.empty_label, not selected, 0))
+
+        if selected and field is not None:
+            queryset = self.choices.queryset.select_related(*self.select_related)
+            try:
+                objects = list(queryset.filter(pk__in=selected))
+            except (ValueError, TypeError):
+                objects = []
+            for obj in objects:
+                options.append(self.create_option(
+                    name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options)
+                ))
+
+        return [(None, options, 0)] if options else []
+
+
+class AutocompleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Endpoint JSON no formato do Select2: {"results": [{"id", "text"}],
+    "pagination": {"more"}}. Parâmetros GET: q (texto), page e limit.
+
+    `permission_required` basta ter uma das permissões: a busca é usada por
+    formulários de outras aplicações (entradas, pedidos).
+    """
+    limit = DEFAULT_LIMIT
+
+    def has_permission(self):
+        return any(self.request.user.has_perm(perm) for perm in self.get_permission_required())
+
+    def get_queryset(self, term):
+        raise NotImplementedError
+
+    def label(self, obj):
+        return str(obj)
+
+    def _int_param(self, name, default, maximum):
+        try:
+            value = int(self.request.GET.get(name, default))
+        except ValueError:
+            return default
+        return min(max(value, 1), maximum)
+
+    def get(self, request):
+        term = request.GET.get('q', '').strip()
+        limit = self._int_param('limit', self.limit, MAX_LIMIT)
+        page = self._int_param('page', 1, 1000)
+        offset = (page - 1) * limit
+
+        rows = list(self.get_queryset(term)[offset:offset + limit + 1])
+        return JsonResponse({
+            'results': [{'id': obj.pk, 'text': self.label(obj)} for obj in rows[:limit]],
+            'pagination': {'more': len(rows) > limit},
+        })
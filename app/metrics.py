@@ -1,108 +1,211 @@
 from inventory.models import Inventory
 from order.models import Order
-from outflow.models import Outflow
-from inflow.models import Inflow
-from order.models import Order
-from datetime import date
+from reports.models import DailyMovement
 from datetime import timedelta
-from django.db.models import F, Sum
-from django.utils import timezone
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
 
 
+# Quantidade de dias exibidos por padrão nos gráficos de entrada e saída
+CHART_DAYS = 7
 
+# Granularidades aceitas pelos gráficos: função de truncamento no banco e
+# formato do rótulo de cada período
+CHART_GRANULARITIES = {
+    'day': (TruncDay, '%d/%m'),
+    'week': (TruncWeek, 'S%V/%G'),
+    'month': (TruncMonth, '%m/%Y'),
+}
 
-def get_inventory_metrics():
-    total_itens = Inventory.objects.all().count()
+OPEN_STATUS = ['OPEN', 'OPEN2']
 
-    itens_expirated = Inventory.objects.filter(expiration_date__lt=date.today()).count()
 
+def _sum_quantity(condition):
+    return Coalesce(Sum('quantity', filter=condition), 0)
 
-    itens_minimum = Inventory.objects.filter(quantity__lte=F('minimum_quantity')).count()
 
+def _movement_aggregates(date=None):
+    """
+    Calcula, em uma única consulta sobre o consolidado diário, o total de
+    entradas e saídas e, se informado, o total do mês selecionado.
+    """
+    aggregates = {}
 
-    inventory_metrics = {
-        'total_itens': total_itens,
-        'itens_expirated': itens_expirated,
-        'itens_minimum': itens_minimum,
-    }
+    for direction, prefix in ((DailyMovement.INFLOW, 'in'), (DailyMovement.OUTFLOW, 'out')):
+        is_direction = Q(direction=direction)
+        aggregates[f'{prefix}_total'] = _sum_quantity(is_direction)
 
-    return inventory_metrics
+        if date:
+            first_day = date.replace(day=1)
+            aggregates[f'{prefix}_month'] = _sum_quantity(
+                is_direction & Q(day__gte=first_day, day__lt=_next_period(first_day, 'month'))
+            )
 
+    return DailyMovement.objects.aggregate(**aggregates)
 
-def get_order_metrics():
-    total_orders = Order.objects.all().count()
 
-    open_orders = Order.objects.filter(status__in=['OPEN', 'OPEN2']).count()
+def _period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
 
-    order_metrics = {
-        'total_orders': total_orders,
-        'open_orders': open_orders,
-    }
-    
-    return order_metrics
 
+def _next_period(period, granularity):
+    if granularity == 'week':
+        return period + timedelta(days=7)
+    if granularity == 'month':
+        return (period + timedelta(days=32)).replace(day=1)
+    return period + timedelta(days=1)
 
-def get_inflow_outflow_metrics(date):
 
-    if date:
-        year = date.year
-        month = date.month
-        total_outflows = sum(outflow.quantity for outflow in Outflow.objects.filter(created_at__year=year,created_at__month=month))
-        total_inflows = sum(inflow.quantity for inflow in Inflow.objects.filter(created_at__year=year,created_at__month=month))
-    else:
-        total_outflows = sum(outflow.quantity for outflow in Outflow.objects.all())
-        total_inflows = sum(inflow.quantity for inflow in Inflow.objects.all())
-
-    inflow_outflow_metrics = {
-        'total_outflows': total_outflows,
-        'total_inflows': total_inflows,
-    }
+def _periods(start, end, granularity):
+    period = _period_start(start, granularity)
+    periods = []
+    while period <= end:
+        periods.append(period)
+        period = _next_period(period, granularity)
+    return periods
+
+
+def _movement_filters(item=None, kanban=None, site=None):
+    filters = Q()
+
+    if item:
+        filters &= Q(item_id=item)
+
+    if kanban:
+        filters &= Q(item_id__in=Inventory.objects.filter(kanban=kanban).values('item_id'))
+
+    if site:
+        # Saídas são consolidadas pela OM solicitante. Entradas não registram
+        # destino (Inflow não tem localização), então contam para toda OM que
+        # estoca o item: uma mesma entrada aparece em cada uma dessas OMs, e
+        # a soma das séries por OM pode passar do total geral
+        stocked_items = Inventory.objects.filter(location__om_id=site).values('item_id')
+        outflows = Q(direction=DailyMovement.OUTFLOW, location_site_id=site)
+        inflows = Q(direction=DailyMovement.INFLOW, item_id__in=stocked_items)
+        filters &= outflows | inflows
+
+    return filters
+
 
-    return inflow_outflow_metrics
+def get_movement_series(start, end, granularity='day', item=None, kanban=None, site=None):
+    """
+    Séries de entradas, saídas e saldo entre `start` e `end` (inclusive),
+    agrupadas no banco por dia, semana ISO ou mês em uma única consulta.
+    Com `site`, as entradas são aproximadas pelos itens estocados na OM
+    (ver _movement_filters).
+    """
+    trunc, label_format = CHART_GRANULARITIES[granularity]
 
+    rows = DailyMovement.objects.filter(
+        _movement_filters(item, kanban, site),
+        day__gte=start,
+        day__lte=end,
+    ).order_by().annotate(
+        period=trunc('day'),
+    ).values('period', 'direction').annotate(
+        total=Sum('quantity'),
+    )
 
-def get_chart_daily_inflows_data():
-    today = timezone.localdate()
-    dates = [(today - timedelta(days=i)).strftime('%d/%m') for i in range(6, -1, -1)]
-    values = []
+    totals = {(row['period'], row['direction']): row['total'] for row in rows}
+    periods = _periods(start, end, granularity)
 
-    for i in range(6, -1, -1):
-        day = today - timedelta(days=i)
-        total_items = sum(inflow.quantity for inflow in Inflow.objects.filter(created_at__date=day))
-        values.append(total_items)
+    inflows = [totals.get((period, DailyMovement.INFLOW), 0) for period in periods]
+    outflows = [totals.get((period, DailyMovement.OUTFLOW), 0) for period in periods]
 
     return {
-        "dates": dates,
-        "values": values,
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "labels": [period.strftime(label_format) for period in periods],
+        "inflows": inflows,
+        "outflows": outflows,
+        "net": [i - o for i, o in zip(inflows, outflows)],
     }
 
-def get_chart_daily_outflows_data():
-    today = timezone.localdate()
-    dates = [(today - timedelta(days=i)).strftime('%d/%m') for i in range(6, -1, -1)]
-    values = []
 
-    for i in range(6, -1, -1):
-        day = today - timedelta(days=i)
-        total_items = sum(outflow.quantity for outflow in Outflow.objects.filter(created_at__date=day))
-        values.append(total_items)
+def get_top_movers(start, end, limit=10, item=None, kanban=None, site=None):
+    """
+    Itens com maior volume movimentado (entradas + saídas) entre `start` e
+    `end`, agrupados no banco em uma única consulta sobre o consolidado.
+    """
+    rows = DailyMovement.objects.filter(
+        _movement_filters(item, kanban, site),
+        day__gte=start,
+        day__lte=end,
+    ).order_by().values(
+        'item_id', 'item__mpn', 'item__name',
+    ).annotate(
+        inflows=_sum_quantity(Q(direction=DailyMovement.INFLOW)),
+        outflows=_sum_quantity(Q(direction=DailyMovement.OUTFLOW)),
+        moved=Sum('quantity'),
+    ).order_by('-moved', 'item__mpn')[:limit]
+
+    return [
+        {
+            "item_id": row['item_id'],
+            "mpn": row['item__mpn'],
+            "name": row['item__name'],
+            "inflows": row['inflows'],
+            "outflows": row['outflows'],
+            "net": row['inflows'] - row['outflows'],
+        }
+        for row in rows
+    ]
+
+
+def _inventory_aggregates():
+    # Conta pelos indicadores gravados em Inventory: "vencidos" reflete a última
+    # execução de refresh_inventory_status (cron diário), não a data de hoje
+    return Inventory.objects.aggregate(
+        total_itens=Count('id'),
+        itens_expirated=Count('id', filter=Q(expired=True)),
+        itens_minimum=Count('id', filter=Q(below_minimum=True)),
+    )
+
+
+def _order_aggregates():
+    aggregates = {
+        'total_orders': Count('id'),
+        'open_orders': Count('id', filter=Q(status__in=OPEN_STATUS)),
+    }
+    for key, _ in Order.STATUS_CHOICES:
+        aggregates[f'status_{key}'] = Count('id', filter=Q(status=key))
+
+    return Order.objects.aggregate(**aggregates)
 
+
+def _order_status_data(aggregates):
     return {
-        "dates": dates,
-        "values": values,
+        "labels": [choice[1] for choice in Order.STATUS_CHOICES],
+        "keys": [choice[0] for choice in Order.STATUS_CHOICES],
+        "values": [aggregates[f'status_{choice[0]}'] for choice in Order.STATUS_CHOICES],
     }
 
-def get_chart_order_status_data():
-    keys = [choice[0] for choice in Order.STATUS_CHOICES]
-    labels = [choice[1] for choice in Order.STATUS_CHOICES]
 
-    values = []
+def get_inventory_metrics():
+    return _inventory_aggregates()
 
-    for k in keys:
-        value = Order.objects.filter(status=k).count()
-        values.append(value)
+
+def get_order_metrics():
+    """Totais de pedidos e dados do gráfico de status a partir de uma única agregação."""
+    orders = _order_aggregates()
 
     return {
-        "labels":labels,
-        "keys": keys,
-        "values": values,
-    }
\ No newline at end of file
+        'total_orders': orders['total_orders'],
+        'open_orders': orders['open_orders'],
+        'status': _order_status_data(orders),
+    }
+
+
+def get_inflow_outflow_metrics(date):
+    period = 'month' if date else 'total'
+    movements = _movement_aggregates(date)
+
+    return {
+        'total_outflows': movements[f'out_{period}'],
+        'total_inflows': movements[f'in_{period}'],
+    }
@@ -0,0 +1,299 @@
+"""
+Paginação por cursor (keyset) para as ListViews.
+
+Em vez de OFFSET, cada página é buscada a partir dos valores de ordenação do
+último (ou primeiro) registro da página atual, com o pk como desempate:
+o custo de uma página não depende de quão "funda" ela é. A contagem total só é
+calculada se o template usar `page_obj.paginator.count_display`, e pode ser
+exata, limitada (`count_cap`) ou aproximada (estatísticas do PostgreSQL).
+"""
+import base64
+import binascii
+import json
+from functools import cached_property
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404
+
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'v': values, 'd': direction}, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload['v'], payload['d']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise Http404("Cursor inválido.")
+
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise Http404("Cursor inválido.")
+    return values, direction
+
+
+def _model_field(model, path):
+    """Campo do model para um caminho 'a__b__c', ou None (ex.: anotação)."""
+    field = None
+    for part in path.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+def _value(obj, path, field):
+    *parents, last = path.split('__')
+    for part in parents:
+        obj = getattr(obj, part, None)
+        if obj is None:
+            return None
+    if field is not None and field.is_relation:
+        return getattr(obj, field.attname)
+    return getattr(obj, last)
+
+
+class KeysetCount:
+    """Faz o papel do paginator no template: só conta quando solicitado."""
+
+    def __init__(self, queryset, per_page, mode='exact', cap=1000):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.mode = mode
+        self.cap = cap
+        self.is_exact = True
+
+    def _estimate(self):
+        connection = connections[self.queryset.db]
+        if connection.vendor != 'postgresql' or self.queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+    @cached_property
+    def count(self):
+        if self.mode == 'approximate':
+            estimate = self._estimate()
+            if estimate is not None:
+                self.is_exact = False
+                return estimate
+
+        if self.mode in ('capped', 'approximate'):
+            count = self.queryset.order_by()[:self.cap + 1].count()
+            if count > self.cap:
+                self.is_exact = False
+                return self.cap
+            return count
+
+        return self.queryset.count()
+
+    @property
+    def count_display(self):
+        count = self.count
+        if self.is_exact:
+            return str(count)
+        return f"~{count}" if self.mode == 'approximate' and count != self.cap else f"{count}+"
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class IdListPaginator(Paginator):
+    """
+    Paginação por posição sobre uma lista de pks já calculada (ex.: em cache):
+    só os registros da página são lidos, de `queryset`, na ordem da lista.
+    """
+
+    def __init__(self, ids, queryset, per_page):
+        super().__init__(ids, per_page)
+        self.queryset = queryset
+
+    @property
+    def count_display(self):
+        return str(self.count)
+
+    def page(self, number):
+        page = super().page(number)
+        objects = self.queryset.in_bulk(page.object_list)
+        page.object_list = [objects[pk] for pk in page.object_list if pk in objects]
+        return page
+
+
+class KeysetPaginationMixin:
+    """
+    Substitui a paginação por OFFSET de uma ListView.
+
+    A ordenação vem do order_by() aplicado em get_queryset(), senão de
+    `keyset_ordering`, senão do Meta.ordering do model; o pk é sempre o último
+    critério. `count_mode`: 'exact', 'capped' ou 'approximate'.
+    `page_size_options` lista os tamanhos de página que o usuário pode escolher
+    pelo parâmetro `page_size`.
+    """
+    paginate_by = 10
+    page_size_options = ()
+    keyset_ordering = None
+    count_mode = 'exact'
+    count_cap = 1000
+
+    def get_paginate_by(self, queryset):
+        value = self.request.GET.get(PAGE_SIZE_PARAM, '')
+        if value.isdigit() and int(value) in self.page_size_options:
+            return int(value)
+        return self.paginate_by
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_size_options'] = self.page_size_options
+        context['page_size'] = self.get_paginate_by(None)
+        return context
+
+    def get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or list(self.keyset_ordering or queryset.model._meta.ordering)
+        pk_name = queryset.model._meta.pk.name
+        keys = []
+        for entry in ordering:
+            if not isinstance(entry, str):
+                raise ImproperlyConfigured(f"{self.__class__.__name__}: ordenação por expressão não suportada: {entry!r}")
+            name = entry.lstrip('-')
+            if name in ('pk', pk_name):
+                continue
+            keys.append((name, entry.startswith('-')))
+        return keys
+
+    def _after(self, name, value, descending):
+        # Nulos ficam antes em ordem crescente e depois em ordem decrescente,
+        # no SQLite e no PostgreSQL
+        if descending:
+            if value is None:
+                return Q(pk__in=[])
+            return Q(**{f'{name}__lt': value}) | Q(**{f'{name}__isnull': True})
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f'{name}__gt': value})
+
+    def _equal(self, name, value):
+        if value is None:
+            return Q(**{f'{name}__isnull': True})
+        return Q(**{name: value})
+
+    def _keyset_filter(self, keys, values):
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (name, descending), value in zip(keys, values):
+            condition |= prefix & self._after(name, value, descending)
+            prefix &= self._equal(name, value)
+        return condition
+
+    def _order_by(self, keys):
+        expressions = []
+        for name, descending in keys:
+            if descending:
+                expressions.append(F(name).desc(nulls_last=True))
+            else:
+                expressions.append(F(name).asc(nulls_first=True))
+        return expressions
+
+    def _keys(self, queryset):
+        keys = self.get_keyset_ordering(queryset)
+        pk_descending = bool(keys) and keys[0][1]
+        keys.append((queryset.model._meta.pk.name, pk_descending))
+        return keys
+
+    def keyset_order(self, queryset):
+        """`queryset` na mesma ordem em que as páginas são percorridas."""
+        return queryset.order_by(*self._order_by(self._keys(queryset)))
+
+    def paginate_queryset(self, queryset, page_size):
+        model = queryset.model
+        keys = self._keys(queryset)
+        fields = [_model_field(model, name) for name, _ in keys]
+
+        paginator = KeysetCount(queryset, page_size, self.count_mode, self.count_cap)
+
+        token = self.request.GET.get(CURSOR_PARAM)
+        direction = 'next'
+        if token:
+            values, direction = decode_cursor(token)
+            if len(values) != len(keys):
+                raise Http404("Cursor inválido.")
+            try:
+                values = [
+                    field.to_python(value) if field is not None and value is not None else value
+                    for field, value in zip(fields, values)
+                ]
+            except ValidationError:
+                raise Http404("Cursor inválido.")
+
+            if direction == 'prev':
+                reverse = [(name, not descending) for name, descending in keys]
+                queryset = queryset.filter(self._keyset_filter(reverse, values)).order_by(*self._order_by(reverse))
+            else:
+                queryset = queryset.filter(self._keyset_filter(keys, values))
+
+        if direction == 'next':
+            queryset = queryset.order_by(*self._order_by(keys))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if direction == 'prev':
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(token)
+
+        def cursor(obj, cursor_direction):
+            values = [_value(obj, name, field) for (name, _), field in zip(keys, fields)]
+            return encode_cursor(values, cursor_direction)
+
+        page = KeysetPage(
+            rows,
+            paginator,
+            has_next,
+            has_previous,
+            cursor(rows[-1], 'next') if rows and has_next else None,
+            cursor(rows[0], 'prev') if rows and has_previous else None,
+        )
+        return paginator, page, rows, page.has_other_pages()
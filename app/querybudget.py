@@ -0,0 +1,214 @@
+"""
+Orçamento de consultas SQL por view.
+
+`QueryBudgetMiddleware` mede a quantidade de consultas e o tempo total de SQL
+de cada requisição e compara com `QUERY_BUDGETS` (por nome de URL). Conforme
+`QUERY_BUDGET_MODE`, violações são registradas no log ("log") ou levantam
+`QueryBudgetExceeded` ("raise"); com "off" o middleware não faz nada.
+
+As consultas feitas em threads de trabalho (os widgets do dashboard, via
+`sync_to_async`) entram na conta da requisição por `record_thread()`.
+
+`query_budget` é o equivalente para testes e `query_budget_report` (comando)
+gera o resumo por view percorrendo as URLs do projeto. O acumulado das
+requisições reais (`view_stats`) é exposto à equipe pela view
+`query_budget_stats`.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('sge.query_budget')
+
+# Medição em andamento; o contexto acompanha a requisição nas threads de
+# sync_to_async/async_to_sync
+_current_recorder = contextvars.ContextVar('query_budget_recorder', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """Conta as consultas e soma o tempo de SQL em todas as conexões."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.count += 1
+                self.time += elapsed
+
+    @property
+    def time_ms(self):
+        return round(self.time * 1000, 1)
+
+    @contextmanager
+    def record(self):
+        token = _current_recorder.set(self)
+        try:
+            with self._wrap_connections():
+                yield self
+        finally:
+            _current_recorder.reset(token)
+
+    @contextmanager
+    def _wrap_connections(self):
+        # connections.all() devolve as conexões da thread atual
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield
+
+
+@contextmanager
+def record_thread():
+    """
+    Em uma thread de trabalho, soma as consultas das conexões dessa thread à
+    medição da requisição que a disparou. Sem medição em andamento, não faz nada.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield
+        return
+    with recorder._wrap_connections():
+        yield
+
+
+def get_budget(url_name):
+    """Orçamento da URL: o específico sobrepõe o padrão ('default')."""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get(url_name, {}))
+    return budget
+
+
+def violations(recorder, budget):
+    found = []
+    if budget.get('queries') is not None and recorder.count > budget['queries']:
+        found.append(f"{recorder.count} consultas (limite {budget['queries']})")
+    if budget.get('time_ms') is not None and recorder.time_ms > budget['time_ms']:
+        found.append(f"{recorder.time_ms} ms de SQL (limite {budget['time_ms']} ms)")
+    return found
+
+
+class ViewStats:
+    """Acumulado por nome de URL das requisições medidas neste processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add(self, url_name, recorder, violated):
+        with self._lock:
+            stats = self._stats.setdefault(url_name, {
+                'requests': 0, 'queries': 0, 'max_queries': 0,
+                'time_ms': 0.0, 'max_time_ms': 0.0, 'violations': 0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += recorder.count
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            stats['time_ms'] += recorder.time_ms
+            stats['max_time_ms'] = max(stats['max_time_ms'], recorder.time_ms)
+            stats['violations'] += int(violated)
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for url_name, stats in sorted(self._stats.items()):
+                budget = get_budget(url_name)
+                rows.append({
+                    'view': url_name,
+                    'requests': stats['requests'],
+                    'avg_queries': round(stats['queries'] / stats['requests'], 1),
+                    'max_queries': stats['max_queries'],
+                    'avg_time_ms': round(stats['time_ms'] / stats['requests'], 1),
+                    'max_time_ms': stats['max_time_ms'],
+                    'budget_queries': budget.get('queries'),
+                    'budget_time_ms': budget.get('time_ms'),
+                    'violations': stats['violations'],
+                })
+            return rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+view_stats = ViewStats()
+
+
+def check(url_name, recorder, mode):
+    found = violations(recorder, get_budget(url_name))
+    view_stats.add(url_name, recorder, bool(found))
+
+    if not found:
+        return
+
+    message = f"Orçamento de consultas excedido em '{url_name}': {'; '.join(found)}"
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.mode = getattr(settings, 'QUERY_BUDGET_MODE', 'off')
+
+    def __call__(self, request):
+        if self.mode == 'off':
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match and match.url_name:
+            check(match.url_name, recorder, self.mode)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = recorder.count
+            response['X-Query-Time-Ms'] = recorder.time_ms
+
+        return response
+
+
+@contextmanager
+def query_budget(url_name=None, queries=None, time_ms=None):
+    """
+    Para testes: falha com QueryBudgetExceeded se o bloco ultrapassar o
+    orçamento de `url_name` em QUERY_BUDGETS ou os limites informados.
+
+        with query_budget('inventory_list'):
+            self.client.get(reverse('inventory_list'))
+    """
+    budget = get_budget(url_name) if url_name else {}
+    if queries is not None:
+        budget['queries'] = queries
+    if time_ms is not None:
+        budget['time_ms'] = time_ms
+
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+
+    found = violations(recorder, budget)
+    if found:
+        raise QueryBudgetExceeded(f"Orçamento de consultas excedido em '{url_name or 'bloco'}': {'; '.join(found)}")
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'inflow',
     'outflow',
     'reports',
+    'alert',
 ]
 
 #AUTH LOGIN CONFIG
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'app.querybudget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -97,6 +99,48 @@ else:
     }
 
 
+# Cache
+# O dashboard é compartilhado entre os workers do gunicorn, por isso o cache
+# precisa ser persistente: banco de dados em produção (requer
+# `python manage.py createcachetable`) e arquivos em desenvolvimento.
+if ENVIRONMENT == 'prd':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'sge_cache',
+        }
+    }
+
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+        }
+    }
+
+# Tempo máximo (segundos) de uma entrada do dashboard em cache; a invalidação
+# normal acontece ao gravar Inventory, Order, Inflow ou Outflow
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 600))
+
+# Validade dos ids em cache das buscas salvas do inventário
+SAVED_SEARCH_CACHE_TIMEOUT = int(os.getenv('SAVED_SEARCH_CACHE_TIMEOUT', 900))
+
+
+# Orçamento de consultas por view (app.querybudget): "off", "log" ou "raise"
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'off' if ENVIRONMENT == 'prd' else 'log')
+
+# Limites por nome de URL; 'default' vale para as demais
+# (`python manage.py query_budget_report`)
+QUERY_BUDGETS = {
+    'default': {'queries': 20, 'time_ms': 500},
+    # Validação das chaves e das duas restrições de checagem (avaliadas no
+    # banco), o INSERT, a junção das classes de equivalência e a atualização
+    # dos documentos de busca do inventário dos dois itens
+    'item_create_equivalent': {'queries': 30},
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
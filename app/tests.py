@@ -0,0 +1,286 @@
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache as django_cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from inflow.models import Inflow
+from inventory.models import Inventory
+from item.models import Item, ItemEquivalent
+from location.models import Location, LocationSite
+from order.models import Order
+from outflow.models import Outflow
+from reports.models import DailyMovement
+from . import metrics, querybudget, views, widgets
+
+
+class DashboardWidgetsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('dashboard', password='senha')
+        cls.user.user_permissions.add(Permission.objects.get(codename='view_order', content_type__app_label='order'))
+        Order.objects.create(order_number=1, status='OPEN')
+        Order.objects.create(order_number=2, status='OPEN2')
+        Order.objects.create(order_number=3, status='CANCEL')
+
+    def setUp(self):
+        django_cache.clear()
+
+    def test_orders_widget_uses_one_aggregate(self):
+        with self.assertNumQueries(1):
+            data = widgets.build('orders')
+
+        self.assertEqual(data['total_orders'], 3)
+        self.assertEqual(data['open_orders'], 2)
+        self.assertEqual(dict(zip(data['status']['keys'], data['status']['values'])), {
+            'NOT': 0, 'OPEN': 1, 'OPEN2': 1, 'CLOSE': 0, 'CLOSE2': 0, 'CANCEL': 1,
+        })
+
+    def test_orders_widget_is_cached(self):
+        widgets.build('orders')
+        with self.assertNumQueries(0):
+            widgets.build('orders')
+
+    def test_inventory_widget_is_rebuilt_after_save_and_delete(self):
+        site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        location = Location.objects.create(om=site, section='S1', shelf=1)
+        item = Item.objects.create(mpn='WIDGET-1', name='Item 1')
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory = Inventory.objects.create(item=item, location=location, quantity=10, minimum_quantity=5)
+        self.assertEqual(widgets.build('inventory')['itens_minimum'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.quantity = 2
+            inventory.save()
+        self.assertEqual(widgets.build('inventory')['itens_minimum'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.delete()
+        self.assertEqual(widgets.build('inventory')['total_itens'], 0)
+
+    def test_movements_widget_is_rebuilt_after_save_and_delete(self):
+        item = Item.objects.create(mpn='WIDGET-1', name='Item 1')
+        self.assertEqual(widgets.build('movements')['total_inflows'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inflow = Inflow.objects.create(item=item, quantity=4)
+        self.assertEqual(widgets.build('movements')['total_inflows'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inflow.delete()
+        self.assertEqual(widgets.build('movements')['total_inflows'], 0)
+
+
+class DashboardWidgetsEndpointTests(TransactionTestCase):
+    # Os widgets são calculados em threads com conexões próprias, que só
+    # enxergam dados já confirmados
+
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('dashboard', password='senha')
+        self.user.user_permissions.add(Permission.objects.get(codename='view_order', content_type__app_label='order'))
+        Order.objects.create(order_number=1, status='OPEN')
+        self.client.force_login(self.user)
+
+    def test_endpoint_returns_only_allowed_widgets(self):
+        response = self.client.get(reverse('dashboard_widgets'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'orders'})
+        self.assertEqual(response.json()['orders']['total_orders'], 1)
+
+    def test_endpoint_rejects_invalid_month(self):
+        response = self.client.get(reverse('dashboard_widgets'), {'date': '2025-13'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_widget_endpoint(self):
+        response = self.client.get(reverse('dashboard_widget', args=['orders']), {'date': '2025-01'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_orders'], 1)
+
+    def test_widget_endpoint_checks_permission(self):
+        response = self.client.get(reverse('dashboard_widget', args=['inventory']))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_widget_endpoint_unknown_widget(self):
+        response = self.client.get(reverse('dashboard_widget', args=['nada']))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_home_fetches_each_widget_endpoint(self):
+        response = self.client.get(reverse('home'))
+
+        self.assertContains(response, reverse('dashboard_widget', args=['__name__']))
+
+    def test_worker_thread_queries_count_in_the_budget(self):
+        recorder = querybudget.QueryRecorder()
+        with recorder.record():
+            async_to_sync(views._build_async)('orders', None)
+
+        # O agregado de pedidos roda em uma thread do pool, com outra conexão
+        self.assertEqual(recorder.count, 1)
+
+
+class MovementSeriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        cls.other_site = LocationSite.objects.create(location_site='2bavex', location_sub_site='spu', type='internal')
+        cls.location = Location.objects.create(om=cls.site, section='S1', shelf=1)
+        cls.other_location = Location.objects.create(om=cls.other_site, section='S2', shelf=1)
+        cls.item = Item.objects.create(mpn='CHART-1', name='Item 1')
+        cls.inventory = Inventory.objects.create(item=cls.item, location=cls.location, quantity=10)
+        Inventory.objects.create(item=cls.item, location=cls.other_location, quantity=10)
+
+    def setUp(self):
+        self.today = timezone.localdate()
+
+    def series(self, **filters):
+        return metrics.get_movement_series(self.today, self.today, **filters)
+
+    def test_site_filter_counts_inflows_at_every_site_stocking_the_item(self):
+        Inflow.objects.create(item=self.item, quantity=5)
+        Outflow.objects.create(inventory_item=self.inventory, claimant=self.other_location, quantity=2)
+
+        # A entrada não tem destino: aparece nas duas OMs; a saída só na solicitante
+        self.assertEqual(self.series(site=self.site.pk)['inflows'], [5])
+        self.assertEqual(self.series(site=self.other_site.pk)['inflows'], [5])
+        self.assertEqual(self.series()['inflows'], [5])
+        self.assertEqual(self.series(site=self.site.pk)['outflows'], [0])
+        self.assertEqual(self.series(site=self.other_site.pk)['outflows'], [2])
+
+
+class MovementChartTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('graficos', password='senha')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_inflow', content_type__app_label='inflow'),
+            Permission.objects.get(codename='view_outflow', content_type__app_label='outflow'),
+        )
+        site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        item = Item.objects.create(mpn='CHART-1', name='Item 1')
+        for day, direction, quantity in (
+            (date(2025, 1, 29), DailyMovement.INFLOW, 100),
+            (date(2025, 1, 30), DailyMovement.INFLOW, 3),
+            (date(2025, 1, 30), DailyMovement.OUTFLOW, 1),
+            (date(2025, 2, 2), DailyMovement.INFLOW, 4),
+            (date(2025, 2, 3), DailyMovement.INFLOW, 2),
+            (date(2025, 2, 10), DailyMovement.OUTFLOW, 5),
+        ):
+            DailyMovement.objects.create(
+                day=day, direction=direction, item=item, quantity=quantity,
+                location_site=site if direction == DailyMovement.OUTFLOW else None,
+            )
+
+    def setUp(self):
+        django_cache.clear()
+        self.client.force_login(self.user)
+
+    def series(self, granularity, end=date(2025, 2, 10)):
+        return metrics.get_movement_series(date(2025, 1, 30), end, granularity)
+
+    def test_day_buckets_include_empty_days(self):
+        series = self.series('day', end=date(2025, 2, 3))
+
+        self.assertEqual(series['labels'], ['30/01', '31/01', '01/02', '02/02', '03/02'])
+        self.assertEqual(series['inflows'], [3, 0, 0, 4, 2])
+        self.assertEqual(series['outflows'], [1, 0, 0, 0, 0])
+        self.assertEqual(series['net'], [2, 0, 0, 4, 2])
+
+    def test_week_buckets_start_on_monday(self):
+        series = self.series('week')
+
+        # A semana S05 começa em 27/01, mas só conta a partir do início do período
+        self.assertEqual(series['labels'], ['S05/2025', 'S06/2025', 'S07/2025'])
+        self.assertEqual(series['inflows'], [7, 2, 0])
+        self.assertEqual(series['outflows'], [1, 0, 5])
+
+    def test_month_buckets(self):
+        series = self.series('month')
+
+        self.assertEqual(series['labels'], ['01/2025', '02/2025'])
+        self.assertEqual(series['inflows'], [3, 6])
+        self.assertEqual(series['net'], [2, 1])
+
+    def test_api_returns_the_series(self):
+        response = self.client.get(reverse('movement_chart_data'), {
+            'start': '2025-01-30', 'end': '2025-02-10', 'granularity': 'week',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.series('week'))
+
+    def test_api_rejects_invalid_parameters(self):
+        for params in (
+            {'start': '30/01/2025'},
+            {'granularity': 'year'},
+            {'start': '2025-02-10', 'end': '2025-01-30'},
+            {'start': '2015-01-01', 'end': '2025-01-01'},
+            {'item': 'abc'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('movement_chart_data'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_api_requires_movement_permissions(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha'))
+
+        response = self.client.get(reverse('movement_chart_data'))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', password='senha')
+        site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        items = [Item.objects.create(mpn=f'BUDGET-{index}', name=f'Item {index}') for index in range(12)]
+        for index, item in enumerate(items):
+            location = Location.objects.create(om=site, section=f'S{index}', shelf=1)
+            inventory = Inventory.objects.create(item=item, location=location, quantity=10)
+            Outflow.objects.create(inventory_item=inventory, claimant=location, quantity=1)
+        for item, equivalent in zip(items, items[1:]):
+            ItemEquivalent.objects.create(item=item, equivalent_item=equivalent)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_lists_stay_within_default_budget(self):
+        for url_name in ('outflow_list', 'item_list_equivalent'):
+            with self.subTest(url_name=url_name), querybudget.query_budget(url_name) as recorder:
+                response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(querybudget.get_budget(url_name)['queries'], 20)
+            self.assertLess(recorder.count, 10)
+
+    def test_stats_endpoint(self):
+        querybudget.view_stats.reset()
+        recorder = querybudget.QueryRecorder()
+        recorder.count = 3
+        querybudget.view_stats.add('outflow_list', recorder, False)
+
+        response = self.client.get(reverse('query_budget_stats'))
+        views = {row['view']: row for row in response.json()['views']}
+        self.assertEqual(views['outflow_list']['max_queries'], 3)
+
+        # O POST zera o acumulado (a própria requisição entra em seguida)
+        self.client.post(reverse('query_budget_stats'))
+        self.assertNotIn('outflow_list', [row['view'] for row in querybudget.view_stats.summary()])
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha'))
+        response = self.client.get(reverse('query_budget_stats'))
+        self.assertEqual(response.status_code, 302)
@@ -12,6 +12,11 @@ urlpatterns = [
 
 
     path('', views.home, name='home'),
+    path('dashboard/widgets/', views.dashboard_widgets, name='dashboard_widgets'),
+    path('dashboard/widgets/<str:name>/', views.dashboard_widget, name='dashboard_widget'),
+    path('dashboard/charts/movements/', views.movement_chart_data, name='movement_chart_data'),
+    path('dashboard/cache/stats/', views.dashboard_cache_stats, name='dashboard_cache_stats'),
+    path('dashboard/query-budget/stats/', views.query_budget_stats, name='query_budget_stats'),
     
     path('', include('item.urls')),
     path('', include('location.urls')),
@@ -19,5 +24,7 @@ urlpatterns = [
     path('', include('inflow.urls')),
     path('', include('outflow.urls')),
     path('', include('order.urls')),
+    path('', include('alert.urls')),
+    path('', include('reports.urls')),
 
 ]
@@ -1,25 +1,135 @@
+from django.conf import settings
 from django.shortcuts import render
-from . import metrics
-from datetime import datetime
-import json
-from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.db import connections
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from reports import cache
+from . import metrics, querybudget, widgets
+from datetime import datetime, timedelta
+import asyncio
+from django.contrib.auth.decorators import login_required, permission_required, user_passes_test
+
+
+# Janela máxima aceita pela API de gráficos (cerca de 5 anos)
+MAX_CHART_DAYS = 1830
+
+
+def _parse_month(request):
+    date_str = request.GET.get('date')
+    return datetime.strptime(date_str, "%Y-%m").date() if date_str else None
 
 
 @login_required(login_url='login')
 def home(request):
-    date_str = request.GET.get('date')
+    # Apenas a estrutura da página: cada widget é carregado em paralelo pelo
+    # navegador a partir de `dashboard_widget`
+    return render(request, 'home.html')
+
+
+def _build_isolated(name, date):
+    # Executado em uma thread do pool: as consultas contam no orçamento da
+    # requisição, e a conexão aberta nessa thread é fechada ao final
+    with querybudget.record_thread():
+        try:
+            return widgets.build(name, date)
+        finally:
+            connections.close_all()
+
+
+def _build_async(name, date):
+    return sync_to_async(_build_isolated, thread_sensitive=False)(name, date)
+
+
+@login_required(login_url='login')
+async def dashboard_widget(request, name):
+    """Dados de um widget do dashboard (app/widgets.py)."""
+    if name not in widgets.WIDGETS:
+        raise Http404
+
+    if not await widgets.aallowed(await request.auser(), name):
+        return JsonResponse({'error': 'Sem permissão.'}, status=403)
+
+    try:
+        date = _parse_month(request)
+    except ValueError:
+        return JsonResponse({'error': 'Mês inválido.'}, status=400)
+
+    return JsonResponse(await _build_async(name, date))
+
+
+@login_required(login_url='login')
+async def dashboard_widgets(request):
+    """
+    Todos os widgets permitidos ao usuário em uma resposta, para clientes que
+    preferem uma requisição só. Quando servido via ASGI, as consultas
+    independentes rodam em paralelo em threads.
+    """
+    try:
+        date = _parse_month(request)
+    except ValueError:
+        return JsonResponse({'error': 'Mês inválido.'}, status=400)
+
+    user = await request.auser()
+    names = [name for name in widgets.WIDGETS if await widgets.aallowed(user, name)]
+
+    results = await asyncio.gather(*(_build_async(name, date) for name in names))
+
+    return JsonResponse(dict(zip(names, results)))
+
+
+@login_required(login_url='login')
+@permission_required(['inflow.view_inflow', 'outflow.view_outflow'], raise_exception=True)
+def movement_chart_data(request):
+    """
+    Séries de entradas, saídas e saldo para os gráficos do dashboard.
+
+    Parâmetros GET: start e end (YYYY-MM-DD, padrão últimos 7 dias),
+    granularity (day, week ou month) e os filtros opcionais item (pk),
+    kanban e site (pk de LocationSite).
+    """
+    try:
+        end_str = request.GET.get('end')
+        end = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else timezone.localdate()
+        start_str = request.GET.get('start')
+        start = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else end - timedelta(days=metrics.CHART_DAYS - 1)
+        item = int(request.GET['item']) if request.GET.get('item') else None
+        site = int(request.GET['site']) if request.GET.get('site') else None
+    except ValueError:
+        return JsonResponse({'error': 'Parâmetros inválidos.'}, status=400)
+
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in metrics.CHART_GRANULARITIES:
+        return JsonResponse({'error': 'Granularidade inválida.'}, status=400)
+
+    if start > end:
+        return JsonResponse({'error': 'A data inicial não pode ser maior que a data final.'}, status=400)
+
+    if (end - start).days > MAX_CHART_DAYS:
+        return JsonResponse({'error': f'O período máximo é de {MAX_CHART_DAYS} dias.'}, status=400)
+
+    kanban = request.GET.get('kanban', '').strip() or None
+
+    return JsonResponse(cache.get_movement_series(start, end, granularity, item, kanban, site))
+
+
+@login_required(login_url='login')
+@user_passes_test(lambda user: user.is_staff)
+def dashboard_cache_stats(request):
+    return JsonResponse(cache.get_stats())
+
+
+@login_required(login_url='login')
+@user_passes_test(lambda user: user.is_staff)
+def query_budget_stats(request):
+    """
+    Consultas e tempo de SQL por view medidos pelo QueryBudgetMiddleware
+    neste processo desde o início (ou o último POST, que zera o acumulado).
+    """
+    if request.method == 'POST':
+        querybudget.view_stats.reset()
 
-    if date_str:
-        date = datetime.strptime(date_str, "%Y-%m").date()
-    else:
-        date = None
-
-    context = {
-        'inventory_metrics': metrics.get_inventory_metrics(),
-        'order_metrics': metrics.get_order_metrics(),
-        'inflow_outflow_metrics': metrics.get_inflow_outflow_metrics(date),
-        'daily_inflows_data': json.dumps(metrics.get_chart_daily_inflows_data()),
-        'daily_outflows_data': json.dumps(metrics.get_chart_daily_outflows_data()),
-        'order_status_data': json.dumps(metrics.get_chart_order_status_data()),
-    }
-    return render(request, 'home.html', context) 
\ No newline at end of file
+    return JsonResponse({
+        'mode': settings.QUERY_BUDGET_MODE,
+        'views': querybudget.view_stats.summary(),
+    })
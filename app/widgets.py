@@ -0,0 +1,51 @@
+from django.utils import timezone
+from reports import cache
+from . import metrics
+
+
+# Widgets do dashboard: permissões aceitas (basta uma), modelos cujas gravações
+# invalidam o cache do widget e função que calcula os dados (recebe o mês filtrado).
+# Cada widget faz uma única agregação: os totais de pedidos e o gráfico de
+# status saem da mesma consulta em 'orders'
+WIDGETS = {
+    'inventory': {
+        'permissions': ['inventory.view_inventory'],
+        'dependencies': ['inventory.inventory'],
+        'builder': lambda date: metrics.get_inventory_metrics(),
+    },
+    'orders': {
+        'permissions': ['order.view_order'],
+        'dependencies': ['order.order'],
+        'builder': lambda date: metrics.get_order_metrics(),
+    },
+    'movements': {
+        'permissions': ['inflow.view_inflow', 'outflow.view_outflow'],
+        'dependencies': ['inflow.inflow', 'outflow.outflow'],
+        'builder': lambda date: metrics.get_inflow_outflow_metrics(date),
+    },
+}
+
+
+def allowed(user, name):
+    return any(user.has_perm(perm) for perm in WIDGETS[name]['permissions'])
+
+
+async def aallowed(user, name):
+    for perm in WIDGETS[name]['permissions']:
+        if await user.ahas_perm(perm):
+            return True
+    return False
+
+
+def build(name, date=None):
+    """Dados de um widget, em cache por mês filtrado e dia atual."""
+    widget = WIDGETS[name]
+    month = date.strftime('%Y-%m') if date else 'all'
+
+    return cache.get_or_build(
+        f'widget:{name}',
+        widget['dependencies'],
+        lambda: widget['builder'](date),
+        month,
+        timezone.localdate().isoformat(),
+    )
@@ -1,4 +1,5 @@
 from django import forms
+from app.autocomplete import AutocompleteSelect
 from . import models
 from django.core.exceptions import ValidationError
 
@@ -8,7 +9,8 @@ class InflowForm(forms.ModelForm):
         model = models.Inflow 
         fields = ['item', 'quantity', 'description',]
         widgets = {
-            'item': forms.Select(
+            'item': AutocompleteSelect(
+                'item_autocomplete',
                 attrs={
                     'class': 'form-control select2',
                     'style': 'background-color: #313438 !important; color: #ffffff !important;'
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inflow', '0003_alter_inflow_options'),
+        ('item', '0003_alter_item_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inflow',
+            index=models.Index(fields=['created_at'], name='inflow_created_at_idx'),
+        ),
+    ]
@@ -1,9 +1,14 @@
-from django.db import models
+from django.db import models, transaction
 from item.models import Item
 from django.contrib.auth.models import User
+from reports.models import DailyMovement, RollupQuerySet, local_day
 
 
 class Inflow(models.Model):
+    ROLLUP_DIRECTION = DailyMovement.INFLOW
+    ROLLUP_FIELDS = ('item', 'item_id', 'quantity', 'created_at')
+    ROLLUP_RELATED = ()
+
     item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name='items_inflows')
     quantity = models.IntegerField(default=1)
     description = models.TextField(max_length=255, null=True, blank=True)
@@ -11,9 +16,29 @@ class Inflow(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="inflows_created")
 
+    objects = RollupQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='inflow_created_at_idx'),
+            models.Index(fields=['item', 'created_at'], name='inflow_item_created_at_idx'),
+        ]
 
     def __str__(self):
         return f'{self.item}'
 
+    def rollup_key(self):
+        # Entradas não registram localização: consolidadas sem OM
+        return local_day(self.created_at), self.item_id, None
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = Inflow.objects.filter(pk=self.pk).first() if self.pk else None
+            super().save(*args, **kwargs)
+            DailyMovement.replace(previous, self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            DailyMovement.apply(self, sign=-1)
+            return super().delete(*args, **kwargs)
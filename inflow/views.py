@@ -1,90 +1,42 @@
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from app.pagination import KeysetPaginationMixin
+from reports.filters import MovementFilter
 from django.views.generic import ListView, DetailView, View
 from inflow.forms import InflowForm, InflowAddForm
 from inventory.forms import InventoryInflowForm
 from . import models
-from django.db.models import Q
-from datetime import datetime
 from django.contrib import messages
 from django.shortcuts import render, redirect
 from inventory.models import Inventory
 from django.shortcuts import get_object_or_404
 
 
-class InflowListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+# Campos pesquisados pela busca textual da lista
+SEARCH_FIELDS = ('item__name', 'item__mpn', 'item__pn', 'description')
+
+
+class InflowListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Inflow
     template_name = 'inflow_list.html'
     context_object_name = 'inflows'
     paginate_by = 10
     permission_required = 'inflow.view_inflow'
+    count_mode = 'approximate'
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Filtro de busca por texto
-        search = self.request.GET.get('search', '').strip()
-        if search:
-            queryset = queryset.filter(
-                Q(item__name__icontains=search) |
-                Q(item__mpn__icontains=search) |
-                Q(item__pn__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
-        # Filtro por data inicial
-        date_from = self.request.GET.get('date_from')
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_from_parsed)
-            except ValueError:
-                messages.error(self.request, 'Data inicial inválida.')
-        
-        # Filtro por data final
-        date_to = self.request.GET.get('date_to')
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_to_parsed)
-            except ValueError:
-                messages.error(self.request, 'Data final inválida.')
-        
-        # Validação: data inicial não pode ser maior que data final
-        if date_from and date_to:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                
-                if date_from_parsed > date_to_parsed:
-                    messages.error(self.request, 'A data inicial não pode ser maior que a data final.')
-                    # Remove os filtros inválidos
-                    queryset = super().get_queryset()
-                    if search:
-                        queryset = queryset.filter(
-                            Q(item__name__icontains=search) |
-                            Q(item__mpn__icontains=search) |
-                            Q(item__part_number__icontains=search) |
-                            Q(description__icontains=search)
-                        )
-            except ValueError:
-                pass
-        
-        return queryset.distinct()
-    
+        # Busca e período interpretados uma única vez; o paginador conta o
+        # mesmo queryset quando o template exibe o total
+        self.filters = MovementFilter(self.request.GET, SEARCH_FIELDS)
+        self.filters.add_messages(self.request)
+        return self.filters.apply(super().get_queryset())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
+
         # Adiciona informações sobre os filtros ativos
-        context['has_filters'] = bool(
-            self.request.GET.get('search') or 
-            self.request.GET.get('date_from') or 
-            self.request.GET.get('date_to')
-        )
-        
-        # Conta total de resultados
-        context['total_count'] = self.get_queryset().count()
-        
+        context['has_filters'] = self.filters.has_filters
+
         return context
 
 
@@ -108,7 +60,7 @@ class InflowCreateView(LoginRequiredMixin, PermissionRequiredMixin, View):
 
             if serial_number:
                 # Verifica se já existe o mesmo serial_number
-                inventory = Inventory.objects.filter(item=item, serial_number=serial_number).first()
+                inventory = Inventory.objects.filter(item=item, serial_number=serial_number).order_by('pk').first()
                 
                 if inventory:
                     # Já existe → atualiza localização
@@ -122,8 +74,9 @@ class InflowCreateView(LoginRequiredMixin, PermissionRequiredMixin, View):
                     inventory.minimum_quantity = 1
                     inventory.save()
             else:
-                # Sem serial_number → reutiliza ou cria
-                inventory = Inventory.objects.filter(item=item, serial_number__isnull=True).first()
+                # Sem serial_number → reutiliza ou cria. order_by('pk') em vez do
+                # Meta.ordering (location) para usar inventory_item_no_serial_idx
+                inventory = Inventory.objects.filter(item=item, serial_number__isnull=True).order_by('pk').first()
                 if not inventory:
                     inventory = form_inventory.save()
                 else:
@@ -190,6 +143,7 @@ class InflowDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
     model = models.Inflow
     template_name = 'inflow_detail.html'
     permission_required = 'inflow.view_inflow'
+    queryset = models.Inflow.objects.select_related('item', 'created_by')
 
 
 
@@ -5,6 +5,14 @@ from . import models
 class InventoryAdmin(admin.ModelAdmin):
     list_display = ('item', 'serial_number', 'kanban', 'location', 'quantity', 'minimum_quantity', 'expiration_date')
     search_fields = ('item', 'serial_number', 'kanban', 'location', 'quantity', 'minimum_quantity', 'expiration_date')
+    list_filter = ('kanban', 'below_minimum', 'expired', 'expiring_soon')
 
 admin.site.register(models.Inventory, InventoryAdmin)
 
+
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'query', 'updated_at')
+    search_fields = ('name', 'user__username')
+
+
+admin.site.register(models.SavedSearch, SavedSearchAdmin)
@@ -0,0 +1,70 @@
+"""
+Estoque disponível de um item somado ao dos seus equivalentes.
+
+Uma única consulta agrupada por localização e item cobre toda a classe de
+equivalência (Item.equivalence_class, item/equivalence.py); o resultado é
+montado por localização em memória. Rápida o bastante para ser chamada ao
+preencher um item de pedido.
+"""
+from django.db.models import Min, Sum
+
+from .models import Inventory
+
+
+def _location_label(row):
+    if row['location_id'] is None:
+        return 'Sem localização'
+    parts = [
+        f"{row['location__om__location_site']} - {row['location__om__location_sub_site']}",
+        row['location__section'],
+        row['location__shelf'],
+    ]
+    return ' / '.join(str(part) for part in parts if part)
+
+
+def available_by_location(item):
+    """
+    Quantidades disponíveis (não vencidas) de `item` e dos seus equivalentes,
+    por localização, da maior para a menor. `item` precisa ter
+    `equivalence_class` carregado.
+
+    Cada localização: {'location_id', 'location', 'quantity', 'items'}, com
+    'items' = [{'item_id', 'mpn', 'quantity', 'inventory_id', 'equivalent'}];
+    `inventory_id` é um registro de estoque daquele item no local.
+    """
+    if item.equivalence_class is None:
+        queryset = Inventory.objects.filter(item_id=item.pk)
+    else:
+        queryset = Inventory.objects.filter(item__equivalence_class=item.equivalence_class)
+
+    rows = (
+        queryset.filter(quantity__gt=0, expired=False)
+        .values(
+            'location_id', 'location__om__location_site', 'location__om__location_sub_site',
+            'location__section', 'location__shelf', 'item_id', 'item__mpn',
+        )
+        .annotate(total=Sum('quantity'), inventory_id=Min('pk'))
+        .order_by()
+    )
+
+    locations = {}
+    for row in rows:
+        location = locations.setdefault(row['location_id'], {
+            'location_id': row['location_id'],
+            'location': _location_label(row),
+            'quantity': 0,
+            'items': [],
+        })
+        location['quantity'] += row['total']
+        location['items'].append({
+            'item_id': row['item_id'],
+            'mpn': row['item__mpn'],
+            'quantity': row['total'],
+            'inventory_id': row['inventory_id'],
+            'equivalent': row['item_id'] != item.pk,
+        })
+
+    for location in locations.values():
+        # O próprio item antes dos equivalentes
+        location['items'].sort(key=lambda entry: (entry['equivalent'], -entry['quantity'], entry['mpn']))
+    return sorted(locations.values(), key=lambda location: (-location['quantity'], location['location']))
@@ -0,0 +1,159 @@
+"""
+Operações em lote sobre o inventário (mover, ajustar quantidade, definir
+mínimo ou validade).
+
+Tudo roda em uma transação: as linhas são travadas, alteradas em memória e
+gravadas com bulk_update; ajustes de quantidade geram as entradas e saídas
+correspondentes com bulk_create e atualizam o consolidado diário de uma vez.
+Como bulk_update/bulk_create não disparam save() nem sinais, a situação do
+estoque, o documento de busca e as gerações de cache são atualizados aqui.
+
+- Saídas de ajuste são marcadas com Outflow.adjustment, têm a própria
+  localização do estoque como solicitante e entram no consolidado diário sem
+  OM. Registros sem localização não podem ser ajustados para baixo.
+- Mover não gera entradas nem saídas: o total de cada item não muda, e o
+  estoque em datas passadas (reports/snapshots.py) é calculado por item.
+- Registros com número de série são unidades individuais: ajustes de
+  quantidade e de mínimo não se aplicam a eles e são devolvidos como ignorados.
+"""
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from inflow.models import Inflow
+from outflow.models import Outflow
+from reports import cache
+from reports.models import DailyMovement
+from .models import Inventory
+from .search import refresh_search_documents
+
+
+RELOCATE = 'relocate'
+ADJUST = 'adjust'
+MINIMUM = 'minimum'
+EXPIRATION = 'expiration'
+
+ACTION_CHOICES = [
+    (RELOCATE, 'Mover para localização'),
+    (ADJUST, 'Ajustar quantidade'),
+    (MINIMUM, 'Definir quantidade mínima'),
+    (EXPIRATION, 'Definir validade'),
+]
+
+ADJUSTMENT_REASON = 'Ajuste em lote'
+
+BATCH_SIZE = 500
+
+# Quantos itens ignorados são citados na mensagem da lista
+SKIPPED_LISTED = 10
+
+STATUS_FIELDS = ['below_minimum', 'expired', 'expiring_soon']
+
+
+def _label(inventory):
+    return f"{inventory.item.mpn} ({inventory.serial_number or 'sem SN'})"
+
+
+def _invalidate(labels):
+    for label in labels:
+        cache.bump_generation(label)
+
+
+def apply_bulk_action(inventory_ids, action, user, location=None, quantity=None,
+                      minimum_quantity=None, expiration_date=None, description=''):
+    """
+    Aplica `action` aos inventários de `inventory_ids`. Retorna (número de
+    alterados, rótulos dos ignorados); itens com número de série são ignorados
+    nos ajustes de quantidade e de mínimo. Levanta ValidationError sem gravar
+    nada se alguma linha não puder ser alterada.
+    """
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        rows = list(
+            Inventory.objects.select_for_update(of=('self',))
+            .select_related('item')
+            .filter(pk__in=inventory_ids)
+            .order_by('pk')
+        )
+
+        changed, skipped = [], []
+        inflows, outflows = [], []
+        fields = []
+
+        if action == RELOCATE:
+            fields = ['location']
+            for inventory in rows:
+                if inventory.location_id != location.pk:
+                    inventory.location = location
+                    changed.append(inventory)
+
+        elif action == ADJUST:
+            fields = ['quantity']
+            errors = []
+            for inventory in rows:
+                if inventory.serial_number:
+                    skipped.append(inventory)
+                    continue
+                if inventory.quantity + quantity < 0:
+                    errors.append(f"{_label(inventory)}: estoque disponível {inventory.quantity}")
+                    continue
+                if quantity < 0 and inventory.location_id is None:
+                    errors.append(f"{_label(inventory)}: sem localização para registrar a saída")
+                    continue
+
+                inventory.quantity += quantity
+                changed.append(inventory)
+                if quantity > 0:
+                    inflows.append(Inflow(
+                        item_id=inventory.item_id, quantity=quantity, description=description, created_by=user,
+                    ))
+                else:
+                    outflows.append(Outflow(
+                        inventory_item=inventory, quantity=-quantity, claimant_id=inventory.location_id,
+                        adjustment=True, reason=ADJUSTMENT_REASON, description=description, created_by=user,
+                    ))
+            if errors:
+                raise ValidationError(errors)
+
+        elif action == MINIMUM:
+            fields = ['minimum_quantity']
+            for inventory in rows:
+                if inventory.serial_number:
+                    skipped.append(inventory)
+                elif inventory.minimum_quantity != minimum_quantity:
+                    inventory.minimum_quantity = minimum_quantity
+                    changed.append(inventory)
+
+        elif action == EXPIRATION:
+            fields = ['expiration_date']
+            expiration = timezone.make_aware(datetime.combine(expiration_date, datetime.min.time()))
+            for inventory in rows:
+                if inventory.expiration_date != expiration:
+                    inventory.expiration_date = expiration
+                    changed.append(inventory)
+
+        else:
+            raise ValidationError(f"Ação inválida: {action}")
+
+        for inventory in changed:
+            inventory.refresh_status_flags(today)
+        Inventory.objects.bulk_update(changed, fields + STATUS_FIELDS, batch_size=BATCH_SIZE)
+
+        if action == RELOCATE and changed:
+            refresh_search_documents(Inventory.objects.filter(pk__in=[inventory.pk for inventory in changed]))
+
+        Inflow.objects.bulk_create(inflows, batch_size=BATCH_SIZE)
+        Outflow.objects.bulk_create(outflows, batch_size=BATCH_SIZE)
+        DailyMovement.apply_many(inflows + outflows)
+
+        labels = ['inventory.inventory']
+        if inflows:
+            labels.append('inflow.inflow')
+        if outflows:
+            labels.append('outflow.outflow')
+        if changed:
+            transaction.on_commit(lambda: _invalidate(labels))
+
+    return len(changed), [_label(inventory) for inventory in skipped]
@@ -0,0 +1,97 @@
+"""
+Exportação da lista de inventário em CSV e XLSX.
+
+As linhas são lidas com values_list(...).iterator(), em blocos, e escritas à
+medida que chegam: o CSV sai por StreamingHttpResponse e o XLSX é montado em
+modo write-only do openpyxl num arquivo temporário, sem manter a planilha em
+memória.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import Inventory
+
+
+CHUNK_SIZE = 2000
+
+# (cabeçalho, campo a partir de Inventory)
+COLUMNS = (
+    ('Local', 'location__om__location_site'),
+    ('Sub-local', 'location__om__location_sub_site'),
+    ('Seção', 'location__section'),
+    ('Prateleira', 'location__shelf'),
+    ('Case', 'location__case'),
+    ('Nº Item', 'location__item_number'),
+    ('MPN', 'item__mpn'),
+    ('PN', 'item__pn'),
+    ('Nome', 'item__name'),
+    ('Quantidade', 'quantity'),
+    ('Quantidade Mínima', 'minimum_quantity'),
+    ('Serial Number', 'serial_number'),
+    ('Kanban', 'kanban'),
+    ('Validade', 'expiration_date'),
+    ('Vencido', 'expired'),
+    ('Abaixo do mínimo', 'below_minimum'),
+)
+
+KANBAN_LABELS = dict(Inventory.KANBAN_CHOICES)
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Linhas prontas para exportação, lidas do banco em blocos."""
+    fields = [field for _, field in COLUMNS]
+    kanban = fields.index('kanban')
+    expiration = fields.index('expiration_date')
+    flags = [fields.index('expired'), fields.index('below_minimum')]
+
+    for values in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        row = list(values)
+        row[kanban] = KANBAN_LABELS.get(row[kanban], row[kanban])
+        if row[expiration] is not None:
+            row[expiration] = timezone.localtime(row[expiration]).date()
+        for index in flags:
+            row[index] = 'Sim' if row[index] else 'Não'
+        yield row
+
+
+class _Echo:
+    """Buffer que só devolve o que recebe, para o csv.writer gerar texto."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(queryset, filename):
+    writer = csv.writer(_Echo(), delimiter=';')
+
+    def stream():
+        # BOM e ponto e vírgula para abrir direto no Excel em pt-BR
+        yield '\ufeff'
+        yield writer.writerow([header for header, _ in COLUMNS])
+        for row in export_rows(queryset):
+            yield writer.writerow(['' if value is None else value for value in row])
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_response(queryset, filename):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Inventário')
+    sheet.append([header for header, _ in COLUMNS])
+    for row in export_rows(queryset):
+        sheet.append(row)
+
+    # O arquivo temporário é apagado ao ser fechado, no fim da resposta
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+
+    response = FileResponse(output, as_attachment=True, filename=f"{filename}.xlsx")
+    response['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return response
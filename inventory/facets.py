@@ -0,0 +1,145 @@
+"""
+Filtros por facetas da lista de inventário.
+
+Cada faceta é um parâmetro GET combinável com os demais. As contagens de uma
+faceta consideram todos os filtros ativos exceto o dela mesma (assim é
+possível trocar de opção sem limpar a faceta) e saem de uma única consulta
+agrupada por faceta.
+"""
+from django.db.models import Count, Q
+
+
+HAS_SERIAL = Q(serial_number__isnull=False) & ~Q(serial_number='')
+
+BOOLEAN_OPTIONS = (('1', 'Sim'), ('0', 'Não'))
+
+
+class InventoryFacets:
+    """
+    Facetas: om (pk de LocationSite), section, shelf, serial, expired e
+    below_minimum (as três últimas com '1' ou '0').
+    """
+
+    FACETS = (
+        ('om', 'Local'),
+        ('section', 'Seção'),
+        ('shelf', 'Prateleira'),
+        ('serial', 'Serial Number'),
+        ('expired', 'Vencido'),
+        ('below_minimum', 'Abaixo do mínimo'),
+    )
+
+    BOOLEAN_CONDITIONS = {
+        'serial': HAS_SERIAL,
+        'expired': Q(expired=True),
+        'below_minimum': Q(below_minimum=True),
+    }
+
+    def __init__(self, params):
+        self.params = params
+        self.values = {}
+
+        om = params.get('om', '').strip()
+        if om.isdigit():
+            self.values['om'] = int(om)
+
+        section = params.get('section', '').strip()
+        if section:
+            self.values['section'] = section
+
+        shelf = params.get('shelf', '').strip()
+        if shelf.lstrip('-').isdigit():
+            self.values['shelf'] = int(shelf)
+
+        for name in self.BOOLEAN_CONDITIONS:
+            value = params.get(name, '').strip()
+            if value in ('0', '1'):
+                self.values[name] = value
+
+    @property
+    def has_filters(self):
+        return bool(self.values)
+
+    def _condition(self, name, value):
+        if name == 'om':
+            return Q(location__om_id=value)
+        if name == 'section':
+            return Q(location__section=value)
+        if name == 'shelf':
+            return Q(location__shelf=value)
+        condition = self.BOOLEAN_CONDITIONS[name]
+        return condition if value == '1' else ~condition
+
+    def apply(self, queryset, exclude=None):
+        for name, value in self.values.items():
+            if name != exclude:
+                queryset = queryset.filter(self._condition(name, value))
+        return queryset
+
+    def _url(self, name, value):
+        params = self.params.copy()
+        params.pop('cursor', None)
+        if value is None or self.values.get(name) == value:
+            params.pop(name, None)
+        else:
+            params[name] = str(value)
+        return f"?{params.urlencode()}"
+
+    def _option(self, name, value, label, count):
+        return {
+            'value': value,
+            'label': label,
+            'count': count,
+            'active': self.values.get(name) == value,
+            'url': self._url(name, value),
+        }
+
+    def _grouped(self, queryset, name, fields):
+        return self.apply(queryset, exclude=name).order_by().values(*fields).annotate(
+            count=Count('pk')
+        ).order_by(*fields)
+
+    def _boolean(self, queryset, name):
+        condition = self.BOOLEAN_CONDITIONS[name]
+        counts = self.apply(queryset, exclude=name).order_by().aggregate(
+            yes=Count('pk', filter=condition),
+            no=Count('pk', filter=~condition),
+        )
+        return [
+            self._option(name, value, label, counts['yes'] if value == '1' else counts['no'])
+            for value, label in BOOLEAN_OPTIONS
+        ]
+
+    def facets(self, queryset):
+        """Facetas com opções e contagens para o template."""
+        options = {
+            'om': [
+                self._option('om', row['location__om'], f"{row['location__om__location_site']} - {row['location__om__location_sub_site'] or ''}", row['count'])
+                for row in self._grouped(queryset, 'om', ('location__om', 'location__om__location_site', 'location__om__location_sub_site'))
+                if row['location__om'] is not None
+            ],
+            'section': [
+                self._option('section', row['location__section'], row['location__section'], row['count'])
+                for row in self._grouped(queryset, 'section', ('location__section',))
+                if row['location__section']
+            ],
+            'shelf': [
+                self._option('shelf', row['location__shelf'], row['location__shelf'], row['count'])
+                for row in self._grouped(queryset, 'shelf', ('location__shelf',))
+                if row['location__shelf'] is not None
+            ],
+        }
+        for name in self.BOOLEAN_CONDITIONS:
+            options[name] = self._boolean(queryset, name)
+
+        return [
+            {
+                'name': name,
+                'label': label,
+                'options': options[name],
+                'active': name in self.values,
+                'value': self.values.get(name),
+                'clear_url': self._url(name, None),
+            }
+            for name, label in self.FACETS
+        ]
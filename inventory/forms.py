@@ -1,5 +1,7 @@
 from django import forms
-from . import models
+from app.autocomplete import AutocompleteSelect
+from location.models import Location
+from . import bulk, models
 
 
 class InventoryForm(forms.ModelForm):
@@ -14,11 +16,13 @@ class InventoryForm(forms.ModelForm):
                     'style': 'background-color: #313438 !important; color: #ffffff !important;'
                 }
             ),
-            'location': forms.Select(
+            'location': AutocompleteSelect(
+                'location_autocomplete',
                 attrs={
                     'class': 'form-control select2',
                     'style': 'background-color: #313438 !important; color: #ffffff !important;'
-                }
+                },
+                select_related=('om',),
             ),
             'quantity': forms.NumberInput( 
                 attrs={'class': 'form-control'}
@@ -75,20 +79,23 @@ class InventoryInflowForm(forms.ModelForm):
         model = models.Inventory  
         fields = ['item', 'kanban', 'serial_number', 'location', 'quantity', 'minimum_quantity', 'expiration_date']
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-control select2',
-                                        'style': 'background-color: #313438 !important; color: #ffffff !important;'
-                                        }),
+            'item': AutocompleteSelect('item_autocomplete',
+                                       attrs={'class': 'form-control select2',
+                                              'style': 'background-color: #313438 !important; color: #ffffff !important;'
+                                              }),
             'kanban': forms.Select(
                 attrs={
                     'class': 'form-control',
                     'style': 'background-color: #313438 !important; color: #ffffff !important;'
                 }
             ),
-            'location': forms.Select(
+            'location': AutocompleteSelect(
+                'location_autocomplete',
                 attrs={
                     'class': 'form-control select2',
                     'style': 'background-color: #313438 !important; color: #ffffff !important;'
-                }
+                },
+                select_related=('om',),
             ),
             'quantity': forms.NumberInput( 
                 attrs={'class': 'form-control'}
@@ -137,6 +144,77 @@ class InventoryInflowForm(forms.ModelForm):
             if commit:
                 instance.save()
             return instance
-        
 
+    def clean(self):
+        cleaned_data = super().clean()
+        # Serial Number já existente não é erro na entrada: InflowCreateView
+        # atualiza a localização do registro existente. O formulário passa a
+        # editar esse registro, e a restrição única não o acusa contra si mesmo
+        item = cleaned_data.get('item')
+        serial_number = cleaned_data.get('serial_number')
+        if item and serial_number and self.instance.pk is None:
+            existing = models.Inventory.objects.filter(item=item, serial_number=serial_number).order_by('pk').first()
+            if existing is not None:
+                self.instance = existing
+        return cleaned_data
+
+
+class InventoryBulkForm(forms.Form):
+    ids = forms.ModelMultipleChoiceField(
+        queryset=models.Inventory.objects.all(),
+        widget=forms.MultipleHiddenInput,
+        error_messages={'required': 'Selecione ao menos um item do inventário.'},
+    )
+    action = forms.ChoiceField(
+        label='Ação',
+        choices=bulk.ACTION_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    location = forms.ModelChoiceField(
+        label='Localização',
+        queryset=Location.objects.all(),
+        required=False,
+        widget=AutocompleteSelect('location_autocomplete', attrs={'class': 'form-control select2'}, select_related=('om',)),
+    )
+    quantity = forms.IntegerField(
+        label='Quantidade (+/-)',
+        required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+    )
+    minimum_quantity = forms.IntegerField(
+        label='Quantidade Mínima',
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+    )
+    expiration_date = forms.DateField(
+        label='Data de Validade',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}, format='%Y-%m-%d'),
+    )
+    description = forms.CharField(
+        label='Descrição',
+        required=False,
+        max_length=255,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+    )
+
+    # Campo obrigatório de cada ação
+    ACTION_FIELDS = {
+        bulk.RELOCATE: 'location',
+        bulk.ADJUST: 'quantity',
+        bulk.MINIMUM: 'minimum_quantity',
+        bulk.EXPIRATION: 'expiration_date',
+    }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        field = self.ACTION_FIELDS.get(cleaned_data.get('action'))
+
+        if field and cleaned_data.get(field) in (None, ''):
+            self.add_error(field, 'Campo obrigatório para a ação escolhida.')
+
+        if cleaned_data.get('action') == bulk.ADJUST and cleaned_data.get('quantity') == 0:
+            self.add_error('quantity', 'A quantidade deve ser diferente de 0.')
 
+        return cleaned_data
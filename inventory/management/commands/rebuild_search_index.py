@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from inventory.models import Inventory
+from inventory.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Recalcula o documento de busca do inventário e reconstrói o índice textual"
+
+    def handle(self, *args, **options):
+        changed = Inventory.objects.refresh_search_documents()
+        install_search_index(connection, rebuild=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Índice de busca reconstruído: {changed} documentos atualizados")
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import Inventory
+from reports.cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = "Atualiza as situações de estoque (abaixo do mínimo, vencido, vence em breve). Executar diariamente."
+
+    def handle(self, *args, **options):
+        changed = Inventory.objects.refresh_status_flags()
+
+        if changed:
+            # Atualizações em lote não disparam signals: invalida o dashboard manualmente
+            bump_generation('inventory.inventory')
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Situação do estoque atualizada: {changed} alterações")
+        )
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:56
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+# Cópia das faixas de inventory.models.EXPIRING_SOON_BUCKETS nesta data: a
+# migração não deve depender do código atual do modelo
+EXPIRING_SOON_BUCKETS = [(30, '30'), (60, '60'), (90, '90')]
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def populate_status_flags(apps, schema_editor):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    today = timezone.localdate()
+
+    Inventory.objects.filter(quantity__lte=F('minimum_quantity')).update(below_minimum=True)
+    Inventory.objects.filter(expiration_date__lt=_start_of_day(today)).update(expired=True)
+
+    previous = 0
+    for days, bucket in EXPIRING_SOON_BUCKETS:
+        Inventory.objects.filter(
+            expiration_date__gte=_start_of_day(today + timedelta(days=previous)),
+            expiration_date__lt=_start_of_day(today + timedelta(days=days)),
+        ).update(expiring_soon=bucket)
+        previous = days
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_alter_inventory_location'),
+        ('item', '0003_alter_item_options'),
+        ('location', '0007_alter_locationsite_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='below_minimum',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Abaixo do mínimo'),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='expired',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Vencido'),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='expiring_soon',
+            field=models.CharField(blank=True, choices=[('30', 'Vence em até 30 dias'), ('60', 'Vence em 31 a 60 dias'), ('90', 'Vence em 61 a 90 dias')], editable=False, max_length=2, null=True, verbose_name='Vence em breve'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('below_minimum', True)), fields=['location'], name='inventory_below_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('expired', True)), fields=['location'], name='inventory_expired_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('expiring_soon__isnull', False)), fields=['expiring_soon', 'expiration_date'], name='inventory_expiring_soon_idx'),
+        ),
+        migrations.RunPython(populate_status_flags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:03
+
+from django.db import OperationalError, migrations, models
+from django.db.models import Q
+
+
+# Cópia do SQL e da montagem do documento de inventory/search.py nesta data:
+# a migração não deve depender do código atual do app
+FTS_TABLE = 'inventory_inventory_fts'
+
+DOCUMENT_FIELDS = (
+    'item__mpn',
+    'item__pn',
+    'item__name',
+    'item__doc',
+    'item__tec_pub',
+    'item__aircraft_doc',
+    'serial_number',
+    'kanban',
+    'location__section',
+    'location__om__location_site',
+    'location__om__location_sub_site',
+)
+
+KANBAN_LABELS = {'ENGINE': 'Motor', 'CELL': 'Célula', 'NOT': 'Não'}
+
+BATCH_SIZE = 500
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS inventory_search_fts_idx ON inventory_inventory "
+    "USING gin (to_tsvector('simple'::regconfig, search_document))",
+    "CREATE INDEX IF NOT EXISTS inventory_search_trgm_idx ON inventory_inventory "
+    "USING gin (search_document gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS inventory_search_fts_idx",
+    "DROP INDEX IF EXISTS inventory_search_trgm_idx",
+]
+
+SQLITE_INSTALL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "search_document, content='inventory_inventory', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_ai AFTER INSERT ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_ad AFTER DELETE ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_au AFTER UPDATE OF search_document ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS inventory_search_ai",
+    "DROP TRIGGER IF EXISTS inventory_search_ad",
+    "DROP TRIGGER IF EXISTS inventory_search_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _execute(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _populate_documents(apps):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    ItemEquivalent = apps.get_model('item', 'ItemEquivalent')
+
+    rows = list(Inventory.objects.order_by('pk').values('pk', 'item_id', *DOCUMENT_FIELDS))
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        item_ids = {row['item_id'] for row in batch}
+
+        mpns = {item_id: set() for item_id in item_ids}
+        pairs = ItemEquivalent.objects.filter(
+            Q(item_id__in=item_ids) | Q(equivalent_item_id__in=item_ids)
+        ).values_list('item_id', 'item__mpn', 'equivalent_item_id', 'equivalent_item__mpn')
+        for item_id, item_mpn, equivalent_id, equivalent_mpn in pairs:
+            if item_id in mpns:
+                mpns[item_id].add(equivalent_mpn)
+            if equivalent_id in mpns:
+                mpns[equivalent_id].add(item_mpn)
+
+        updates = []
+        for row in batch:
+            parts = [row[field] for field in DOCUMENT_FIELDS]
+            parts.append(KANBAN_LABELS.get(row['kanban']))
+            parts += sorted(mpns[row['item_id']])
+            document = ' '.join(str(part) for part in parts if part).lower()
+            updates.append(Inventory(pk=row['pk'], search_document=document))
+        Inventory.objects.bulk_update(updates, ['search_document'])
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_INSTALL)
+    elif vendor == 'sqlite':
+        try:
+            _execute(schema_editor, SQLITE_INSTALL)
+            # A tabela FTS5 nova precisa conhecer as linhas existentes antes
+            # que os triggers as removam dela ao preencher os documentos
+            _execute(schema_editor, [f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"])
+        except OperationalError:
+            # SQLite compilado sem FTS5: a busca usa search_document diretamente
+            pass
+
+    # Com os triggers já instalados, o preenchimento também indexa a FTS5
+    _populate_documents(apps)
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_UNINSTALL)
+    elif vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_inventory_status_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_inventory_search_document'),
+        ('item', '0003_alter_item_options'),
+        ('location', '0008_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['kanban', 'location'], name='inventory_kanban_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['location', 'serial_number'], name='inventory_location_serial_idx'),
+        ),
+    ]
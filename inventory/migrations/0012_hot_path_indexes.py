@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_serials(apps, schema_editor):
+    # Antes da restrição única: números de série repetidos precisam ser
+    # corrigidos manualmente (não há como escolher automaticamente o registro)
+    Inventory = apps.get_model('inventory', 'Inventory')
+    duplicates = list(
+        Inventory.objects.filter(serial_number__isnull=False).exclude(serial_number='')
+        .values('item__mpn', 'serial_number').annotate(total=Count('id')).filter(total__gt=1)
+        .order_by('item__mpn', 'serial_number')[:20]
+    )
+    if duplicates:
+        lines = '\n'.join(f"  MPN {row['item__mpn']} / SN {row['serial_number']}: {row['total']} registros" for row in duplicates)
+        raise RuntimeError(f"Números de série repetidos no inventário; corrija antes de migrar:\n{lines}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_saved_search'),
+        ('item', '0003_alter_item_options'),
+        ('location', '0008_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('serial_number__isnull', True)), fields=['item'], name='inventory_item_no_serial_idx'),
+        ),
+        migrations.RunPython(check_duplicate_serials, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inventory',
+            constraint=models.UniqueConstraint(condition=models.Q(('serial_number__isnull', False), models.Q(('serial_number', ''), _negated=True)), fields=('item', 'serial_number'), name='unique_inventory_item_serial', violation_error_message='Já existe um registro deste item com este Serial Number.'),
+        ),
+    ]
@@ -1,6 +1,70 @@
+from datetime import datetime, timedelta
+from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
 from item.models import Item
 from location.models import Location
+from . import search
+
+
+# Faixas de "vence em breve", em dias a partir de hoje
+EXPIRING_SOON_BUCKETS = [
+    (30, "30"),
+    (60, "60"),
+    (90, "90"),
+]
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def expiring_soon_ranges(today=None):
+    """Intervalos [início, fim) de cada faixa de vencimento próximo."""
+    today = today or timezone.localdate()
+    ranges = []
+    previous = 0
+    for days, bucket in EXPIRING_SOON_BUCKETS:
+        ranges.append((bucket, _start_of_day(today + timedelta(days=previous)), _start_of_day(today + timedelta(days=days))))
+        previous = days
+    return ranges
+
+
+class InventoryQuerySet(models.QuerySet):
+
+    def refresh_status_flags(self, today=None):
+        """
+        Recalcula below_minimum, expired e expiring_soon com atualizações em
+        lote, gravando apenas as linhas cujo valor mudou. Retorna o número de
+        linhas alteradas.
+        """
+        today = today or timezone.localdate()
+        start_today = _start_of_day(today)
+        is_below = Q(quantity__lte=F('minimum_quantity'))
+        is_expired = Q(expiration_date__lt=start_today)
+
+        changed = self.filter(is_below, below_minimum=False).update(below_minimum=True)
+        changed += self.filter(below_minimum=True).exclude(is_below).update(below_minimum=False)
+        changed += self.filter(is_expired, expired=False).update(expired=True)
+        changed += self.filter(expired=True).exclude(is_expired).update(expired=False)
+
+        in_any_bucket = Q()
+        for bucket, start, end in expiring_soon_ranges(today):
+            in_bucket = Q(expiration_date__gte=start, expiration_date__lt=end)
+            in_any_bucket |= in_bucket
+            changed += self.filter(in_bucket).exclude(expiring_soon=bucket).update(expiring_soon=bucket)
+
+        changed += self.filter(expiring_soon__isnull=False).exclude(in_any_bucket).update(expiring_soon=None)
+
+        return changed
+
+    def search(self, text):
+        """Busca textual ranqueada (ver inventory/search.py)."""
+        return search.search(self, text)
+
+    def refresh_search_documents(self):
+        return search.refresh_search_documents(self)
 
 
 class Inventory(models.Model):
@@ -10,21 +74,157 @@ class Inventory(models.Model):
         ("NOT", "Não"),
     ]
 
+    EXPIRING_SOON_CHOICES = [
+        ("30", "Vence em até 30 dias"),
+        ("60", "Vence em 31 a 60 dias"),
+        ("90", "Vence em 61 a 90 dias"),
+    ]
+
     item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name='inventories')
     serial_number = models.CharField(max_length=20, null=True, blank=True)
     kanban = models.CharField(
         max_length=10,
         choices=KANBAN_CHOICES,
         default="COMUM"
-    )    
+    )
     location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='location', blank=True, null=True)
     quantity = models.IntegerField(default=1)
     minimum_quantity = models.IntegerField(null=True, blank=True, default=None)
     expiration_date = models.DateTimeField(blank=True, null=True)
 
+    # Situação do estoque, recalculada em save() (e em inventory/bulk.py). below_minimum
+    # depende só da linha e está sempre em dia; expired e expiring_soon dependem da
+    # data e só avançam quando o comando diário refresh_inventory_status roda
+    below_minimum = models.BooleanField("Abaixo do mínimo", default=False, editable=False)
+    expired = models.BooleanField("Vencido", default=False, editable=False)
+    expiring_soon = models.CharField(
+        "Vence em breve", max_length=2, choices=EXPIRING_SOON_CHOICES, null=True, blank=True, editable=False
+    )
+
+    # Texto de busca de item, localização e equivalentes (inventory/search.py)
+    search_document = models.TextField(default='', blank=True, editable=False)
+
+    objects = InventoryQuerySet.as_manager()
+
     class Meta:
         ordering = ['location']
+        indexes = [
+            models.Index(fields=['location'], condition=Q(below_minimum=True), name='inventory_below_min_idx'),
+            models.Index(fields=['location'], condition=Q(expired=True), name='inventory_expired_idx'),
+            models.Index(
+                fields=['expiring_soon', 'expiration_date'],
+                condition=Q(expiring_soon__isnull=False),
+                name='inventory_expiring_soon_idx',
+            ),
+            # Filtros por faceta (inventory/facets.py)
+            models.Index(fields=['kanban', 'location'], name='inventory_kanban_location_idx'),
+            models.Index(fields=['location', 'serial_number'], name='inventory_location_serial_idx'),
+            # Entrada de itens sem número de série (InflowCreateView)
+            models.Index(fields=['item'], condition=Q(serial_number__isnull=True), name='inventory_item_no_serial_idx'),
+        ]
+        constraints = [
+            # Um mesmo número de série não pode se repetir para o item
+            models.UniqueConstraint(
+                fields=['item', 'serial_number'],
+                condition=Q(serial_number__isnull=False) & ~Q(serial_number=''),
+                name='unique_inventory_item_serial',
+                violation_error_message='Já existe um registro deste item com este Serial Number.',
+            ),
+        ]
 
     def __str__(self):
         return f"NOME: {self.item.name} - MPN:{self.item.mpn} - LOC: {self.location} - SN:{self.serial_number if self.serial_number else 'Sem SN'}"
 
+    def refresh_status_flags(self, today=None):
+        today = today or timezone.localdate()
+
+        self.below_minimum = self.minimum_quantity is not None and self.quantity <= self.minimum_quantity
+        self.expired = False
+        self.expiring_soon = None
+
+        if self.expiration_date:
+            expiration = self.expiration_date
+            if not isinstance(expiration, datetime):
+                expiration = _start_of_day(expiration)
+            elif timezone.is_naive(expiration):
+                expiration = timezone.make_aware(expiration)
+
+            self.expired = expiration < _start_of_day(today)
+            for bucket, start, end in expiring_soon_ranges(today):
+                if start <= expiration < end:
+                    self.expiring_soon = bucket
+
+    # Campos da própria linha que entram no documento de busca; mudanças em
+    # Item, Location e equivalências chegam pelos sinais (inventory/signals.py)
+    SEARCH_FIELDS = ('item_id', 'serial_number', 'kanban', 'location_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._search_values = instance._current_search_values()
+        return instance
+
+    def _current_search_values(self):
+        # __dict__ em vez de getattr: campos adiados (only/defer) não disparam consultas
+        return tuple(self.__dict__.get(field, models.DEFERRED) for field in self.SEARCH_FIELDS)
+
+    def search_document_outdated(self):
+        if self._state.adding:
+            return True
+        loaded = getattr(self, '_search_values', None)
+        if loaded is None or models.DEFERRED in loaded:
+            return True
+        return loaded != self._current_search_values()
+
+    def refresh_search_document(self):
+        location = self.location
+        values = {
+            'item__mpn': self.item.mpn,
+            'item__pn': self.item.pn,
+            'item__name': self.item.name,
+            'item__doc': self.item.doc,
+            'item__tec_pub': self.item.tec_pub,
+            'item__aircraft_doc': self.item.aircraft_doc,
+            'serial_number': self.serial_number,
+            'kanban': self.kanban,
+            'location__section': location.section if location else None,
+            'location__om__location_site': location.om.location_site if location else None,
+            'location__om__location_sub_site': location.om.location_sub_site if location else None,
+        }
+        mpns = search.equivalent_mpns([self.item_id])[self.item_id]
+        self.search_document = search.build_document(values, mpns)
+
+    def save(self, *args, **kwargs):
+        self.refresh_status_flags()
+        extra_fields = {'below_minimum', 'expired', 'expiring_soon'}
+
+        # O documento só é remontado (com consultas a item, localização e
+        # equivalentes) quando muda um campo indexado da própria linha
+        if self.search_document_outdated():
+            self.refresh_search_document()
+            extra_fields.add('search_document')
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | extra_fields
+
+        super().save(*args, **kwargs)
+        self._search_values = self._current_search_values()
+
+
+class SavedSearch(models.Model):
+    """Filtros nomeados da lista de inventário, por usuário (inventory/saved_searches.py)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='inventory_saved_searches')
+    name = models.CharField("Nome", max_length=100)
+    query = models.TextField("Filtros", blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_saved_search_name'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,59 @@
+"""
+Buscas salvas da lista de inventário.
+
+Uma busca salva guarda os parâmetros de filtro da lista (busca, kanban,
+local e facetas). Ao ser executada, a lista de pks que atende aos filtros fica
+em cache (SAVED_SEARCH_CACHE_TIMEOUT), versionada pelas gerações de Inventory,
+Item, ItemEquivalent e Location (reports/cache.py): execuções seguintes só
+buscam no banco as linhas da página exibida.
+"""
+from django.conf import settings
+from django.http import QueryDict
+from reports import cache
+
+
+SAVED_SEARCH_DEPENDENCIES = [
+    'inventory.inventory',
+    'item.item',
+    'item.itemequivalent',
+    'location.location',
+    'location.locationsite',
+]
+
+# Parâmetros da lista que fazem parte dos filtros (os demais são de navegação)
+FILTER_PARAMS = (
+    'search', 'kanban', 'site', 'subsite',
+    'om', 'section', 'shelf', 'serial', 'expired', 'below_minimum',
+)
+
+
+def filter_query(params, site=None, subsite=None):
+    """Querystring só com os filtros preenchidos de `params` (e do local da URL)."""
+    query = QueryDict(mutable=True)
+    for name in FILTER_PARAMS:
+        value = params.get(name, '').strip()
+        if value:
+            query[name] = value
+    if site and subsite:
+        query['site'] = site
+        query['subsite'] = subsite
+    return query.urlencode()
+
+
+def cached_ids(saved_search, build_queryset, site=None, subsite=None):
+    """
+    Pks, na ordem da lista, dos registros que atendem à busca salva.
+    `site`/`subsite` são os da rota `inventory_list_argument`, que restringem
+    a busca e por isso fazem parte da chave. `build_queryset()` só é chamado
+    quando não há entrada válida em cache.
+    """
+    return cache.get_or_build(
+        'inventory_saved_search',
+        SAVED_SEARCH_DEPENDENCIES,
+        lambda: list(build_queryset().values_list('pk', flat=True)),
+        saved_search.pk,
+        saved_search.updated_at.timestamp(),
+        site or '',
+        subsite or '',
+        timeout=settings.SAVED_SEARCH_CACHE_TIMEOUT,
+    )
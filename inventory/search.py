@@ -0,0 +1,250 @@
+"""
+Busca textual no inventário.
+
+Cada Inventory guarda em `search_document` o texto (em minúsculas) do item, da
+localização, do número de série e dos MPN equivalentes. O documento é mantido
+em Inventory.save() e pelos sinais de Item, Location, LocationSite e
+ItemEquivalent (inventory/signals.py); `rebuild_search_index` o reconstrói.
+
+- PostgreSQL: índice GIN sobre to_tsvector('simple', search_document), com
+  ranking por ts_rank, e índice GIN de trigramas para trechos de palavras.
+- SQLite: tabela FTS5 `inventory_inventory_fts`, sincronizada por triggers,
+  com ranking por bm25.
+- Outros bancos: `search_document` contém o termo.
+"""
+import re
+from functools import lru_cache
+
+from django.db import OperationalError, connections
+from django.db.models import BigIntegerField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Round
+
+
+FTS_TABLE = 'inventory_inventory_fts'
+
+# Campos (a partir de Inventory) que compõem o documento de busca
+DOCUMENT_FIELDS = (
+    'item__mpn',
+    'item__pn',
+    'item__name',
+    'item__doc',
+    'item__tec_pub',
+    'item__aircraft_doc',
+    'serial_number',
+    'kanban',
+    'location__section',
+    'location__om__location_site',
+    'location__om__location_sub_site',
+)
+
+BATCH_SIZE = 500
+
+# `search_rank` é a relevância multiplicada por esta escala e arredondada para
+# inteiro. A listagem pagina por cursor sobre ela: o ts_rank do PostgreSQL é
+# float4, e o valor que volta do cursor (float do Python, via JSON) não seria
+# igual ao da coluna, pulando ou repetindo empates no limite da página
+RANK_SCALE = 1_000_000
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS inventory_search_fts_idx ON inventory_inventory "
+    "USING gin (to_tsvector('simple'::regconfig, search_document))",
+    "CREATE INDEX IF NOT EXISTS inventory_search_trgm_idx ON inventory_inventory "
+    "USING gin (search_document gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS inventory_search_fts_idx",
+    "DROP INDEX IF EXISTS inventory_search_trgm_idx",
+]
+
+# Tabela FTS5 com conteúdo externo (lê de inventory_inventory) e triggers que
+# a mantêm sincronizada com search_document
+SQLITE_INSTALL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "search_document, content='inventory_inventory', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_ai AFTER INSERT ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_ad AFTER DELETE ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS inventory_search_au AFTER UPDATE OF search_document ON inventory_inventory BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS inventory_search_ai",
+    "DROP TRIGGER IF EXISTS inventory_search_ad",
+    "DROP TRIGGER IF EXISTS inventory_search_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def build_document(values, equivalent_mpns=()):
+    from .models import Inventory
+
+    parts = [values.get(field) for field in DOCUMENT_FIELDS]
+    parts.append(dict(Inventory.KANBAN_CHOICES).get(values.get('kanban')))
+    parts += sorted(equivalent_mpns)
+    return ' '.join(str(part) for part in parts if part).lower()
+
+
+def equivalent_mpns(item_ids, equivalent_model=None):
+    """MPNs equivalentes de cada item, nos dois sentidos, em uma consulta."""
+    if equivalent_model is None:
+        from item.models import ItemEquivalent as equivalent_model
+
+    mpns = {item_id: set() for item_id in item_ids}
+    rows = equivalent_model.objects.filter(
+        Q(item_id__in=item_ids) | Q(equivalent_item_id__in=item_ids)
+    ).values_list('item_id', 'item__mpn', 'equivalent_item_id', 'equivalent_item__mpn')
+
+    for item_id, item_mpn, equivalent_id, equivalent_mpn in rows:
+        if item_id in mpns:
+            mpns[item_id].add(equivalent_mpn)
+        if equivalent_id in mpns:
+            mpns[equivalent_id].add(item_mpn)
+
+    return mpns
+
+
+def refresh_search_documents(queryset, equivalent_model=None, batch_size=BATCH_SIZE):
+    """
+    Recalcula `search_document` das linhas de `queryset`, gravando em lote
+    apenas as que mudaram. Retorna o número de linhas alteradas.
+    """
+    model = queryset.model
+    changed = 0
+    rows = queryset.order_by('pk').values('pk', 'item_id', 'search_document', *DOCUMENT_FIELDS)
+
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            changed += _refresh_batch(model, batch, equivalent_model)
+            batch = []
+    if batch:
+        changed += _refresh_batch(model, batch, equivalent_model)
+
+    return changed
+
+
+def _refresh_batch(model, rows, equivalent_model):
+    mpns = equivalent_mpns({row['item_id'] for row in rows}, equivalent_model)
+    updates = []
+    for row in rows:
+        document = build_document(row, mpns[row['item_id']])
+        if document != row['search_document']:
+            updates.append(model(pk=row['pk'], search_document=document))
+
+    model.objects.bulk_update(updates, ['search_document'])
+    return len(updates)
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection, rebuild=False):
+    """
+    Cria (se não existirem) os índices de busca do banco. No SQLite, também
+    recria os triggers, que se perdem quando uma migração reconstrói a tabela
+    inventory_inventory; `rebuild` reindexa a tabela FTS5 inteira.
+    """
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRES_INSTALL)
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            created = FTS_TABLE not in connection.introspection.table_names(cursor)
+        try:
+            _execute(connection, SQLITE_INSTALL)
+            # Uma tabela FTS5 nova precisa ser indexada antes que os triggers
+            # removam dela linhas existentes
+            if rebuild or created:
+                _execute(connection, [f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"])
+        except OperationalError:
+            # SQLite compilado sem FTS5: a busca usa search_document diretamente
+            pass
+        _has_fts_table.cache_clear()
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRES_UNINSTALL)
+    elif connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_UNINSTALL)
+        _has_fts_table.cache_clear()
+
+
+def _tokens(text):
+    return re.findall(r'\w+', text.lower())
+
+
+@lru_cache(maxsize=None)
+def _has_fts_table(alias):
+    with connections[alias].cursor() as cursor:
+        return FTS_TABLE in connections[alias].introspection.table_names(cursor)
+
+
+def _stable_rank(rank):
+    return Cast(Round(rank * RANK_SCALE), output_field=BigIntegerField())
+
+
+def _no_rank():
+    return Value(0, output_field=BigIntegerField())
+
+
+def _postgres_search(queryset, text, tokens):
+    # Importado só no PostgreSQL: django.contrib.postgres depende do psycopg,
+    # que não é necessário para desenvolver com SQLite
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    def document():
+        # Mesma expressão do índice GIN criado em 0009_inventory_search_document
+        return Func(
+            F('search_document'),
+            template="to_tsvector('simple'::regconfig, %(expressions)s)",
+            output_field=SearchVectorField(),
+        )
+
+    query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), config='simple', search_type='raw')
+    return queryset.annotate(
+        search_vector=document(),
+        search_rank=_stable_rank(SearchRank(document(), query)),
+    ).filter(
+        Q(search_vector=query) | Q(search_document__contains=text.lower())
+    )
+
+
+def search(queryset, text):
+    """
+    Filtra `queryset` pelo texto e anota `search_rank` (inteiro, maior = mais
+    relevante; ver RANK_SCALE).
+    """
+    tokens = _tokens(text)
+    if not tokens:
+        return queryset.annotate(search_rank=_no_rank())
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        return _postgres_search(queryset, text, tokens)
+
+    if vendor == 'sqlite' and _has_fts_table(queryset.db):
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.annotate(
+            search_rank=_stable_rank(RawSQL(
+                f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = inventory_inventory.id',
+                [match],
+                output_field=FloatField(),
+            )),
+        ).filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        )
+
+    return queryset.filter(search_document__contains=text.lower()).annotate(search_rank=_no_rank())
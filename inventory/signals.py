@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from item.models import Item, ItemEquivalent
+from item.signals import equivalences_imported
+from location.models import Location, LocationSite
+from .models import Inventory
+from .search import BATCH_SIZE, install_search_index
+
+
+# Mantêm o documento de busca do inventário quando muda um dado denormalizado
+
+@receiver(post_save, sender=Item)
+def refresh_item_documents(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Inventory.objects.filter(item=instance).refresh_search_documents()
+
+
+@receiver(post_save, sender=Location)
+def refresh_location_documents(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Inventory.objects.filter(location=instance).refresh_search_documents()
+
+
+@receiver(post_save, sender=LocationSite)
+def refresh_site_documents(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Inventory.objects.filter(location__om=instance).refresh_search_documents()
+
+
+@receiver(post_save, sender=ItemEquivalent)
+@receiver(post_delete, sender=ItemEquivalent)
+def refresh_equivalent_documents(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Inventory.objects.filter(
+            item_id__in=[instance.item_id, instance.equivalent_item_id]
+        ).refresh_search_documents()
+
+
+@receiver(equivalences_imported)
+def refresh_imported_equivalent_documents(sender, item_ids, **kwargs):
+    item_ids = sorted(item_ids)
+    for start in range(0, len(item_ids), BATCH_SIZE):
+        Inventory.objects.filter(item_id__in=item_ids[start:start + BATCH_SIZE]).refresh_search_documents()
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # Migrações que reconstroem a tabela no SQLite descartam os triggers da FTS5
+    from django.db import connections
+    install_search_index(connections[using])
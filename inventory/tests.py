@@ -0,0 +1,536 @@
+import importlib
+from datetime import date, timedelta
+from io import StringIO
+
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache as django_cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from inflow.models import Inflow
+from item.models import Item, ItemEquivalent
+from location.models import Location, LocationSite
+from outflow.models import Outflow
+from reports.cache import get_generations
+from reports.models import DailyMovement
+from reports.rollup import rebuild_daily_movements
+from . import availability, bulk, forms, saved_searches
+from .facets import InventoryFacets
+from .models import Inventory, SavedSearch
+
+
+class InventoryTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        cls.location = Location.objects.create(om=cls.site, section='Hangar', shelf=1)
+        cls.other_location = Location.objects.create(om=cls.site, section='Oficina', shelf=2)
+        cls.item = Item.objects.create(mpn='SEARCH-1', name='Filtro de óleo')
+        cls.equivalent = Item.objects.create(mpn='SEARCH-2', name='Filtro alternativo')
+        ItemEquivalent.objects.create(item=cls.item, equivalent_item=cls.equivalent)
+
+
+class SearchDocumentTests(InventoryTestCase):
+
+    def test_document_on_create(self):
+        inventory = Inventory.objects.create(item=self.item, location=self.location, serial_number='SN77', kanban='ENGINE')
+
+        for term in ('search-1', 'filtro de óleo', 'sn77', 'hangar', '1bavex', 'motor', 'search-2'):
+            self.assertIn(term, inventory.search_document)
+
+    def test_save_without_indexed_changes_skips_rebuild(self):
+        Inventory.objects.create(item=self.item, location=self.location, quantity=5)
+        inventory = Inventory.objects.get()
+        inventory.quantity = 2
+
+        # Apenas o UPDATE: sem consultas a item, localização e equivalentes
+        with self.assertNumQueries(1):
+            inventory.save()
+
+    def test_save_with_indexed_changes_rebuilds(self):
+        Inventory.objects.create(item=self.item, location=self.location)
+        inventory = Inventory.objects.get()
+        inventory.location = self.other_location
+        inventory.save()
+
+        inventory.refresh_from_db()
+        self.assertIn('oficina', inventory.search_document)
+        self.assertNotIn('hangar', inventory.search_document)
+
+        inventory.serial_number = 'SN99'
+        inventory.save(update_fields=['serial_number'])
+        inventory.refresh_from_db()
+        self.assertIn('sn99', inventory.search_document)
+
+    def test_search_finds_equivalent_mpn(self):
+        inventory = Inventory.objects.create(item=self.item, location=self.location)
+        Inventory.objects.create(item=Item.objects.create(mpn='OTHER', name='Outro'), location=self.location)
+
+        self.assertEqual(list(Inventory.objects.search('search-2')), [inventory])
+
+    def test_migration_builds_the_same_document(self):
+        inventory = Inventory.objects.create(item=self.item, location=self.location, serial_number='SN1', kanban='CELL')
+        expected = inventory.search_document
+        Inventory.objects.update(search_document='')
+
+        migration = importlib.import_module('inventory.migrations.0009_inventory_search_document')
+        apps = MigrationExecutor(connection).loader.project_state(('inventory', '0009_inventory_search_document')).apps
+        migration._populate_documents(apps)
+
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.search_document, expected)
+
+
+class InventoryListOrderTests(InventoryTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_superuser('admin', password='senha')
+        # Localizações criadas fora da ordem das seções, para que location_id
+        # e a ordem por Location divirjam
+        sections = ['Depósito', 'Almoxarifado', 'Oficina', 'Bancada']
+        locations = [Location.objects.create(om=cls.site, section=section, shelf=1) for section in sections]
+        for index in range(23):
+            Inventory.objects.create(item=cls.item, location=locations[index % len(locations)], quantity=index)
+        Inventory.objects.create(item=cls.item, location=None, quantity=99)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def expected(self):
+        rows = Inventory.objects.select_related('location')
+        return [
+            inventory.pk
+            for inventory in sorted(rows, key=lambda inventory: (
+                inventory.location is not None,
+                inventory.location.section if inventory.location else '',
+                inventory.pk,
+            ))
+        ]
+
+    def walk(self, **params):
+        seen, pages = [], []
+        cursor = None
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            page = self.client.get(reverse('inventory_list'), params).context['page_obj']
+            pages.append([inventory.pk for inventory in page])
+            seen += pages[-1]
+            cursor = page.next_cursor
+            if not cursor:
+                return seen, pages
+
+    def test_list_keeps_location_ordering(self):
+        seen, pages = self.walk()
+
+        self.assertEqual(seen, self.expected())
+        self.assertEqual([len(page) for page in pages], [10, 10, 4])
+
+    def test_search_pages_through_tied_ranks(self):
+        ranks = dict(Inventory.objects.search('filtro').values_list('pk', 'search_rank'))
+        seen, pages = self.walk(search='filtro')
+
+        self.assertEqual(sorted(seen), sorted(ranks))
+        # O pk desempata no mesmo sentido do primeiro critério
+        self.assertEqual(seen, sorted(ranks, key=lambda pk: (-ranks[pk], -pk)))
+        # O empate atravessa o limite das páginas
+        self.assertEqual(ranks[pages[0][-1]], ranks[pages[1][0]])
+        self.assertTrue(all(isinstance(rank, int) for rank in ranks.values()))
+
+    def test_previous_cursor_returns_previous_page(self):
+        first = self.client.get(reverse('inventory_list')).context['page_obj']
+        second = self.client.get(reverse('inventory_list'), {'cursor': first.next_cursor}).context['page_obj']
+        back = self.client.get(reverse('inventory_list'), {'cursor': second.previous_cursor}).context['page_obj']
+
+        self.assertEqual([inventory.pk for inventory in back], [inventory.pk for inventory in first])
+        self.assertFalse(back.has_previous())
+
+    def test_page_size_option(self):
+        seen, pages = self.walk(page_size=25)
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(seen, self.expected())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('inventory_list'), {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_uses_list_ordering(self):
+        response = self.client.get(reverse('inventory_list'), {'export': 'csv'})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()[1:]
+        quantities = dict(Inventory.objects.values_list('pk', 'quantity'))
+
+        self.assertEqual([int(line.split(';')[9]) for line in lines], [quantities[pk] for pk in self.expected()])
+
+
+class BulkActionTests(InventoryTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_superuser('admin', password='senha')
+
+    def setUp(self):
+        self.stock = Inventory.objects.create(item=self.item, location=self.location, quantity=10, minimum_quantity=2)
+        self.serial = Inventory.objects.create(item=self.equivalent, location=self.location, serial_number='SN1')
+        self.ids = [self.stock.pk, self.serial.pk]
+
+    def test_relocate_updates_location_and_search_document(self):
+        changed, skipped = bulk.apply_bulk_action(self.ids, bulk.RELOCATE, self.user, location=self.other_location)
+
+        self.assertEqual((changed, skipped), (2, []))
+        self.assertEqual(set(Inventory.objects.values_list('location_id', flat=True)), {self.other_location.pk})
+        self.assertIn('oficina', Inventory.objects.get(pk=self.stock.pk).search_document)
+        # Mover não registra movimentações
+        self.assertFalse(Inflow.objects.exists() or Outflow.objects.exists())
+
+    def test_negative_adjustment_records_an_adjustment_outflow(self):
+        changed, skipped = bulk.apply_bulk_action(self.ids, bulk.ADJUST, self.user, quantity=-9, description='inventário')
+
+        self.assertEqual(changed, 1)
+        self.assertEqual(skipped, ['SEARCH-2 (SN1)'])
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 1)
+        self.assertTrue(self.stock.below_minimum)
+
+        outflow = Outflow.objects.get()
+        self.assertTrue(outflow.adjustment)
+        self.assertEqual(outflow.claimant, self.location)
+        self.assertEqual((outflow.quantity, outflow.reason), (9, bulk.ADJUSTMENT_REASON))
+
+        row = DailyMovement.objects.get(direction=DailyMovement.OUTFLOW)
+        self.assertEqual((row.item_id, row.location_site_id, row.quantity), (self.item.pk, None, 9))
+        self.assertEqual(rebuild_daily_movements(), 1)
+        self.assertEqual(DailyMovement.objects.get(direction=DailyMovement.OUTFLOW).quantity, 9)
+
+    def test_positive_adjustment_records_inflow(self):
+        bulk.apply_bulk_action([self.stock.pk], bulk.ADJUST, self.user, quantity=5)
+
+        self.assertEqual(Inflow.objects.get().quantity, 5)
+        self.assertEqual(DailyMovement.objects.get(direction=DailyMovement.INFLOW).quantity, 5)
+
+    def test_adjustment_below_zero_writes_nothing(self):
+        other = Inventory.objects.create(item=self.item, location=self.location, quantity=1)
+
+        with self.assertRaises(ValidationError):
+            bulk.apply_bulk_action([self.stock.pk, other.pk], bulk.ADJUST, self.user, quantity=-5)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 10)
+        self.assertFalse(Outflow.objects.exists())
+
+    def test_negative_adjustment_needs_a_location(self):
+        unplaced = Inventory.objects.create(item=self.item, location=None, quantity=5)
+
+        with self.assertRaises(ValidationError):
+            bulk.apply_bulk_action([unplaced.pk], bulk.ADJUST, self.user, quantity=-1)
+        self.assertFalse(Outflow.objects.exists())
+
+    def test_minimum_skips_serial_items(self):
+        changed, skipped = bulk.apply_bulk_action(self.ids, bulk.MINIMUM, self.user, minimum_quantity=20)
+
+        self.assertEqual((changed, skipped), (1, ['SEARCH-2 (SN1)']))
+        self.stock.refresh_from_db()
+        self.serial.refresh_from_db()
+        self.assertTrue(self.stock.below_minimum)
+        self.assertIsNone(self.serial.minimum_quantity)
+
+    def test_expiration_refreshes_flags(self):
+        bulk.apply_bulk_action(self.ids, bulk.EXPIRATION, self.user, expiration_date=date(2000, 1, 1))
+
+        self.assertEqual(Inventory.objects.filter(expired=True).count(), 2)
+
+    def test_view_lists_skipped_items(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('inventory_bulk_action'), {
+            'ids': self.ids, 'action': bulk.MINIMUM, 'minimum_quantity': 3,
+        }, follow=True)
+
+        messages = [str(message) for message in response.context['messages']]
+        self.assertIn('1 item(ns) do inventário atualizado(s).', messages)
+        self.assertTrue(any('SEARCH-2 (SN1)' in message for message in messages))
+
+
+class SavedSearchTests(InventoryTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_superuser('admin', password='senha')
+        cls.other_site = LocationSite.objects.create(location_site='2bavex', location_sub_site='spu', type='internal')
+        cls.remote = Location.objects.create(om=cls.other_site, section='Hangar', shelf=1)
+        cls.saved = SavedSearch.objects.create(user=cls.user, name='Filtros', query='search=filtro')
+
+    def setUp(self):
+        django_cache.clear()
+        self.client.force_login(self.user)
+        self.local = Inventory.objects.create(item=self.item, location=self.location)
+        self.far = Inventory.objects.create(item=self.item, location=self.remote)
+
+    def run_saved(self, url=None):
+        response = self.client.get(url or reverse('inventory_list'), {'saved': self.saved.pk})
+        return {inventory.pk for inventory in response.context['page_obj']}
+
+    def test_site_route_is_part_of_the_cache_key(self):
+        self.assertEqual(self.run_saved(), {self.local.pk, self.far.pk})
+        site_url = reverse('inventory_list_argument', args=['2bavex', 'spu'])
+
+        self.assertEqual(self.run_saved(site_url), {self.far.pk})
+        self.assertEqual(self.run_saved(), {self.local.pk, self.far.pk})
+
+    def test_cached_ids_skip_the_filter_query(self):
+        self.run_saved()
+        built = []
+        ids = saved_searches.cached_ids(self.saved, lambda: built.append(True))
+
+        self.assertFalse(built)
+        self.assertEqual(set(ids), {self.local.pk, self.far.pk})
+
+    def test_inventory_changes_invalidate_the_cache(self):
+        self.run_saved()
+        with self.captureOnCommitCallbacks(execute=True):
+            added = Inventory.objects.create(item=self.equivalent, location=self.location)
+
+        self.assertIn(added.pk, self.run_saved())
+
+    def test_editing_the_saved_search_invalidates_the_cache(self):
+        self.run_saved()
+        self.saved.query = 'search=filtro&site=1bavex&subsite=spu'
+        self.saved.save()
+
+        self.assertEqual(self.run_saved(), {self.local.pk})
+
+    def test_saved_searches_are_per_user(self):
+        self.client.force_login(User.objects.create_superuser('outro', password='senha'))
+        response = self.client.get(reverse('inventory_list'), {'saved': self.saved.pk})
+        self.assertEqual(response.status_code, 404)
+
+
+class SerialNumberConstraintTests(InventoryTestCase):
+
+    def test_duplicate_serial_is_rejected(self):
+        Inventory.objects.create(item=self.item, location=self.location, serial_number='SN1')
+        duplicate = Inventory(item=self.item, location=self.other_location, serial_number='SN1')
+
+        with self.assertRaisesMessage(ValidationError, 'Já existe um registro deste item com este Serial Number.'):
+            duplicate.full_clean()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            duplicate.save()
+
+    def test_same_serial_on_another_item_and_empty_serials_are_allowed(self):
+        Inventory.objects.create(item=self.item, location=self.location, serial_number='SN1')
+        Inventory.objects.create(item=self.equivalent, location=self.location, serial_number='SN1')
+        for serial_number in (None, None, '', ''):
+            Inventory.objects.create(item=self.item, location=self.location, serial_number=serial_number)
+
+        self.assertEqual(Inventory.objects.count(), 6)
+
+    def test_inflow_form_accepts_an_existing_serial(self):
+        Inventory.objects.create(item=self.item, location=self.location, serial_number='SN1')
+        form = forms.InventoryInflowForm(data={
+            'item': self.item.pk, 'kanban': 'NOT', 'serial_number': 'SN1',
+            'location': self.other_location.pk, 'quantity': 1,
+        })
+
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_lookup_without_serial_uses_the_partial_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plano verificado no SQLite')
+        Inventory.objects.create(item=self.item, location=self.location)
+        plan = Inventory.objects.filter(item=self.item, serial_number__isnull=True).order_by('pk').explain()
+
+        self.assertIn('inventory_item_no_serial_idx', plan)
+
+
+class InventoryFacetTests(InventoryTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_site = LocationSite.objects.create(location_site='2bavex', location_sub_site='spu', type='internal')
+        cls.remote = Location.objects.create(om=cls.other_site, section='Depósito', shelf=1)
+        cls.serial = Inventory.objects.create(item=cls.item, location=cls.location, serial_number='SN1')
+        cls.below = Inventory.objects.create(item=cls.item, location=cls.location, quantity=1, minimum_quantity=5)
+        cls.blank_serial = Inventory.objects.create(item=cls.equivalent, location=cls.other_location, serial_number='')
+        cls.remote_inventory = Inventory.objects.create(item=cls.equivalent, location=cls.remote)
+
+    def facets(self, query=''):
+        facets = InventoryFacets(QueryDict(query))
+        return facets, {facet['name']: facet for facet in facets.facets(Inventory.objects.all())}
+
+    def counts(self, facet):
+        return {option['value']: option['count'] for option in facet['options']}
+
+    def test_counts_without_filters(self):
+        facets, by_name = self.facets()
+
+        self.assertFalse(facets.has_filters)
+        self.assertEqual(self.counts(by_name['om']), {self.site.pk: 3, self.other_site.pk: 1})
+        self.assertEqual(self.counts(by_name['section']), {'Depósito': 1, 'Hangar': 2, 'Oficina': 1})
+        self.assertEqual(self.counts(by_name['shelf']), {1: 3, 2: 1})
+        # Serial em branco conta como sem serial
+        self.assertEqual(self.counts(by_name['serial']), {'1': 1, '0': 3})
+        self.assertEqual(self.counts(by_name['below_minimum']), {'1': 1, '0': 3})
+
+    def test_counts_ignore_only_their_own_filter(self):
+        _, by_name = self.facets('section=Hangar')
+
+        self.assertEqual(self.counts(by_name['section']), {'Depósito': 1, 'Hangar': 2, 'Oficina': 1})
+        self.assertEqual(self.counts(by_name['om']), {self.site.pk: 2})
+        self.assertEqual(self.counts(by_name['serial']), {'1': 1, '0': 1})
+
+    def test_apply_combines_facets(self):
+        facets = InventoryFacets(QueryDict(f'om={self.site.pk}&serial=0'))
+
+        self.assertEqual(set(facets.apply(Inventory.objects.all())), {self.below, self.blank_serial})
+
+    def test_one_query_per_facet(self):
+        facets = InventoryFacets(QueryDict('shelf=1'))
+        with self.assertNumQueries(len(InventoryFacets.FACETS)):
+            facets.facets(Inventory.objects.all())
+
+    def test_option_urls_toggle_the_facet_and_drop_the_cursor(self):
+        _, by_name = self.facets('section=Hangar&cursor=abc&search=filtro')
+        options = {option['value']: option for option in by_name['section']['options']}
+
+        self.assertTrue(options['Hangar']['active'])
+        self.assertEqual(QueryDict(options['Hangar']['url'][1:]), QueryDict('search=filtro'))
+        self.assertEqual(QueryDict(options['Oficina']['url'][1:]), QueryDict('section=Oficina&search=filtro'))
+
+    def test_invalid_values_are_ignored(self):
+        facets = InventoryFacets(QueryDict('om=abc&shelf=x&serial=2&section=%20'))
+
+        self.assertFalse(facets.has_filters)
+
+
+class AvailabilityTests(InventoryTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.item.refresh_from_db()
+        cls.first = Inventory.objects.create(item=cls.item, location=cls.location, quantity=5)
+        Inventory.objects.create(item=cls.item, location=cls.location, quantity=3)
+        cls.equivalent_here = Inventory.objects.create(item=cls.equivalent, location=cls.location, quantity=4)
+        Inventory.objects.create(item=cls.equivalent, location=cls.other_location, quantity=10)
+        # Vencido, zerado e item sem relação: fora da disponibilidade
+        Inventory.objects.create(item=cls.item, location=cls.other_location, quantity=7, expiration_date=timezone.now() - timedelta(days=1))
+        Inventory.objects.create(item=cls.item, location=cls.other_location, quantity=0)
+        cls.unrelated = Item.objects.create(mpn='OTHER', name='Outro')
+        Inventory.objects.create(item=cls.unrelated, location=cls.location, quantity=2)
+
+        cls.user = User.objects.create_user('pedidos', password='senha')
+        cls.user.user_permissions.add(Permission.objects.get(codename='add_orderitem', content_type__app_label='order'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse('inventory_availability'), params)
+
+    def test_one_query_for_the_whole_class(self):
+        with self.assertNumQueries(1):
+            availability.available_by_location(self.item)
+
+    def test_groups_the_class_by_location(self):
+        data = self.get(item=self.item.pk).json()
+
+        self.assertEqual(data['item'], {'id': self.item.pk, 'mpn': 'SEARCH-1'})
+        self.assertEqual(data['quantity'], 22)
+        self.assertEqual(
+            [(location['location_id'], location['quantity']) for location in data['locations']],
+            [(self.location.pk, 12), (self.other_location.pk, 10)],
+        )
+        # O próprio item antes dos equivalentes, com um registro de estoque do local
+        self.assertEqual(data['locations'][0]['items'], [
+            {'item_id': self.item.pk, 'mpn': 'SEARCH-1', 'quantity': 8, 'inventory_id': self.first.pk, 'equivalent': False},
+            {'item_id': self.equivalent.pk, 'mpn': 'SEARCH-2', 'quantity': 4, 'inventory_id': self.equivalent_here.pk, 'equivalent': True},
+        ])
+        self.assertEqual(data['locations'][0]['location'], '1bavex - spu / Hangar / 1')
+
+    def test_lookup_by_inventory_record(self):
+        data = self.get(inventory=self.equivalent_here.pk).json()
+
+        self.assertEqual(data['item']['mpn'], 'SEARCH-2')
+        self.assertEqual(data['quantity'], 22)
+        # Agora o item consultado é o equivalente: vem primeiro no local
+        self.assertEqual(
+            [(entry['mpn'], entry['equivalent']) for entry in data['locations'][0]['items']],
+            [('SEARCH-2', False), ('SEARCH-1', True)],
+        )
+
+    def test_item_without_equivalents(self):
+        data = self.get(item=self.unrelated.pk).json()
+
+        self.assertEqual(data['quantity'], 2)
+        self.assertEqual([entry['mpn'] for entry in data['locations'][0]['items']], ['OTHER'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(item='abc').status_code, 400)
+        self.assertEqual(self.get(item=0).status_code, 404)
+
+    def test_requires_one_of_the_permissions(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha'))
+
+        self.assertEqual(self.get(item=self.item.pk).status_code, 403)
+
+
+class StatusFlagsTests(InventoryTestCase):
+
+    def flags(self, inventory):
+        inventory.refresh_from_db()
+        return inventory.below_minimum, inventory.expired, inventory.expiring_soon
+
+    def test_save_refreshes_the_flags(self):
+        inventory = Inventory.objects.create(item=self.item, location=self.location, quantity=10, minimum_quantity=5)
+        self.assertEqual(self.flags(inventory), (False, False, None))
+
+        inventory.quantity = 5
+        inventory.expiration_date = timezone.now() + timedelta(days=45)
+        inventory.save()
+        self.assertEqual(self.flags(inventory), (True, False, '60'))
+
+        inventory.quantity = 6
+        inventory.expiration_date = timezone.now() - timedelta(days=1)
+        inventory.save()
+        self.assertEqual(self.flags(inventory), (False, True, None))
+
+    def test_update_fields_include_the_flags(self):
+        inventory = Inventory.objects.create(item=self.item, location=self.location, quantity=10, minimum_quantity=5)
+
+        inventory.quantity = 1
+        inventory.save(update_fields=['quantity'])
+
+        self.assertEqual(self.flags(inventory), (True, False, None))
+
+    def test_bulk_refresh_advances_with_the_date(self):
+        inventory = Inventory.objects.create(
+            item=self.item, location=self.location, expiration_date=timezone.now() + timedelta(days=10),
+        )
+        self.assertEqual(self.flags(inventory), (False, False, '30'))
+
+        changed = Inventory.objects.refresh_status_flags(today=timezone.localdate() + timedelta(days=20))
+
+        self.assertEqual(changed, 2)
+        self.assertEqual(self.flags(inventory), (False, True, None))
+        # Sem mudanças, nenhuma linha é regravada
+        self.assertEqual(Inventory.objects.refresh_status_flags(today=timezone.localdate() + timedelta(days=20)), 0)
+
+    def test_daily_command_invalidates_the_dashboard(self):
+        Inventory.objects.create(item=self.item, location=self.location, expiration_date=timezone.now() + timedelta(days=1))
+        Inventory.objects.update(expired=True)
+        before = get_generations(['inventory.inventory'])
+
+        call_command('refresh_inventory_status', stdout=StringIO())
+
+        self.assertFalse(Inventory.objects.get().expired)
+        self.assertNotEqual(get_generations(['inventory.inventory']), before)
@@ -6,6 +6,11 @@ urlpatterns = [
     path('inventory/<int:pk>/detail/', views.InventoryDetailView.as_view(), name='inventory_detail'),
     path('inventory/<int:pk>/update/', views.InventoryUpdateView.as_view(), name='inventory_update'),
     path('inventory/<int:pk>/delete/', views.InventoryDeleteView.as_view(), name='inventory_delete'),
+    path('inventory/autocomplete/', views.InventoryAutocompleteView.as_view(), name='inventory_autocomplete'),
+    path('inventory/availability/', views.InventoryAvailabilityView.as_view(), name='inventory_availability'),
+    path('inventory/bulk/', views.InventoryBulkActionView.as_view(), name='inventory_bulk_action'),
+    path('inventory/saved-search/create/', views.SavedSearchCreateView.as_view(), name='inventory_saved_search_create'),
+    path('inventory/saved-search/<int:pk>/delete/', views.SavedSearchDeleteView.as_view(), name='inventory_saved_search_delete'),
     
     path('inventory/<str:site>/<str:subsite>/', views.InventoryListView.as_view(), name='inventory_list_argument'),
 ]
\ No newline at end of file
@@ -1,67 +1,191 @@
-from django.views.generic import ListView, DetailView, UpdateView, DeleteView, CreateView
+from django.views.generic import ListView, DetailView, UpdateView, DeleteView, CreateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from . import models, forms
-from django.db.models import Q
-from django.urls import reverse_lazy
+from app.autocomplete import AutocompleteView
+from app.pagination import IdListPaginator, KeysetPaginationMixin
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse, QueryDict
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from . import availability, bulk, export, models, forms, saved_searches
+from .facets import InventoryFacets
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
+from item.equivalence import attach_equivalents
+from item.models import Item
 
 
-
-class InventoryListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class InventoryListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Inventory
     template_name = 'inventory_list.html'
     context_object_name = 'inventorys'
     paginate_by = 10
+    page_size_options = (10, 25, 50, 100, 250, 500)
     permission_required = 'inventory.view_inventory'
+    keyset_ordering = ('location__section',)
+    count_mode = 'approximate'
 
-    def get_queryset(self):
+    # Colunas exibidas em inventory_list.html
+    LIST_FIELDS = (
+        'quantity', 'minimum_quantity', 'serial_number', 'kanban',
+        'item', 'item__mpn', 'item__pn', 'item__name', 'item__equivalence_class',
+        'location', 'location__section', 'location__shelf', 'location__case', 'location__item_number',
+        'location__om', 'location__om__location_site', 'location__om__location_sub_site',
+    )
+
+    EXPORT_FORMATS = {
+        'csv': export.csv_response,
+        'xlsx': export.xlsx_response,
+    }
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.saved_search = None
+        self.saved_ids = None
+
+    def get(self, request, *args, **kwargs):
+        saved = request.GET.get('saved', '')
+        if saved.isdigit():
+            self.saved_search = get_object_or_404(models.SavedSearch, pk=saved, user=request.user)
+
+        export_format = request.GET.get('export')
+        if export_format in self.EXPORT_FORMATS:
+            return self.export(export_format)
+        return super().get(request, *args, **kwargs)
+
+    @property
+    def filter_params(self):
+        """Filtros da busca salva em execução, ou os do GET."""
+        if self.saved_search is not None:
+            return QueryDict(self.saved_search.query)
+        return self.request.GET
+
+    def export(self, export_format):
+        """Todas as linhas dos filtros ativos (busca, kanban, local e facetas)."""
+        queryset = self.get_filtered_queryset()
+        if not queryset.query.order_by:
+            queryset = self.keyset_order(queryset)
+        filename = f"inventario_{timezone.localdate():%Y-%m-%d}"
+        return self.EXPORT_FORMATS[export_format](queryset, filename)
+
+    def get_filtered_queryset(self):
+        params = self.filter_params
 
         queryset = models.Inventory.objects.all()
 
-        site = self.kwargs.get("site")
-        subsite = self.kwargs.get("subsite")
+        site = self.kwargs.get("site") or params.get("site")
+        subsite = self.kwargs.get("subsite") or params.get("subsite")
 
         if site and subsite:
-            queryset = models.Inventory.objects.filter(
+            queryset = queryset.filter(
                 location__om__location_site=site,
                 location__om__location_sub_site=subsite
             )
 
-        search = self.request.GET.get('search')
+        search = params.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(item__mpn__icontains=search) |
-                Q(item__pn__icontains=search) |
-                Q(item__name__icontains=search) |
-                Q(item__doc__icontains=search) |
-                Q(item__tec_pub__icontains=search) |
-                Q(item__aircraft_doc__icontains=search) |
-                Q(location__om__location_site__icontains=search) |
-                Q(location__om__location_sub_site__icontains=search) |
-                Q(location__section__icontains=search) |
-                Q(serial_number__icontains=search) |
-                Q(kanban__icontains=search) |
-                Q(item__equivalents__equivalent_item__mpn__icontains=search) |
-                Q(item__equivalent_of__item__mpn__icontains=search)
-            ).distinct()
-
-        kanban = self.request.GET.get('kanban', '').strip()
+            # Documento de busca indexado (inventory/search.py), ordenado por relevância
+            queryset = queryset.search(search).order_by('-search_rank', 'pk')
+
+        kanban = params.get('kanban', '').strip()
         if kanban:
             queryset = queryset.filter(kanban=kanban)
 
-        return queryset
+        # As contagens das facetas partem da busca, antes dos filtros de faceta
+        self.facets = InventoryFacets(params)
+        self.facet_queryset = queryset
+        return self.facets.apply(queryset)
+
+    def get_queryset(self):
+        if self.saved_search is not None:
+            # Busca salva: pks em cache; o banco só é consultado para os
+            # filtros quando a entrada expira ou um modelo envolvido muda
+            self.saved_ids = saved_searches.cached_ids(
+                self.saved_search, self._ordered_filtered_queryset, self.kwargs.get('site'), self.kwargs.get('subsite')
+            )
+            queryset = models.Inventory.objects.all()
+        else:
+            queryset = self.get_filtered_queryset()
+
+        return queryset.select_related('item', 'location__om').only(*self.LIST_FIELDS)
+
+    def _ordered_filtered_queryset(self):
+        # Mesma ordem da paginação por cursor
+        return self.keyset_order(self.get_filtered_queryset())
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.saved_ids is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = IdListPaginator(self.saved_ids, queryset, page_size)
+        page = paginator.get_page(self.request.GET.get('page'))
+        return paginator, page, page.object_list, page.has_other_pages()
 
     # se necessário enviar algum contexto específico para ao template utilizar essa função
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Equivalentes (classe inteira) de todos os itens da página em uma consulta
+        attach_equivalents(inventory.item for inventory in context['object_list'])
+
+        params = self.filter_params
+        context['filters'] = params
+        context['saved_search'] = self.saved_search
+        context['saved_searches'] = models.SavedSearch.objects.filter(user=self.request.user).only('pk', 'name')
+        context['saved_search_query'] = saved_searches.filter_query(
+            params, self.kwargs.get('site'), self.kwargs.get('subsite')
+        )
+
+        # Facetas só na busca livre: numa busca salva os filtros já estão fixos
+        if self.saved_search is None:
+            context['facets'] = self.facets.facets(self.facet_queryset)
+            context['has_facet_filters'] = self.facets.has_filters
+
+        export_params = self.request.GET.copy()
+        for name in ('cursor', 'page', 'page_size', 'export'):
+            export_params.pop(name, None)
+        context['export_query'] = export_params.urlencode()
+
+        if self.request.user.has_perm('inventory.change_inventory'):
+            context['bulk_form'] = forms.InventoryBulkForm()
         return context
 
-    
+
+class SavedSearchCreateView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Salva (ou atualiza, se o nome já existir) os filtros atuais da lista."""
+    permission_required = 'inventory.view_inventory'
+
+    def post(self, request):
+        name = request.POST.get('name', '').strip()[:100]
+        if not name:
+            messages.error(request, 'Informe um nome para a busca.')
+            return redirect(reverse('inventory_list'))
+
+        query = QueryDict(request.POST.get('query', ''))
+        saved, created = models.SavedSearch.objects.update_or_create(
+            user=request.user,
+            name=name,
+            defaults={'query': saved_searches.filter_query(query)},
+        )
+        messages.success(request, f'Busca "{name}" {"salva" if created else "atualizada"}.')
+        return redirect(f"{reverse('inventory_list')}?saved={saved.pk}")
+
+
+class SavedSearchDeleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = 'inventory.view_inventory'
+
+    def post(self, request, pk):
+        saved = get_object_or_404(models.SavedSearch, pk=pk, user=request.user)
+        saved.delete()
+        messages.success(request, f'Busca "{saved.name}" removida.')
+        return redirect(reverse('inventory_list'))
+
+
 class InventoryDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
     model = models.Inventory
     template_name = 'inventory_detail.html'
     context_object_name = 'inventory'
     permission_required = 'inventory.view_inventory'
+    queryset = models.Inventory.objects.select_related('item__created_by', 'location__om')
 
 
 
@@ -101,6 +225,7 @@ class InventoryDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteVie
     template_name = 'inventory_delete.html'
     success_url = reverse_lazy('inventory_list')
     permission_required = 'inventory.delete_inventory'
+    queryset = models.Inventory.objects.select_related('item', 'location__om')
 
 
 class InventoryCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -110,5 +235,89 @@ class InventoryCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateVie
     permission_required = 'inventory.add_inventory'
 
 
-    
+class InventoryBulkActionView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Aplica uma ação às linhas selecionadas na lista (inventory/bulk.py)."""
+    permission_required = 'inventory.change_inventory'
+
+    def post(self, request):
+        next_url = request.POST.get('next', '')
+        if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            next_url = reverse('inventory_list')
+
+        form = forms.InventoryBulkForm(request.POST)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect(next_url)
+
+        data = form.cleaned_data
+        try:
+            changed, skipped = bulk.apply_bulk_action(
+                [inventory.pk for inventory in data['ids']],
+                data['action'],
+                request.user,
+                location=data['location'],
+                quantity=data['quantity'],
+                minimum_quantity=data['minimum_quantity'],
+                expiration_date=data['expiration_date'],
+                description=data['description'],
+            )
+        except ValidationError as error:
+            for message in error.messages:
+                messages.error(request, message)
+            return redirect(next_url)
+
+        messages.success(request, f'{changed} item(ns) do inventário atualizado(s).')
+        if skipped:
+            listed = ', '.join(skipped[:bulk.SKIPPED_LISTED])
+            if len(skipped) > bulk.SKIPPED_LISTED:
+                listed += ', ...'
+            messages.warning(
+                request,
+                f'{len(skipped)} item(ns) com Serial Number ignorado(s): a ação não se aplica a unidades '
+                f'individuais. {listed}',
+            )
+        return redirect(next_url)
+
+
+class InventoryAutocompleteView(AutocompleteView):
+    permission_required = ('inventory.view_inventory', 'order.add_orderitem', 'order.change_orderitem')
+
+    def get_queryset(self, term):
+        queryset = models.Inventory.objects.select_related('item', 'location__om')
+        if term:
+            return queryset.search(term).order_by('-search_rank', 'pk')
+        return queryset.order_by('item__mpn', 'pk')
+
+
+class InventoryAvailabilityView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Estoque disponível de um item e dos seus equivalentes, por localização
+    (JSON). Parâmetros GET: item (pk do item) ou inventory (pk de um registro
+    de estoque do item). Usado pelo formulário de item de pedido para sugerir
+    alternativas em estoque.
+    """
+    permission_required = ('inventory.view_inventory', 'order.add_orderitem', 'order.change_orderitem')
+
+    def has_permission(self):
+        return any(self.request.user.has_perm(perm) for perm in self.get_permission_required())
+
+    def get(self, request):
+        items = Item.objects.only('pk', 'mpn', 'equivalence_class')
+        if request.GET.get('item', '').isdigit():
+            item = items.filter(pk=request.GET['item']).first()
+        elif request.GET.get('inventory', '').isdigit():
+            item = items.filter(inventories__pk=request.GET['inventory']).first()
+        else:
+            return JsonResponse({'error': 'Informe o item ou o registro de estoque.'}, status=400)
+
+        if item is None:
+            raise Http404
 
+        locations = availability.available_by_location(item)
+        return JsonResponse({
+            'item': {'id': item.pk, 'mpn': item.mpn},
+            'quantity': sum(location['quantity'] for location in locations),
+            'locations': locations,
+        })
@@ -0,0 +1,196 @@
+"""
+Classes de equivalência entre itens.
+
+Equivalência é transitiva: se A ⇔ B e B ⇔ C, A, B e C são intercambiáveis.
+Cada item que tem equivalentes guarda em `Item.equivalence_class` o menor pk
+da sua classe; itens sem equivalentes ficam com NULL. Todos os equivalentes de
+um item saem então de uma única consulta pelo índice da coluna.
+
+As classes são mantidas de forma incremental pelos sinais de ItemEquivalent
+(item/signals.py) e pela importação em lote: uma inclusão une as classes
+envolvidas; uma exclusão recalcula só a classe afetada.
+`rebuild_equivalence_classes` recalcula tudo.
+"""
+from django.db import transaction
+
+
+BATCH_SIZE = 500
+
+
+class UnionFind:
+    """Union-find com compressão de caminho; a raiz é sempre o menor elemento."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, value):
+        parent = self.parent.setdefault(value, value)
+        if parent == value:
+            return value
+        root = self.find(parent)
+        self.parent[value] = root
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            low, high = sorted((root_a, root_b))
+            self.parent[high] = low
+
+    def classes(self):
+        """{elemento: raiz} de todos os elementos vistos."""
+        return {value: self.find(value) for value in list(self.parent)}
+
+
+def compute_classes(pairs):
+    """Classe (menor pk) de cada item presente em `pairs` [(item_id, equivalent_id), ...]."""
+    union_find = UnionFind()
+    for item_id, equivalent_id in pairs:
+        union_find.union(item_id, equivalent_id)
+    return union_find.classes()
+
+
+def _write_classes(item_model, classes, current):
+    """Grava as classes que mudaram. `current`: {pk: classe atual} dos itens envolvidos."""
+    # Um UPDATE por classe de destino: bem mais barato que o CASE por linha
+    # do bulk_update quando uma importação mexe em milhares de itens
+    changed = {}
+    for pk, value in current.items():
+        if classes.get(pk) != value:
+            changed.setdefault(classes.get(pk), []).append(pk)
+
+    for value, pks in changed.items():
+        for start in range(0, len(pks), BATCH_SIZE):
+            item_model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).update(equivalence_class=value)
+    return sum(len(pks) for pks in changed.values())
+
+
+def rebuild_classes():
+    """Recalcula todas as classes. Retorna o número de itens alterados."""
+    from .models import Item, ItemEquivalent
+
+    classes = compute_classes(ItemEquivalent.objects.values_list('item_id', 'equivalent_item_id').iterator())
+
+    with transaction.atomic():
+        current = dict(
+            Item.objects.filter(equivalence_class__isnull=False).values_list('pk', 'equivalence_class')
+        )
+        for pk in classes:
+            current.setdefault(pk, None)
+        return _write_classes(Item, classes, current)
+
+
+def _locked_members(item_ids, class_ids):
+    """{pk: classe} de `item_ids` e dos membros de `class_ids`, com as linhas travadas."""
+    from .models import Item
+
+    members = {}
+    for field, values in (('pk__in', sorted(item_ids)), ('equivalence_class__in', sorted(class_ids))):
+        for start in range(0, len(values), BATCH_SIZE):
+            members.update(
+                Item.objects.select_for_update()
+                .filter(**{field: values[start:start + BATCH_SIZE]})
+                .order_by('pk')
+                .values_list('pk', 'equivalence_class')
+            )
+    return members
+
+
+def add_equivalences(pairs):
+    """
+    Une as classes dos itens de `pairs` [(item_id, equivalent_id), ...] após
+    a criação dessas equivalências, tocando só as classes envolvidas.
+    Retorna o número de itens alterados.
+    """
+    from .models import Item
+
+    item_ids = {pk for pair in pairs for pk in pair}
+    if not item_ids:
+        return 0
+
+    with transaction.atomic():
+        # Trava os itens e os membros das suas classes antes de ler as
+        # classes: inclusões concorrentes que tocam a mesma classe são
+        # serializadas, e a segunda lê o que a primeira gravou. Se a leitura
+        # travada revelar classes novas, os membros delas também são travados
+        class_ids = set()
+        while True:
+            current = _locked_members(item_ids, class_ids)
+            found = {value for value in current.values() if value is not None}
+            if found <= class_ids:
+                break
+            class_ids |= found
+
+        # As classes são fechadas: cada membro ligado à raiz da sua classe,
+        # mais os pares novos, dão as classes resultantes
+        union_find = UnionFind()
+        for pk, value in current.items():
+            union_find.union(pk, pk if value is None else value)
+        for item_id, equivalent_id in pairs:
+            union_find.union(item_id, equivalent_id)
+        return _write_classes(Item, union_find.classes(), current)
+
+
+def add_equivalence(item_id, equivalent_id):
+    """Une as classes de dois itens após a criação de uma equivalência."""
+    return add_equivalences([(item_id, equivalent_id)])
+
+
+def refresh_classes(item_ids):
+    """
+    Recalcula as classes que contêm `item_ids` (após excluir ou alterar uma
+    equivalência, quando uma classe pode se dividir).
+    """
+    from django.db.models import Q
+    from .models import Item, ItemEquivalent
+
+    class_ids = set(
+        Item.objects.filter(pk__in=item_ids, equivalence_class__isnull=False).values_list('equivalence_class', flat=True)
+    )
+    current = dict(Item.objects.filter(equivalence_class__in=class_ids).values_list('pk', 'equivalence_class'))
+    for pk in item_ids:
+        current.setdefault(pk, None)
+
+    members = list(current)
+    pairs = ItemEquivalent.objects.filter(
+        Q(item_id__in=members) | Q(equivalent_item_id__in=members)
+    ).values_list('item_id', 'equivalent_item_id')
+    classes = compute_classes(pairs)
+
+    # As classes são fechadas: nenhum par liga um membro a um item de fora
+    # delas, mas por segurança qualquer item novo também é gravado
+    for pk in classes:
+        current.setdefault(pk, None)
+    return _write_classes(Item, classes, current)
+
+
+def equivalents_map(items):
+    """
+    {pk: set(equivalentes)} de vários itens com uma consulta, qualquer que
+    seja o número de itens. Os itens precisam ter `equivalence_class` carregado.
+    """
+    from .models import Item
+
+    class_ids = {item.equivalence_class for item in items if item.equivalence_class is not None}
+
+    members = {}
+    if class_ids:
+        for member in Item.objects.filter(equivalence_class__in=class_ids).only('pk', 'mpn', 'name', 'equivalence_class'):
+            members.setdefault(member.equivalence_class, []).append(member)
+
+    return {
+        item.pk: {member for member in members.get(item.equivalence_class, []) if member.pk != item.pk}
+        for item in items
+    }
+
+
+def attach_equivalents(items):
+    """
+    Preenche o cache de `Item.all_equivalents` de vários itens (por exemplo,
+    os itens das linhas de uma página) com uma consulta.
+    """
+    items = [item for item in items if item is not None]
+    equivalents = equivalents_map(items)
+    for item in items:
+        item._equivalents = equivalents[item.pk]
+    return items
@@ -0,0 +1,154 @@
+"""
+Importação de equivalências em lote.
+
+Os pares (MPN, MPN equivalente) vêm de uma planilha ou das colunas de PN
+alternativo das importações de pedidos e prateleiras. Os MPNs são resolvidos
+de uma vez com in_bulk, os pares são postos na ordem canônica de
+ItemEquivalent (menor pk primeiro), repetidos e invertidos são descartados em
+memória (só os pares já cadastrados entre os itens resolvidos são lidos) e os
+novos entram com bulk_create. Como bulk_create não dispara sinais, as classes
+de equivalência (só as envolvidas), os documentos de busca (sinal
+`equivalences_imported`) e as gerações de cache são atualizados aqui.
+"""
+from django.db import IntegrityError, transaction
+from openpyxl import load_workbook
+from reports import cache
+from .equivalence import add_equivalences
+from .models import Item, ItemEquivalent
+from .signals import equivalences_imported
+
+
+BATCH_SIZE = 1000
+
+
+def clean_mpn(value):
+    """MPN da célula como texto; números lidos como float voltam a inteiros."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _invalidate():
+    for label in ('item.item', 'item.itemequivalent'):
+        cache.bump_generation(label)
+
+
+def read_pairs(file, sheet=None):
+    """
+    Pares (MPN, equivalente) de uma planilha: MPN na primeira coluna e os
+    equivalentes nas seguintes, a partir da segunda linha.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        for row in worksheet.iter_rows(min_row=2, values_only=True):
+            if not row:
+                continue
+            mpn = clean_mpn(row[0])
+            for value in row[1:]:
+                equivalent = clean_mpn(value)
+                if mpn and equivalent:
+                    yield mpn, equivalent
+    finally:
+        workbook.close()
+
+
+def _existing_pairs(item_ids, batch_size):
+    """Pares já cadastrados (ordem canônica) entre os itens de `item_ids`."""
+    item_ids = sorted(item_ids)
+    pairs = set()
+    for start in range(0, len(item_ids), batch_size):
+        rows = ItemEquivalent.objects.filter(item_id__in=item_ids[start:start + batch_size]).values_list(
+            'item_id', 'equivalent_item_id'
+        )
+        pairs.update(rows)
+    # O par canônico tem o menor pk em `item`: basta filtrar o outro lado
+    ids = set(item_ids)
+    return {pair for pair in pairs if pair[1] in ids}
+
+
+def _insert(new, batch_size):
+    """Grava `new` e retorna os pares de fato inseridos."""
+    try:
+        with transaction.atomic():
+            ItemEquivalent.objects.bulk_create(new, batch_size=batch_size)
+        return new
+    except IntegrityError:
+        # Algum par foi criado em paralelo: um a um, como DailyMovement.apply_many
+        inserted = []
+        for equivalence in new:
+            try:
+                with transaction.atomic():
+                    ItemEquivalent.objects.bulk_create([
+                        ItemEquivalent(item_id=equivalence.item_id, equivalent_item_id=equivalence.equivalent_item_id)
+                    ])
+            except IntegrityError:
+                continue
+            inserted.append(equivalence)
+        return inserted
+
+
+def import_equivalences(pairs, batch_size=BATCH_SIZE):
+    """
+    Cria as equivalências de `pairs` [(mpn, mpn_equivalente), ...] que ainda
+    não existem em nenhum sentido. MPNs não cadastrados são ignorados.
+
+    Retorna {'created', 'existing', 'invalid', 'missing'}, em que `missing` é
+    a lista ordenada dos MPNs não encontrados.
+    """
+    pairs = [(clean_mpn(mpn), clean_mpn(equivalent)) for mpn, equivalent in pairs]
+    mpns = {mpn for pair in pairs for mpn in pair if mpn}
+    items = Item.objects.only('pk', 'mpn').in_bulk(mpns, field_name='mpn')
+
+    # Pares já cadastrados, na ordem canônica (menor pk primeiro)
+    seen = _existing_pairs({item.pk for item in items.values()}, batch_size)
+
+    new, missing = [], set()
+    existing = invalid = 0
+    for mpn, equivalent in pairs:
+        if not mpn or not equivalent or mpn == equivalent:
+            invalid += 1
+            continue
+        if mpn not in items or equivalent not in items:
+            missing.update(value for value in (mpn, equivalent) if value not in items)
+            continue
+
+        key = tuple(sorted((items[mpn].pk, items[equivalent].pk)))
+        if key in seen:
+            existing += 1
+            continue
+        seen.add(key)
+        new.append(ItemEquivalent(item_id=key[0], equivalent_item_id=key[1]))
+
+    created = []
+    if new:
+        with transaction.atomic():
+            created = _insert(new, batch_size)
+            existing += len(new) - len(created)
+            pairs = [(equivalence.item_id, equivalence.equivalent_item_id) for equivalence in created]
+            add_equivalences(pairs)
+            equivalences_imported.send(sender=ItemEquivalent, item_ids={pk for pair in pairs for pk in pair})
+            transaction.on_commit(_invalidate)
+
+    return {
+        'created': len(created),
+        'existing': existing,
+        'invalid': invalid,
+        'missing': sorted(missing),
+    }
+
+
+def summary(result, limit=20):
+    """Resumo de import_equivalences para mensagens e saída de comandos."""
+    text = (
+        f"Equivalências criadas: {result['created']}; já existentes: {result['existing']}; "
+        f"inválidas: {result['invalid']}"
+    )
+    missing = result['missing']
+    if missing:
+        text += f"; MPNs não cadastrados ({len(missing)}): {', '.join(missing[:limit])}"
+        if len(missing) > limit:
+            text += ', ...'
+    return text
@@ -28,9 +28,26 @@ class ItemEquivalentForm(forms.ModelForm):
     class Meta:
         model = models.ItemEquivalent
         fields = ['item', 'equivalent_item']
-        
+
         widgets = {
             'item': forms.Select(attrs={'class': 'form-control select2'}),
             'equivalent_item': forms.Select(attrs={'class': 'form-control select2'}),
         }
-        
\ No newline at end of file
+
+
+class ItemEquivalentImportForm(forms.Form):
+    file = forms.FileField(
+        label='Planilha (.xlsx)',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.xlsx'}),
+    )
+    sheet = forms.CharField(
+        label='Aba',
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Primeira aba'}),
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith('.xlsx'):
+            raise forms.ValidationError('Envie uma planilha .xlsx.')
+        return file
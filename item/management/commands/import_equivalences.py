@@ -0,0 +1,38 @@
+from zipfile import BadZipFile
+
+from django.core.management.base import BaseCommand, CommandError
+from openpyxl.utils.exceptions import InvalidFileException
+
+from item.equivalence_import import import_equivalences, read_pairs, summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa equivalências em lote de uma planilha Excel: MPN na primeira coluna e MPNs "
+        "equivalentes nas seguintes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Caminho do arquivo Excel'
+        )
+        parser.add_argument(
+            '--sheet',
+            help='Nome da aba da planilha (padrão: a primeira)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+
+        self.stdout.write(f"Importando equivalências de {path}...")
+        try:
+            result = import_equivalences(read_pairs(path, options['sheet']))
+        except FileNotFoundError:
+            raise CommandError(f"Arquivo {path} não encontrado")
+        except KeyError:
+            raise CommandError(f"Aba {options['sheet']} não encontrada")
+        except (InvalidFileException, BadZipFile):
+            raise CommandError(f"Não foi possível ler a planilha {path}")
+
+        self.stdout.write(self.style.SUCCESS(summary(result)))
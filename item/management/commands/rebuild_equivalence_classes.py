@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from item.equivalence import rebuild_classes
+from reports import cache
+
+
+class Command(BaseCommand):
+    help = "Recalcula as classes de equivalência (transitivas) dos itens a partir de ItemEquivalent"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recalculando classes de equivalência...")
+
+        changed = rebuild_classes()
+        if changed:
+            cache.bump_generation('item.item')
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Classes recalculadas: {changed} itens alterados")
+        )
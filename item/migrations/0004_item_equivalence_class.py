@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+# Cópia do union-find de item/equivalence.py nesta data: a migração não deve
+# depender do código atual do módulo
+
+BATCH_SIZE = 500
+
+
+def _find(parent, value):
+    root = parent.setdefault(value, value)
+    while root != parent[root]:
+        root = parent[root]
+    while parent[value] != root:
+        parent[value], value = root, parent[value]
+    return root
+
+
+def compute_equivalence_classes(apps, schema_editor):
+    Item = apps.get_model('item', 'Item')
+    ItemEquivalent = apps.get_model('item', 'ItemEquivalent')
+
+    # Raiz de cada classe: o menor pk
+    parent = {}
+    for item_id, equivalent_id in ItemEquivalent.objects.values_list('item_id', 'equivalent_item_id').iterator():
+        root_a, root_b = _find(parent, item_id), _find(parent, equivalent_id)
+        if root_a != root_b:
+            low, high = sorted((root_a, root_b))
+            parent[high] = low
+
+    # A coluna acabou de ser criada: todos os itens estão sem classe
+    members = {}
+    for pk in list(parent):
+        members.setdefault(_find(parent, pk), []).append(pk)
+    for root, pks in members.items():
+        for start in range(0, len(pks), BATCH_SIZE):
+            Item.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).update(equivalence_class=root)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('item', '0003_alter_item_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='equivalence_class',
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compute_equivalence_classes, migrations.RunPython.noop),
+    ]
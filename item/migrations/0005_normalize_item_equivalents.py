@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import Exists, F, OuterRef
+
+
+def normalize_pairs(apps, schema_editor):
+    # Grava cada par com o menor pk em `item`; pares invertidos cuja forma
+    # canônica já existe são duplicados e saem
+    ItemEquivalent = apps.get_model('item', 'ItemEquivalent')
+    reversed_pairs = ItemEquivalent.objects.filter(item_id__gt=F('equivalent_item_id'))
+
+    reversed_pairs.filter(
+        Exists(ItemEquivalent.objects.filter(item_id=OuterRef('equivalent_item_id'), equivalent_item_id=OuterRef('item_id')))
+    ).delete()
+    reversed_pairs.update(item_id=F('equivalent_item_id'), equivalent_item_id=F('item_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('item', '0004_item_equivalence_class'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_pairs, migrations.RunPython.noop),
+    ]
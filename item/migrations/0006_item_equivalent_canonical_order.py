@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('item', '0005_normalize_item_equivalents'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='itemequivalent',
+            name='prevent_self_equivalence',
+        ),
+        migrations.AddConstraint(
+            model_name='itemequivalent',
+            constraint=models.CheckConstraint(condition=models.Q(('item', models.F('equivalent_item')), _negated=True), name='item_equivalent_not_self', violation_error_message='Um item não pode ser equivalente a ele mesmo.'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemequivalent',
+            constraint=models.CheckConstraint(condition=models.Q(('item__lte', models.F('equivalent_item'))), name='item_equivalent_canonical_order', violation_error_message='O par deve ser gravado com o item de menor id primeiro.'),
+        ),
+        migrations.AlterConstraint(
+            model_name='itemequivalent',
+            name='unique_item_equivalent',
+            constraint=models.UniqueConstraint(fields=('item', 'equivalent_item'), name='unique_item_equivalent', violation_error_message='Essa equivalência já existe.'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+# Índices da busca do autocomplete de itens (ItemAutocompleteView), só no
+# PostgreSQL. As expressões repetem as que o Django gera para os lookups:
+# istartswith em MPN/PN vira UPPER(col::text) LIKE 'X%' e icontains no nome,
+# UPPER(col::text) LIKE '%X%'
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS item_mpn_prefix_idx ON item_item (UPPER(mpn::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS item_pn_prefix_idx ON item_item (UPPER(pn::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS item_name_trgm_idx ON item_item USING gin (UPPER(name::text) gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS item_mpn_prefix_idx",
+    "DROP INDEX IF EXISTS item_pn_prefix_idx",
+    "DROP INDEX IF EXISTS item_name_trgm_idx",
+]
+
+
+def _execute(schema_editor, statements):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_indexes(apps, schema_editor):
+    _execute(schema_editor, POSTGRES_INSTALL)
+
+
+def uninstall_indexes(apps, schema_editor):
+    _execute(schema_editor, POSTGRES_UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('item', '0006_item_equivalent_canonical_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_indexes, uninstall_indexes),
+    ]
@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError
 from django.contrib import messages
 
 
@@ -15,6 +14,9 @@ class Item(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.PROTECT, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Menor pk da classe de equivalência (transitiva) do item; NULL se não há
+    # equivalentes. Mantido por item/equivalence.py
+    equivalence_class = models.BigIntegerField(null=True, blank=True, editable=False, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -24,31 +26,59 @@ class Item(models.Model):
     
     @property
     def all_equivalents(self):
-        eq1 = [e.equivalent_item for e in self.equivalents.all()]
-        eq2 = [e.item for e in self.equivalent_of.all()]
-        return set(eq1 + eq2)
+        # Toda a classe de equivalência, não só os vizinhos diretos; listas
+        # preenchem o cache de uma vez com equivalence.attach_equivalents
+        if not hasattr(self, '_equivalents'):
+            if self.equivalence_class is None:
+                self._equivalents = set()
+            else:
+                self._equivalents = set(
+                    Item.objects.filter(equivalence_class=self.equivalence_class).exclude(pk=self.pk)
+                )
+        return self._equivalents
     
     
 class ItemEquivalent(models.Model):
+    # Cada par é gravado em ordem canônica (menor pk em `item`): a restrição
+    # única cobre também a forma inversa, sem consulta extra ao gravar. A
+    # ordem usa <= para que um par do item com ele mesmo acuse só a restrição
+    # própria, com a mensagem certa
     item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="equivalents")
     equivalent_item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="equivalent_of")
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=["item", "equivalent_item"], name="unique_item_equivalent"),
+            models.UniqueConstraint(
+                fields=["item", "equivalent_item"],
+                name="unique_item_equivalent",
+                violation_error_message="Essa equivalência já existe.",
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(item=models.F("equivalent_item")),
+                name="item_equivalent_not_self",
+                violation_error_message="Um item não pode ser equivalente a ele mesmo.",
+            ),
             models.CheckConstraint(
-                check=~models.Q(item=models.F("equivalent_item")),
-                name="prevent_self_equivalence"
+                condition=models.Q(item__lte=models.F("equivalent_item")),
+                name="item_equivalent_canonical_order",
+                violation_error_message="O par deve ser gravado com o item de menor id primeiro.",
             ),
         ]
 
+    def canonicalize(self):
+        """Põe o par na ordem canônica (menor pk primeiro)."""
+        if self.item_id is not None and self.equivalent_item_id is not None and self.item_id > self.equivalent_item_id:
+            self.item_id, self.equivalent_item_id = self.equivalent_item_id, self.item_id
+
     def clean(self):
-        if ItemEquivalent.objects.filter(item=self.equivalent_item, equivalent_item=self.item).exists():
-            raise ValidationError("Essa equivalência já existe na forma inversa.")
+        # Antes das validações de unicidade do full_clean, que assim também
+        # acusam a forma inversa
+        self.canonicalize()
 
     def save(self, *args, **kwargs):
-        self.full_clean()  
+        # Integridade garantida pelas restrições do banco, como no bulk_create
+        self.canonicalize()
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.item} ⇔ {self.equivalent_item}"
\ No newline at end of file
+        return f"{self.item} ⇔ {self.equivalent_item}"
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from .equivalence import add_equivalence, refresh_classes
+from .models import ItemEquivalent
+
+
+# Enviado após a importação em lote de equivalências (bulk_create não dispara
+# post_save), com os pks dos itens envolvidos em `item_ids`
+equivalences_imported = Signal()
+
+
+# Mantêm Item.equivalence_class quando uma equivalência muda
+
+@receiver(pre_save, sender=ItemEquivalent)
+def remember_previous_pair(sender, instance, raw=False, **kwargs):
+    instance._previous_pair = None
+    if not raw and instance.pk:
+        instance._previous_pair = (
+            ItemEquivalent.objects.filter(pk=instance.pk).values_list('item_id', 'equivalent_item_id').first()
+        )
+
+
+@receiver(post_save, sender=ItemEquivalent)
+def update_equivalence_classes(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_pair', None)
+    with transaction.atomic():
+        if created or previous is None:
+            add_equivalence(instance.item_id, instance.equivalent_item_id)
+        elif previous != (instance.item_id, instance.equivalent_item_id):
+            # A classe antiga pode ter se dividido
+            refresh_classes(set(previous) | {instance.item_id, instance.equivalent_item_id})
+
+
+@receiver(post_delete, sender=ItemEquivalent)
+def split_equivalence_classes(sender, instance, **kwargs):
+    refresh_classes([instance.item_id, instance.equivalent_item_id])
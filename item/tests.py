@@ -0,0 +1,364 @@
+import importlib
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from app import querybudget
+from django.contrib.auth.models import Permission, User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook
+from .equivalence import attach_equivalents, compute_classes, rebuild_classes
+from .equivalence_import import clean_mpn, import_equivalences, read_pairs, summary
+from .models import Item, ItemEquivalent
+
+
+def user_with(*perms):
+    user = User.objects.create_user('_'.join(perms).replace('.', '_')[:150], password='senha')
+    for perm in perms:
+        app_label, codename = perm.split('.')
+        user.user_permissions.add(Permission.objects.get(content_type__app_label=app_label, codename=codename))
+    return user
+
+
+class ItemAutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.filter = Item.objects.create(mpn='3243-01', pn='FO-77', name='Filtro de óleo')
+        cls.seal = Item.objects.create(mpn='77-3243', name='Vedação')
+        cls.pump = Item.objects.create(mpn='PB-10', pn='3243-99', name='Bomba de combustível')
+        cls.viewer = user_with('item.view_item')
+
+    def search(self, term, user=None):
+        self.client.force_login(user or self.viewer)
+        response = self.client.get(reverse('item_autocomplete'), {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_mpn_and_pn_match_by_prefix(self):
+        # "77-3243" contém "3243", mas não começa com ele
+        self.assertEqual(self.search('3243'), [self.filter.pk, self.pump.pk])
+
+    def test_name_matches_anywhere(self):
+        self.assertEqual(self.search('óleo'), [self.filter.pk])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.search('fo filtro'), [self.filter.pk])
+        self.assertEqual(self.search('fo bomba'), [])
+
+    def test_inventory_form_users_can_search(self):
+        for perm in ('inventory.add_inventory', 'inventory.change_inventory'):
+            with self.subTest(perm=perm):
+                self.assertEqual(self.search('PB', user=user_with(perm)), [self.pump.pk])
+
+    def test_requires_one_of_the_permissions(self):
+        self.client.force_login(user_with('item.add_item'))
+        response = self.client.get(reverse('item_autocomplete'), {'q': 'PB'})
+        self.assertEqual(response.status_code, 403)
+
+
+class EquivalenceClassTests(TestCase):
+
+    def setUp(self):
+        self.a, self.b, self.c, self.d, self.e = [
+            Item.objects.create(mpn=f'EQ-{letter}', name=f'Item {letter}') for letter in 'ABCDE'
+        ]
+
+    def classes(self, *items):
+        values = dict(Item.objects.filter(pk__in=[item.pk for item in items]).values_list('pk', 'equivalence_class'))
+        return [values[item.pk] for item in items]
+
+    def equivalents(self, item):
+        return {other.mpn for other in Item.objects.get(pk=item.pk).all_equivalents}
+
+    def assertMatchesRebuild(self):
+        before = dict(Item.objects.values_list('pk', 'equivalence_class'))
+        self.assertEqual(rebuild_classes(), 0)
+        self.assertEqual(dict(Item.objects.values_list('pk', 'equivalence_class')), before)
+
+    def test_items_without_equivalents_have_no_class(self):
+        self.assertEqual(self.classes(self.a), [None])
+        self.assertEqual(self.equivalents(self.a), set())
+
+    def test_equivalence_is_transitive(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.c, equivalent_item=self.b)
+
+        self.assertEqual(self.classes(self.a, self.b, self.c, self.d), [self.a.pk] * 3 + [None])
+        self.assertEqual(self.equivalents(self.c), {'EQ-A', 'EQ-B'})
+        self.assertMatchesRebuild()
+
+    def test_adding_a_pair_merges_two_classes(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.d, equivalent_item=self.e)
+        ItemEquivalent.objects.create(item=self.e, equivalent_item=self.b)
+
+        self.assertEqual(self.classes(self.a, self.b, self.d, self.e), [self.a.pk] * 4)
+        self.assertEqual(self.equivalents(self.d), {'EQ-A', 'EQ-B', 'EQ-E'})
+        self.assertMatchesRebuild()
+
+    def test_deleting_a_pair_splits_the_class(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        bridge = ItemEquivalent.objects.create(item=self.b, equivalent_item=self.c)
+        ItemEquivalent.objects.create(item=self.c, equivalent_item=self.d)
+
+        bridge.delete()
+
+        self.assertEqual(self.classes(self.a, self.b, self.c, self.d), [self.a.pk, self.a.pk, self.c.pk, self.c.pk])
+        self.assertEqual(self.equivalents(self.b), {'EQ-A'})
+        self.assertMatchesRebuild()
+
+    def test_deleting_the_last_pair_clears_the_class(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b).delete()
+
+        self.assertEqual(self.classes(self.a, self.b), [None, None])
+
+    def test_changing_a_pair_refreshes_both_classes(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        pair = ItemEquivalent.objects.create(item=self.b, equivalent_item=self.c)
+
+        pair.equivalent_item = self.d
+        pair.save()
+
+        self.assertEqual(self.classes(self.a, self.b, self.c, self.d), [self.a.pk, self.a.pk, None, self.a.pk])
+        self.assertMatchesRebuild()
+
+    def test_attach_equivalents_uses_one_query(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.b, equivalent_item=self.c)
+        items = list(Item.objects.order_by('pk'))
+
+        with self.assertNumQueries(1):
+            attach_equivalents(items)
+            equivalents = {item.mpn: {other.mpn for other in item.all_equivalents} for item in items}
+
+        self.assertEqual(equivalents['EQ-A'], {'EQ-B', 'EQ-C'})
+        self.assertEqual(equivalents['EQ-E'], set())
+
+    def test_joining_two_multi_item_classes(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.d, equivalent_item=self.e)
+        ItemEquivalent.objects.create(item=self.b, equivalent_item=self.e)
+
+        self.assertEqual(self.classes(self.a, self.b, self.d, self.e), [self.a.pk] * 4)
+        self.assertMatchesRebuild()
+
+    def test_migration_computes_the_same_classes(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.b, equivalent_item=self.c)
+        ItemEquivalent.objects.create(item=self.d, equivalent_item=self.e)
+        expected = dict(Item.objects.values_list('pk', 'equivalence_class'))
+        Item.objects.update(equivalence_class=None)
+
+        migration = importlib.import_module('item.migrations.0004_item_equivalence_class')
+        apps = MigrationExecutor(connection).loader.project_state(('item', '0004_item_equivalence_class')).apps
+        migration.compute_equivalence_classes(apps, None)
+
+        self.assertEqual(dict(Item.objects.values_list('pk', 'equivalence_class')), expected)
+
+    def test_compute_classes(self):
+        self.assertEqual(compute_classes([(5, 3), (3, 9), (7, 8)]), {3: 3, 5: 3, 9: 3, 7: 7, 8: 7})
+
+    def test_item_list_loads_equivalents_in_one_query(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=self.c, equivalent_item=self.d)
+        self.client.force_login(User.objects.create_superuser('admin', password='senha'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('item_list'))
+        items = {item.mpn: {other.mpn for other in item.all_equivalents} for item in response.context['items']}
+
+        self.assertEqual(items['EQ-A'], {'EQ-B'})
+        self.assertEqual(items['EQ-E'], set())
+        equivalence_queries = [query for query in queries if 'equivalence_class" IN' in query['sql']]
+        self.assertEqual(len(equivalence_queries), 1)
+
+
+def workbook_file(rows):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(['MPN', 'Equivalente'])
+    for row in rows:
+        worksheet.append(row)
+    file = BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+class EquivalenceImportTests(TestCase):
+
+    def setUp(self):
+        self.a = Item.objects.create(mpn='IMP-A', name='A')
+        self.b = Item.objects.create(mpn='IMP-B', name='B')
+        self.c = Item.objects.create(mpn='IMP-C', name='C')
+        self.number = Item.objects.create(mpn='12345', name='Número')
+
+    def pairs(self):
+        return set(ItemEquivalent.objects.values_list('item__mpn', 'equivalent_item__mpn'))
+
+    def test_creates_pairs_in_canonical_order(self):
+        result = import_equivalences([('IMP-C', 'IMP-A'), ('IMP-B', 'IMP-C')])
+
+        self.assertEqual(result, {'created': 2, 'existing': 0, 'invalid': 0, 'missing': []})
+        self.assertEqual(self.pairs(), {('IMP-A', 'IMP-C'), ('IMP-B', 'IMP-C')})
+
+    def test_skips_existing_reversed_and_invalid_pairs(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+
+        result = import_equivalences([
+            ('IMP-A', 'IMP-B'), ('IMP-B', 'IMP-A'), ('IMP-C', 'IMP-A'), ('IMP-A', 'IMP-C'),
+            ('IMP-A', 'IMP-A'), ('', 'IMP-B'),
+        ])
+
+        self.assertEqual(result, {'created': 1, 'existing': 3, 'invalid': 2, 'missing': []})
+        self.assertEqual(ItemEquivalent.objects.count(), 2)
+
+    def test_reports_missing_mpns(self):
+        result = import_equivalences([('IMP-A', 'NOVO-2'), ('NOVO-1', 'IMP-B')])
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(result['missing'], ['NOVO-1', 'NOVO-2'])
+        self.assertIn('MPNs não cadastrados (2): NOVO-1, NOVO-2', summary(result))
+
+    def test_rebuilds_classes(self):
+        import_equivalences([('IMP-A', 'IMP-B'), ('IMP-B', 'IMP-C')])
+
+        classes = dict(Item.objects.values_list('mpn', 'equivalence_class'))
+        self.assertEqual(classes, {'IMP-A': self.a.pk, 'IMP-B': self.a.pk, 'IMP-C': self.a.pk, '12345': None})
+
+    def test_merges_only_the_touched_classes(self):
+        d = Item.objects.create(mpn='IMP-D', name='D')
+        e = Item.objects.create(mpn='IMP-E', name='E')
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+        ItemEquivalent.objects.create(item=d, equivalent_item=e)
+
+        with CaptureQueriesContext(connection) as queries:
+            import_equivalences([('IMP-C', 'IMP-B')])
+
+        classes = dict(Item.objects.values_list('mpn', 'equivalence_class'))
+        self.assertEqual([classes[mpn] for mpn in ('IMP-A', 'IMP-B', 'IMP-C')], [self.a.pk] * 3)
+        self.assertEqual([classes[mpn] for mpn in ('IMP-D', 'IMP-E')], [d.pk] * 2)
+        self.assertEqual(rebuild_classes(), 0)
+        # Nenhuma leitura de todos os pares ou de todos os itens
+        reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(all('WHERE' in sql for sql in reads))
+
+    def test_counts_only_inserted_rows(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+
+        # Simula o par criado por outra importação depois da leitura dos existentes
+        with mock.patch('item.equivalence_import._existing_pairs', return_value=set()):
+            result = import_equivalences([('IMP-A', 'IMP-B'), ('IMP-A', 'IMP-C')])
+
+        self.assertEqual((result['created'], result['existing']), (1, 1))
+        self.assertEqual(self.pairs(), {('IMP-A', 'IMP-B'), ('IMP-A', 'IMP-C')})
+
+    def test_command_rejects_unreadable_file(self):
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as file:
+            file.write(b'isto nao e uma planilha')
+            file.flush()
+            with self.assertRaises(CommandError):
+                call_command('import_equivalences', file.name, stdout=StringIO())
+
+    def test_command_imports(self):
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as file:
+            file.write(workbook_file([['IMP-A', 'IMP-B']]).getvalue())
+            file.flush()
+            output = StringIO()
+            call_command('import_equivalences', file.name, stdout=output)
+
+        self.assertIn('Equivalências criadas: 1', output.getvalue())
+
+    def test_clean_mpn(self):
+        self.assertEqual(clean_mpn(12345.0), '12345')
+        self.assertEqual(clean_mpn(1.5), '1.5')
+        self.assertEqual(clean_mpn('  IMP-A '), 'IMP-A')
+        self.assertEqual(clean_mpn(None), '')
+
+    def test_read_pairs(self):
+        file = workbook_file([['IMP-A', 'IMP-B', 'IMP-C'], [12345, None, 'IMP-A'], [None, 'IMP-B']])
+
+        self.assertEqual(list(read_pairs(file)), [
+            ('IMP-A', 'IMP-B'), ('IMP-A', 'IMP-C'), ('12345', 'IMP-A'),
+        ])
+
+    def test_view_imports_the_spreadsheet(self):
+        self.client.force_login(user_with('item.add_itemequivalent', 'item.view_itemequivalent'))
+        file = workbook_file([['IMP-A', 'IMP-B'], ['IMP-C', 'NOVO-1']])
+        file.name = 'equivalencias.xlsx'
+
+        response = self.client.post(reverse('item_import_equivalent'), {'file': file}, follow=True)
+
+        self.assertRedirects(response, reverse('item_list_equivalent'))
+        self.assertEqual(self.pairs(), {('IMP-A', 'IMP-B')})
+        self.assertIn('NOVO-1', str(list(response.context['messages'])[0]))
+
+    def test_view_rejects_unknown_sheet(self):
+        self.client.force_login(user_with('item.add_itemequivalent'))
+        file = workbook_file([['IMP-A', 'IMP-B']])
+        file.name = 'equivalencias.xlsx'
+
+        response = self.client.post(reverse('item_import_equivalent'), {'file': file, 'sheet': 'Outra'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sheet', response.context['form'].errors)
+        self.assertFalse(ItemEquivalent.objects.exists())
+
+
+class ItemEquivalentCreateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.a = Item.objects.create(mpn='CR-A', name='A')
+        cls.b = Item.objects.create(mpn='CR-B', name='B')
+        cls.user = user_with('item.add_itemequivalent', 'item.view_itemequivalent')
+
+    def post(self, item, equivalent_item):
+        self.client.force_login(self.user)
+        return self.client.post(reverse('item_create_equivalent'), {'item': item.pk, 'equivalent_item': equivalent_item.pk})
+
+    def test_creates_the_pair_in_canonical_order(self):
+        response = self.post(self.b, self.a)
+
+        self.assertRedirects(response, reverse('item_list_equivalent'))
+        self.assertEqual(list(ItemEquivalent.objects.values_list('item', 'equivalent_item')), [(self.a.pk, self.b.pk)])
+
+    def test_stays_within_its_budget(self):
+        self.client.force_login(self.user)
+        with querybudget.query_budget('item_create_equivalent'):
+            response = self.client.post(reverse('item_create_equivalent'), {'item': self.a.pk, 'equivalent_item': self.b.pk})
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_rejects_self_equivalence_with_one_message(self):
+        response = self.post(self.a, self.a)
+
+        self.assertEqual(response.context['form'].non_field_errors(), ['Um item não pode ser equivalente a ele mesmo.'])
+
+    def test_rejects_the_reversed_pair(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+
+        response = self.post(self.b, self.a)
+
+        self.assertEqual(response.context['form'].non_field_errors(), ['Essa equivalência já existe.'])
+
+    def test_duplicate_saved_concurrently(self):
+        ItemEquivalent.objects.create(item=self.a, equivalent_item=self.b)
+
+        # Simula o par gravado por outro usuário depois da validação
+        with mock.patch.object(ItemEquivalent, 'validate_constraints'):
+            response = self.post(self.a, self.b)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].non_field_errors(), ['Essa equivalência já existe.'])
+        self.assertEqual(ItemEquivalent.objects.count(), 1)
+
+    def test_database_rejects_reversed_order(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ItemEquivalent.objects.bulk_create([ItemEquivalent(item=self.b, equivalent_item=self.a)])
@@ -7,9 +7,11 @@ urlpatterns = [
     path('item/<int:pk>/details/', views.ItemDetailView.as_view(), name='item_detail'),
     path('item/<int:pk>/update/', views.ItemUpdateView.as_view(), name='item_update'),
     path('item/<int:pk>/delete/', views.ItemDeleteView.as_view(), name='item_delete'),
+    path('item/autocomplete/', views.ItemAutocompleteView.as_view(), name='item_autocomplete'),
     #Item Equivalent urls:
     path('item/equivalent/list/', views.ItemEquivalentListView.as_view(), name='item_list_equivalent'),
     path('item/equivalent/create/', views.ItemEquivalentCreateView.as_view(), name='item_create_equivalent'),
+    path('item/equivalent/import/', views.ItemEquivalentImportView.as_view(), name='item_import_equivalent'),
     path('item/<int:pk>/equivalent/delete/', views.ItemEquivalentDeleteView.as_view(), name='item_delete_equivalent'),
 
 ]
\ No newline at end of file
@@ -1,17 +1,22 @@
 from django.urls import reverse_lazy
-from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView
+from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView, FormView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from app.autocomplete import AutocompleteView
+from app.pagination import KeysetPaginationMixin
 from . import forms
 from . import models
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Q, Value, When
 from django.contrib import messages
 from django.db.models.deletion import ProtectedError
 from django.shortcuts import redirect
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from openpyxl.utils.exceptions import InvalidFileException
+from zipfile import BadZipFile
+from .equivalence import attach_equivalents
+from .equivalence_import import import_equivalences, read_pairs, summary
 
 
-
-class ItemListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class ItemListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Item
     template_name = 'item_list.html'
     context_object_name = 'items'
@@ -33,6 +38,12 @@ class ItemListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
 
         return queryset
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Equivalentes (classe inteira) de todos os itens da página em uma consulta
+        attach_equivalents(context['object_list'])
+        return context
+
 
 class ItemCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     model = models.Item
@@ -90,8 +101,9 @@ class ItemDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
 
 # ----------------------ITEM EQUIVALENTS VIEWS---------------------------------------
 
-class ItemEquivalentListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class ItemEquivalentListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.ItemEquivalent
+    queryset = models.ItemEquivalent.objects.select_related('item', 'equivalent_item')
     template_name = 'item_equivalent_list.html'
     context_object_name = 'items'
     paginate_by = 10
@@ -120,20 +132,41 @@ class ItemEquivalentCreateView(LoginRequiredMixin, PermissionRequiredMixin, Crea
     form_class = forms.ItemEquivalentForm
     success_url = reverse_lazy('item_list_equivalent')
     permission_required = 'item.add_itemequivalent'
-    
-
-    class ItemEquivalentCreateView(CreateView):
-        model = models.ItemEquivalent
-        template_name = 'item_equivalent_create.html'
-        form_class = forms.ItemEquivalentForm
-        success_url = reverse_lazy('item_list_equivalent')
 
-        def form_valid(self, form):
-            try:
+    def form_valid(self, form):
+        # A validação do formulário já acusa pares repetidos; isto cobre o
+        # mesmo par gravado por outro usuário entre a validação e o INSERT
+        try:
+            with transaction.atomic():
                 return super().form_valid(form)
-            except IntegrityError as e:
-                messages.error(self.request, f"Erro ao salvar: {e}")
-                return self.form_invalid(form)
+        except IntegrityError:
+            form.add_error(None, 'Essa equivalência já existe.')
+            return self.form_invalid(form)
+
+
+class ItemEquivalentImportView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
+    """Importa equivalências em lote de uma planilha (item/equivalence_import.py)."""
+    template_name = 'item_equivalent_import.html'
+    form_class = forms.ItemEquivalentImportForm
+    success_url = reverse_lazy('item_list_equivalent')
+    permission_required = 'item.add_itemequivalent'
+
+    def form_valid(self, form):
+        sheet = form.cleaned_data['sheet'] or None
+        try:
+            result = import_equivalences(read_pairs(form.cleaned_data['file'], sheet))
+        except KeyError:
+            form.add_error('sheet', f'Aba {sheet} não encontrada.')
+            return self.form_invalid(form)
+        except (InvalidFileException, BadZipFile):
+            form.add_error('file', 'Não foi possível ler a planilha.')
+            return self.form_invalid(form)
+
+        if result['missing']:
+            messages.warning(self.request, summary(result))
+        else:
+            messages.success(self.request, summary(result))
+        return super().form_valid(form)
 
 
 class ItemEquivalentDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
@@ -143,4 +176,28 @@ class ItemEquivalentDeleteView(LoginRequiredMixin, PermissionRequiredMixin, Dele
     permission_required = 'item.delete_itemequivalent'
 
 
+class ItemAutocompleteView(AutocompleteView):
+    permission_required = (
+        'item.view_item', 'inflow.add_inflow', 'inventory.add_inventory', 'inventory.change_inventory',
+        'order.add_orderitem', 'order.change_orderitem',
+    )
+
+    def get_queryset(self, term):
+        queryset = models.Item.objects.only('pk', 'name', 'mpn')
 
+        # Cada palavra precisa iniciar o MPN ou o PN, ou aparecer no nome. No
+        # PostgreSQL os três filtros usam índices (item/migrations/0007):
+        # prefixo para MPN/PN e trigramas para o nome
+        for token in term.split():
+            queryset = queryset.filter(
+                Q(mpn__istartswith=token) | Q(pn__istartswith=token) | Q(name__icontains=token)
+            )
+
+        # MPN/PN que começam com o texto vêm primeiro
+        return queryset.annotate(
+            match=Case(
+                When(Q(mpn__istartswith=term) | Q(pn__istartswith=term), then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('match', 'mpn', 'pk')
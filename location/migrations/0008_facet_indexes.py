@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0007_alter_locationsite_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['section', 'shelf'], name='location_section_shelf_idx'),
+        ),
+    ]
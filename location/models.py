@@ -23,7 +23,11 @@ class Location(models.Model):
 
     class Meta:
         ordering = ['section']
-        
+
+        indexes = [
+            models.Index(fields=['section', 'shelf'], name='location_section_shelf_idx'),
+        ]
+
         constraints = [
             models.UniqueConstraint(
                 fields=['om', 'section', 'shelf', 'case', 'item_number'],
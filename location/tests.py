@@ -0,0 +1,31 @@
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+from .models import Location, LocationSite
+
+
+class LocationAutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        cls.location = Location.objects.create(om=site, section='Hangar', shelf=3)
+
+    def login_with(self, perm):
+        user = User.objects.create_user(perm.replace('.', '_'), password='senha')
+        app_label, codename = perm.split('.')
+        user.user_permissions.add(Permission.objects.get(content_type__app_label=app_label, codename=codename))
+        self.client.force_login(user)
+
+    def test_inventory_create_users_can_search(self):
+        # O formulário de criação de inventário usa este endpoint
+        self.login_with('inventory.add_inventory')
+        response = self.client.get(reverse('location_autocomplete'), {'q': 'hangar 3'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.location.pk])
+
+    def test_requires_one_of_the_permissions(self):
+        self.login_with('item.view_item')
+        response = self.client.get(reverse('location_autocomplete'))
+        self.assertEqual(response.status_code, 403)
@@ -8,4 +8,5 @@ urlpatterns = [
     path('location/<int:pk>/details/', views.LocationDetailView.as_view(), name='location_detail'),
     path('locaiton;<int:pk>/update/', views.LocationUpdateView.as_view(), name='location_update'),
     path('location/<int:pk>/delete/', views.LocationDeleteView.as_view(), name='location_delete'),
+    path('location/autocomplete/', views.LocationAutocompleteView.as_view(), name='location_autocomplete'),
 ]
\ No newline at end of file
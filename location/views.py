@@ -1,5 +1,7 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from app.autocomplete import AutocompleteView
+from app.pagination import KeysetPaginationMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from . import models
@@ -7,7 +9,7 @@ from django.db.models import Q
 from . import forms
 
 
-class LocationListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class LocationListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Location
     template_name = 'location_list.html'
     context_object_name = 'locations'
@@ -64,3 +66,17 @@ class LocationDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView
     success_url = reverse_lazy('location_list')
     permission_required = 'location.delete_location'
 
+
+class LocationAutocompleteView(AutocompleteView):
+    permission_required = ('location.view_location', 'inflow.add_inflow', 'inventory.add_inventory', 'inventory.change_inventory')
+
+    def get_queryset(self, term):
+        queryset = models.Location.objects.select_related('om')
+
+        for token in term.split():
+            condition = Q(om__location_site__icontains=token) | Q(om__location_sub_site__icontains=token) | Q(section__icontains=token)
+            if token.isdigit():
+                condition |= Q(shelf=token) | Q(item_number=token) | Q(case=token)
+            queryset = queryset.filter(condition)
+
+        return queryset.order_by('om__location_site', 'section', 'shelf', 'item_number', 'case', 'pk')
@@ -1,4 +1,5 @@
 from django import forms
+from app.autocomplete import AutocompleteSelect
 from . import models
 from django.core.exceptions import ValidationError
 
@@ -68,8 +69,12 @@ class OrderItemForm(forms.ModelForm):
         ]
 
         widgets = {
-            'inventory_item': forms.Select(attrs={'class': 'form-control select2'}),
-            'item_item': forms.Select(attrs={'class': 'form-control select2'}),
+            'inventory_item': AutocompleteSelect(
+                'inventory_autocomplete',
+                attrs={'class': 'form-control select2'},
+                select_related=('item', 'location__om'),
+            ),
+            'item_item': AutocompleteSelect('item_autocomplete', attrs={'class': 'form-control select2'}),
             'operator': forms.TextInput(attrs={'class': 'form-control'}),
             'aircraft': forms.Select(attrs={'class': 'form-control'}),
             'aircraft_destination': forms.Select(attrs={'class': 'form-control'}),
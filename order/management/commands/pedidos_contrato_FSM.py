@@ -5,6 +5,7 @@ from datetime import datetime
 
 from order.models import Order, OrderItem
 from item.models import Item
+from item.equivalence_import import import_equivalences, summary
 from aircraft.models import Aircraft
 from django.contrib.auth.models import User
 
@@ -65,6 +66,9 @@ class Command(BaseCommand):
         updated_orders = 0
         created_items = 0
 
+        # Pares (MPN, PN alternativo), importados em lote ao final
+        equivalence_pairs = []
+
         # Conversões
         def to_date(v):
             if not v:
@@ -157,6 +161,8 @@ class Command(BaseCommand):
             sn_recebido = ws.cell(row=row, column=COL_SN_RECEBIDO).value
             venc_raw = ws.cell(row=row, column=COL_VENC).value
             dest_anv = ws.cell(row=row, column=COL_DEST_ANV).value
+            pn_alt1 = ws.cell(row=row, column=COL_PN_ALT1).value
+            pn_alt2 = ws.cell(row=row, column=COL_PN_ALT2).value
             contrato_ant_raw = ws.cell(row=row, column=COL_CONTRATO_ANT).value
             dpe = ws.cell(row=row, column=COL_DPE).value
             status_raw = ws.cell(row=row, column=COL_STATUS).value
@@ -298,6 +304,8 @@ class Command(BaseCommand):
                 if changed:
                     item_obj.save()
 
+                equivalence_pairs += [(item_obj.mpn, alt) for alt in (pn_alt1, pn_alt2) if alt]
+
 
             # --------------------------
             # Campos adicionais
@@ -347,6 +355,10 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stderr.write(f"Erro ao criar OrderItem na linha {row}: {str(e)}")
 
+        # Equivalências das colunas de PN alternativo
+        if equivalence_pairs:
+            self.stdout.write(summary(import_equivalences(equivalence_pairs)))
+
         # Final
         self.stdout.write(
             self.style.SUCCESS(
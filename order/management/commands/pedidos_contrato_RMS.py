@@ -5,6 +5,7 @@ from datetime import datetime
 
 from order.models import Order, OrderItem
 from item.models import Item
+from item.equivalence_import import import_equivalences, summary
 from aircraft.models import Aircraft
 from django.contrib.auth.models import User
 
@@ -94,6 +95,9 @@ class Command(BaseCommand):
         created_items = 0
         errors = 0
 
+        # Pares (MPN, PN alternativo), importados em lote ao final
+        equivalence_pairs = []
+
         # Funções auxiliares
         def to_date(v):
             """Converte diversos formatos para date"""
@@ -386,6 +390,8 @@ class Command(BaseCommand):
                         if item_changed:
                             item_obj.save()
 
+                        equivalence_pairs += [(item_obj.mpn, alt) for alt in (pn_alt1, pn_alt2) if alt]
+
                 # Campos adicionais
                 contract_old = parse_boolean(contrato_ant_raw)
                 tsn_val = to_decimal(tsn)
@@ -432,6 +438,10 @@ class Command(BaseCommand):
                     self.style.ERROR(f"Erro na linha {row}: {str(e)}")
                 )
 
+        # Equivalências das colunas de PN alternativo
+        if equivalence_pairs:
+            self.stdout.write(summary(import_equivalences(equivalence_pairs)))
+
         # Relatório final
         self.stdout.write(
             self.style.SUCCESS(
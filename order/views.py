@@ -1,5 +1,6 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from app.pagination import KeysetPaginationMixin
 from django.views import View
 from django.db.models import Q
 from . import models
@@ -13,14 +14,16 @@ from openpyxl import load_workbook
 from django.http import FileResponse
 from io import BytesIO
 from datetime import datetime
+from item.equivalence import attach_equivalents
 
 
-class OrderListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class OrderListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Order
     template_name = 'order_list.html'
     context_object_name = 'orders'
     paginate_by = 10
     permission_required = 'order.view_order'
+    count_mode = 'approximate'
 
     def get_queryset(self):
         queryset = models.Order.objects.all().prefetch_related(
@@ -288,6 +291,12 @@ class OrderExportArchive(LoginRequiredMixin, PermissionRequiredMixin, View):
         # Começar na linha 2 (assumindo que linha 1 é cabeçalho)
         linha = 2
 
+        # PN alternativo (colunas 19 e 20): equivalentes de todas as linhas em uma consulta
+        order_items = list(order_items)
+        attach_equivalents(
+            item.inventory_item.item if item.inventory_item else item.item_item for item in order_items
+        )
+
         # Listagem dos itens
         for item in order_items:
             # Coluna 1: Solicitante
@@ -360,8 +369,7 @@ class OrderExportArchive(LoginRequiredMixin, PermissionRequiredMixin, View):
             elif item.item_item:
                 item_alt = item.item_item
 
-            if item_alt:
-                equivalent = list(item_alt.all_equivalents)
+            equivalent = sorted(item_alt.all_equivalents, key=lambda eq: eq.mpn) if item_alt else []
 
             ws.cell(row=linha, column=19, value=equivalent[0].mpn if len(equivalent) > 0  else '')
             ws.cell(row=linha, column=20, value=equivalent[1].mpn if len(equivalent) > 1  else '')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_inventory_status_flags'),
+        ('location', '0007_alter_locationsite_type'),
+        ('outflow', '0003_alter_outflow_created_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outflow',
+            index=models.Index(fields=['created_at'], name='outflow_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_hot_path_indexes'),
+        ('location', '0008_facet_indexes'),
+        ('outflow', '0004_outflow_outflow_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outflow',
+            index=models.Index(fields=['inventory_item', 'created_at'], name='outflow_inventory_created_idx'),
+        ),
+    ]
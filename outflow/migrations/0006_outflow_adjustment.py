@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outflow', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outflow',
+            name='adjustment',
+            field=models.BooleanField(default=False, verbose_name='Ajuste de estoque'),
+        ),
+    ]
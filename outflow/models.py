@@ -1,10 +1,17 @@
-from django.db import models
+from django.db import models, transaction
 from inventory.models import Inventory
 from location.models import Location
 from django.contrib.auth.models import User
+from reports.models import DailyMovement, RollupQuerySet, local_day
 
 
 class Outflow(models.Model):
+    ROLLUP_DIRECTION = DailyMovement.OUTFLOW
+    ROLLUP_FIELDS = (
+        'inventory_item', 'inventory_item_id', 'claimant', 'claimant_id', 'adjustment', 'quantity', 'created_at',
+    )
+    ROLLUP_RELATED = ('inventory_item', 'claimant')
+
     inventory_item = models.ForeignKey(Inventory, on_delete=models.PROTECT, related_name='inventory_items_outflows')
     quantity = models.IntegerField(default=1)
     description = models.TextField(max_length=255, null=True, blank=True)
@@ -13,9 +20,40 @@ class Outflow(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.PROTECT, null=True, blank=True)
     claimant = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='location_outflows')
     reason = models.CharField(max_length=30, null=True, blank=True)
+    # Ajuste de estoque (inventory/bulk.py): o solicitante é a própria
+    # localização do estoque, e a saída não é consumo de nenhuma OM
+    adjustment = models.BooleanField("Ajuste de estoque", default=False)
+
+    objects = RollupQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='outflow_created_at_idx'),
+            models.Index(fields=['inventory_item', 'created_at'], name='outflow_inventory_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.inventory_item}'
+
+    def rollup_key(self):
+        # Saídas são consolidadas pela OM solicitante (claimant); ajustes de
+        # estoque ficam sem OM
+        return (
+            local_day(self.created_at),
+            self.inventory_item.item_id,
+            None if self.adjustment else self.claimant.om_id,
+        )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = Outflow.objects.filter(pk=self.pk).select_related(
+                'inventory_item', 'claimant'
+            ).first() if self.pk else None
+            super().save(*args, **kwargs)
+            DailyMovement.replace(previous, self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            DailyMovement.apply(self, sign=-1)
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,44 @@
+from django.test import TestCase
+from inventory.models import Inventory
+from item.models import Item
+from location.models import Location, LocationSite
+from reports.models import DailyMovement
+from reports.rollup import rebuild_daily_movements
+from .forms import OutflowForm
+from .models import Outflow
+
+
+class OutflowFormTests(TestCase):
+
+    def test_claimant_is_required(self):
+        form = OutflowForm(data={'quantity': 1, 'reason': 'Manutenção'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('claimant', form.errors)
+
+
+class OutflowRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = LocationSite.objects.create(location_site='1bavex', location_sub_site='spu', type='internal')
+        cls.location = Location.objects.create(om=cls.site, section='S1', shelf=1)
+        cls.inventory = Inventory.objects.create(item=Item.objects.create(mpn='ADJ-1', name='Item'), location=cls.location, quantity=10)
+
+    def rows(self):
+        return set(DailyMovement.objects.values_list('location_site_id', 'quantity', 'movements'))
+
+    def test_adjustments_are_rolled_up_without_site(self):
+        # Um motivo digitado igual ao dos ajustes em lote não muda nada: só a marcação conta
+        Outflow.objects.create(inventory_item=self.inventory, claimant=self.location, quantity=3, adjustment=True)
+        Outflow.objects.create(inventory_item=self.inventory, claimant=self.location, quantity=2, reason='Ajuste em lote')
+
+        incremental = self.rows()
+        self.assertEqual(incremental, {(None, 3, 1), (self.site.pk, 2, 1)})
+        rebuild_daily_movements()
+        self.assertEqual(self.rows(), incremental)
+
+    def test_toggling_adjustment_moves_the_contribution(self):
+        outflow = Outflow.objects.create(inventory_item=self.inventory, claimant=self.location, quantity=4)
+        Outflow.objects.filter(pk=outflow.pk).update(adjustment=True)
+
+        self.assertEqual(self.rows(), {(None, 4, 1), (self.site.pk, 0, 0)})
@@ -1,90 +1,46 @@
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.views.generic import ListView, DetailView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from app.pagination import KeysetPaginationMixin
+from reports.filters import MovementFilter
 from . import models
 from inventory.models import Inventory
 from django.contrib import messages
-from datetime import datetime
 from . import forms
 from location.models import Location
 from django.shortcuts import render, redirect
 from django.shortcuts import get_object_or_404
 
 
-class OutflowListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+# Campos pesquisados pela busca textual da lista
+SEARCH_FIELDS = ('inventory_item__item__name', 'inventory_item__item__mpn', 'inventory_item__item__pn', 'description')
+
+
+class OutflowListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = models.Outflow
+    # Cada linha exibe o estoque (item e localização) e o requerente
+    queryset = models.Outflow.objects.select_related(
+        'inventory_item__item', 'inventory_item__location__om', 'claimant__om',
+    )
     template_name = 'outflow_list.html'
     context_object_name = 'outflows'
     paginate_by = 10
     permission_required = 'outflow.view_outflow'
+    count_mode = 'approximate'
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Filtro de busca por texto
-        search = self.request.GET.get('search', '').strip()
-        if search:
-            queryset = queryset.filter(
-                Q(inventory_item__item__name__icontains=search) |
-                Q(inventory_item__item__mpn__icontains=search) |
-                Q(inventory_item__item__pn__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
-        # Filtro por data inicial
-        date_from = self.request.GET.get('date_from')
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_from_parsed)
-            except ValueError:
-                messages.error(self.request, 'Data inicial inválida.')
-        
-        # Filtro por data final
-        date_to = self.request.GET.get('date_to')
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_to_parsed)
-            except ValueError:
-                messages.error(self.request, 'Data final inválida.')
-        
-        # Validação: data inicial não pode ser maior que data final
-        if date_from and date_to:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                
-                if date_from_parsed > date_to_parsed:
-                    messages.error(self.request, 'A data inicial não pode ser maior que a data final.')
-                    # Remove os filtros inválidos
-                    queryset = super().get_queryset()
-                    if search:
-                        queryset = queryset.filter(
-                            Q(inventory_item__item__name__icontains=search) |
-                            Q(inventory_item__item__mpn__icontains=search) |
-                            Q(inventory_item__item__part_number__icontains=search) |
-                            Q(description__icontains=search)
-                        )
-            except ValueError:
-                pass
-        
-        return queryset.distinct()
-    
+        # Busca e período interpretados uma única vez; o paginador conta o
+        # mesmo queryset quando o template exibe o total
+        self.filters = MovementFilter(self.request.GET, SEARCH_FIELDS)
+        self.filters.add_messages(self.request)
+        return self.filters.apply(super().get_queryset())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
+
         # Adiciona informações sobre os filtros ativos
-        context['has_filters'] = bool(
-            self.request.GET.get('search') or 
-            self.request.GET.get('date_from') or 
-            self.request.GET.get('date_to')
-        )
-        
-        # Conta total de resultados
-        context['total_count'] = self.get_queryset().count()
-        
+        context['has_filters'] = self.filters.has_filters
+
         return context
 
 
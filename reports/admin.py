@@ -1,3 +1,17 @@
 from django.contrib import admin
+from . import models
 
-# Register your models here.
+
+class DailyMovementAdmin(admin.ModelAdmin):
+    list_display = ('day', 'direction', 'item', 'location_site', 'quantity', 'movements')
+    list_filter = ('direction', 'day')
+
+
+admin.site.register(models.DailyMovement, DailyMovementAdmin)
+
+
+class StockCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('taken_at', 'created_at')
+
+
+admin.site.register(models.StockCheckpoint, StockCheckpointAdmin)
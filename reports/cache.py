@@ -0,0 +1,110 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from app import metrics
+
+
+# Séries de movimentação: o consolidado acompanha Inflow/Outflow e os filtros
+# por kanban/OM consultam Inventory
+MOVEMENT_SERIES_DEPENDENCIES = ['inventory.inventory', 'inflow.inflow', 'outflow.outflow']
+
+GENERATION_KEY = 'dashboard:generation:{}'
+HITS_KEY = 'dashboard:hits'
+MISSES_KEY = 'dashboard:misses'
+
+
+def _incr(key):
+    """
+    Incrementa um contador no cache. Se a chave não existir (cache limpo ou
+    expurgado), recomeça a partir do timestamp atual em milissegundos para que
+    a nova geração nunca coincida com uma geração antiga ainda em cache.
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        value = int(time.time() * 1000)
+        cache.set(key, value, timeout=None)
+        return value
+
+
+def _count(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def bump_generation(label):
+    """Invalida as entradas em cache que dependem do modelo `label` (app_label.model_name)."""
+    return _incr(GENERATION_KEY.format(label))
+
+
+def get_generations(labels):
+    keys = [GENERATION_KEY.format(label) for label in labels]
+    values = cache.get_many(keys)
+
+    generations = []
+    for label, key in zip(labels, keys):
+        generation = values.get(key)
+        if generation is None:
+            generation = bump_generation(label)
+        generations.append(generation)
+
+    return generations
+
+
+def versioned_key(name, labels, *parts):
+    generations = '-'.join(str(g) for g in get_generations(labels))
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{name}:{generations}:{suffix}'
+
+
+def get_or_build(name, labels, builder, *parts, timeout=None):
+    """
+    Retorna o valor em cache para `name` ou o constrói com `builder()`.
+
+    A chave inclui a geração de cada modelo em `labels`, portanto qualquer
+    gravação nesses modelos torna a entrada antiga inalcançável. `timeout`
+    padrão: DASHBOARD_CACHE_TIMEOUT.
+    """
+    key = versioned_key(name, labels, *parts)
+    value = cache.get(key)
+
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+
+    _count(MISSES_KEY)
+    value = builder()
+    cache.set(key, value, timeout=settings.DASHBOARD_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+def get_movement_series(start, end, granularity='day', item=None, kanban=None, site=None):
+    """Versão em cache de `app.metrics.get_movement_series`."""
+    return get_or_build(
+        'movement_series',
+        MOVEMENT_SERIES_DEPENDENCIES,
+        lambda: metrics.get_movement_series(start, end, granularity, item, kanban, site),
+        start.isoformat(),
+        end.isoformat(),
+        granularity,
+        item or '',
+        kanban or '',
+        site or '',
+    )
+
+
+def get_stats():
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
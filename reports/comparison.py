@@ -0,0 +1,65 @@
+from django.utils import timezone
+from app import metrics
+from . import cache
+
+
+# Limites aceitos pelo relatório comparativo mensal
+DEFAULT_MONTHS = 6
+MAX_MONTHS = 36
+DEFAULT_TOP = 10
+MAX_TOP = 50
+
+
+def _months_ago(day, months):
+    month_index = day.year * 12 + day.month - 1 - months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def _change(current, previous):
+    if not previous:
+        return None
+    return round((current - previous) * 100 / previous, 1)
+
+
+def _build(start, end, top):
+    series = metrics.get_movement_series(start, end, 'month')
+
+    months = []
+    previous = None
+    for label, inflows, outflows, net in zip(series['labels'], series['inflows'], series['outflows'], series['net']):
+        months.append({
+            "label": label,
+            "inflows": inflows,
+            "outflows": outflows,
+            "net": net,
+            "inflows_change": _change(inflows, previous['inflows']) if previous else None,
+            "outflows_change": _change(outflows, previous['outflows']) if previous else None,
+        })
+        previous = months[-1]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "months": months,
+        "top_movers": metrics.get_top_movers(start, end, top),
+    }
+
+
+def monthly_comparison(months=DEFAULT_MONTHS, top=DEFAULT_TOP, today=None):
+    """
+    Entradas, saídas e saldo de cada um dos últimos `months` meses (incluindo o
+    atual), com a variação sobre o mês anterior, e os `top` itens mais
+    movimentados no período. Duas consultas agrupadas sobre o consolidado
+    diário, mantidas em cache até a próxima movimentação.
+    """
+    end = today or timezone.localdate()
+    start = _months_ago(end, months - 1)
+
+    return cache.get_or_build(
+        'monthly_comparison',
+        cache.MOVEMENT_SERIES_DEPENDENCIES,
+        lambda: _build(start, end, top),
+        start.isoformat(),
+        end.isoformat(),
+        top,
+    )
@@ -0,0 +1,61 @@
+from datetime import datetime, time, timedelta
+from django.contrib import messages
+from django.db.models import Q
+from django.utils import timezone
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class MovementFilter:
+    """
+    Filtros das listas de entradas e saídas (busca e período), lidos uma única
+    vez do GET. O período é aplicado como intervalo sobre created_at, para
+    aproveitar o índice da coluna.
+    """
+
+    def __init__(self, params, search_fields):
+        self.search = params.get('search', '').strip()
+        self.search_fields = search_fields
+        self.errors = []
+
+        self.date_from = self._parse_date(params.get('date_from', ''), 'Data inicial inválida.')
+        self.date_to = self._parse_date(params.get('date_to', ''), 'Data final inválida.')
+
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            self.errors.append('A data inicial não pode ser maior que a data final.')
+            self.date_from = self.date_to = None
+
+    def _parse_date(self, value, error):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            self.errors.append(error)
+            return None
+
+    @property
+    def has_filters(self):
+        return bool(self.search or self.date_from or self.date_to)
+
+    def add_messages(self, request):
+        for error in self.errors:
+            messages.error(request, error)
+
+    def apply(self, queryset):
+        if self.search:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f'{field}__icontains': self.search})
+            queryset = queryset.filter(condition)
+
+        if self.date_from:
+            queryset = queryset.filter(created_at__gte=_start_of_day(self.date_from))
+
+        if self.date_to:
+            queryset = queryset.filter(created_at__lt=_start_of_day(self.date_to + timedelta(days=1)))
+
+        return queryset
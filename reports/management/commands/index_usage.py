@@ -0,0 +1,119 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+UNUSED_INDEXES = """
+    SELECT s.relname, s.indexrelname, s.idx_scan, pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.relname = ANY(%s) AND s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+INDEX_USAGE = """
+    SELECT s.relname, s.indexrelname, s.idx_scan, s.idx_tup_read, pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    WHERE s.relname = ANY(%s)
+    ORDER BY s.relname, s.idx_scan DESC
+"""
+
+# Tabelas grandes lidas mais vezes por varredura sequencial que por índice
+SEQUENTIAL_SCANS = """
+    SELECT relname, seq_scan, COALESCE(idx_scan, 0), n_live_tup, seq_tup_read / GREATEST(seq_scan, 1)
+    FROM pg_stat_user_tables
+    WHERE relname = ANY(%s) AND n_live_tup >= %s AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+"""
+
+STATS_RESET = "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+
+
+class Command(BaseCommand):
+    help = (
+        "Relata o uso dos índices e tabelas com muitas varreduras sequenciais (estatísticas do "
+        "PostgreSQL) e chaves estrangeiras sem índice"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=10000,
+            help='Tamanho mínimo (linhas) para apontar varreduras sequenciais (padrão: 10000)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Lista o uso de todos os índices, não só os sem uso'
+        )
+
+    def handle(self, *args, **options):
+        tables = sorted({model._meta.db_table for model in apps.get_models() if model._meta.managed})
+
+        if connection.vendor == 'postgresql':
+            self._statistics(tables, options)
+        else:
+            self.stdout.write(self.style.WARNING(
+                "Estatísticas de uso de índices disponíveis apenas no PostgreSQL"
+            ))
+
+        self._unindexed_foreign_keys()
+
+    def _rows(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _statistics(self, tables, options):
+        reset = self._rows(STATS_RESET, [])
+        if reset and reset[0][0]:
+            self.stdout.write(f"Estatísticas desde {reset[0][0]:%d/%m/%Y %H:%M}")
+
+        if options['all']:
+            self.stdout.write(self.style.MIGRATE_HEADING("Uso dos índices"))
+            self.stdout.write(f"{'Tabela':<32} {'Índice':<45} {'Leituras':>10} {'Linhas lidas':>14} {'Tamanho':>10}")
+            for table, index, scans, tuples, size in self._rows(INDEX_USAGE, [tables]):
+                self.stdout.write(f"{table:<32} {index:<45} {scans:>10} {tuples:>14} {size:>10}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Índices sem uso (exceto únicos e chaves primárias)"))
+        rows = self._rows(UNUSED_INDEXES, [tables])
+        for table, index, _, size in rows:
+            self.stdout.write(f"  {table}.{index} ({size})")
+        if not rows:
+            self.stdout.write("  Nenhum")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Tabelas com mais varreduras sequenciais que por índice (>= {options['min_rows']} linhas)"
+        ))
+        rows = self._rows(SEQUENTIAL_SCANS, [tables, options['min_rows']])
+        for table, seq_scans, idx_scans, live, per_scan in rows:
+            self.stdout.write(
+                f"  {table}: {seq_scans} sequenciais x {idx_scans} por índice, "
+                f"{live} linhas, {per_scan} linhas lidas por varredura"
+            )
+        if not rows:
+            self.stdout.write("  Nenhuma")
+
+    def _unindexed_foreign_keys(self):
+        self.stdout.write(self.style.MIGRATE_HEADING("Chaves estrangeiras sem índice iniciado pela coluna"))
+        missing = []
+        with connection.cursor() as cursor:
+            for model in apps.get_models():
+                if not model._meta.managed:
+                    continue
+                table = model._meta.db_table
+                constraints = connection.introspection.get_constraints(cursor, table)
+                leading = {
+                    constraint['columns'][0]
+                    for constraint in constraints.values()
+                    if (constraint['index'] or constraint['unique'] or constraint['primary_key']) and constraint['columns']
+                }
+                for field in model._meta.local_fields:
+                    if field.is_relation and field.column not in leading:
+                        missing.append(f"{table}.{field.column}")
+
+        for column in missing:
+            self.stdout.write(f"  {column}")
+        if not missing:
+            self.stdout.write("  Nenhuma")
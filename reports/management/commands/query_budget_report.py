@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from app.querybudget import QueryRecorder, get_budget, violations
+
+
+# Rotas que não fazem sentido percorrer com GET
+SKIPPED = {'logout'}
+
+
+def _patterns(resolver, prefix=''):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == 'admin':
+                continue
+            yield from _patterns(pattern, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+def _kwargs(pattern):
+    """Argumentos da URL: nenhum, ou `pk` do primeiro objeto do model da view."""
+    converters = set(pattern.pattern.converters)
+    if not converters:
+        return {}
+    if converters != {'pk'}:
+        return None
+
+    model = getattr(getattr(pattern.callback, 'view_class', None), 'model', None)
+    if model is None:
+        return None
+    pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+    return {'pk': pk} if pk is not None else None
+
+
+class Command(BaseCommand):
+    help = "Percorre as views do projeto com GET e compara consultas e tempo de SQL com QUERY_BUDGETS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Usuário usado nas requisições (padrão: primeiro superusuário)'
+        )
+        parser.add_argument(
+            '--fail',
+            action='store_true',
+            help='Termina com erro se alguma view exceder o orçamento'
+        )
+
+    def handle(self, *args, **options):
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if user is None:
+            raise CommandError("Usuário não encontrado")
+
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+
+        rows, skipped = [], []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for pattern in _patterns(get_resolver()):
+                kwargs = _kwargs(pattern) if pattern.name not in SKIPPED else None
+                if kwargs is None:
+                    skipped.append(pattern.name)
+                    continue
+
+                recorder = QueryRecorder()
+                with recorder.record():
+                    response = client.get(reverse(pattern.name, kwargs=kwargs))
+
+                found = violations(recorder, get_budget(pattern.name))
+                rows.append((pattern.name, response.status_code, recorder, get_budget(pattern.name), found))
+
+        self.stdout.write(f"{'VIEW':<32}{'HTTP':>6}{'CONSULTAS':>11}{'LIMITE':>8}{'SQL (ms)':>10}{'LIMITE':>8}")
+        for name, status, recorder, budget, found in rows:
+            line = (
+                f"{name:<32}{status:>6}{recorder.count:>11}{budget.get('queries', '-'):>8}"
+                f"{recorder.time_ms:>10}{budget.get('time_ms', '-'):>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if found else line)
+
+        if skipped:
+            self.stdout.write(f"\nNão percorridas (argumentos na URL): {', '.join(skipped)}")
+
+        exceeded = [name for name, _, _, _, found in rows if found]
+        if exceeded:
+            message = f"{len(exceeded)} view(s) acima do orçamento: {', '.join(exceeded)}"
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(rows)} view(s) dentro do orçamento"))
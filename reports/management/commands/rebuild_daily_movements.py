@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollup import rebuild_daily_movements
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o consolidado diário de entradas e saídas a partir do histórico"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de registros por lote de inserção'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Reconstruindo consolidado diário de movimentações...")
+
+        total = rebuild_daily_movements(batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Consolidado reconstruído: {total} registros diários")
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from item.models import Item
+from reports.snapshots import parse_moment, stock_at
+
+
+class Command(BaseCommand):
+    help = "Mostra o estoque por item em uma data passada (checkpoint mais próximo + movimentações)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'at',
+            help="Data ('AAAA-MM-DD', fim do dia) ou data e hora ('AAAA-MM-DD HH:MM')"
+        )
+        parser.add_argument(
+            '--mpn',
+            help='Restringe a consulta ao item com este MPN'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            moment = parse_moment(options['at'])
+        except ValueError:
+            raise CommandError(f"Data inválida: {options['at']}")
+
+        item_ids = None
+        if options['mpn']:
+            item_ids = list(Item.objects.filter(mpn=options['mpn']).values_list('id', flat=True))
+            if not item_ids:
+                raise CommandError(f"Item não encontrado: {options['mpn']}")
+
+        totals = stock_at(moment, item_ids=item_ids)
+        items = Item.objects.in_bulk(totals.keys())
+
+        for item_id, quantity in sorted(totals.items(), key=lambda entry: items[entry[0]].mpn):
+            self.stdout.write(f"{items[item_id].mpn}\t{quantity}\t{items[item_id].name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(totals)} item(ns) com estoque em {moment:%d/%m/%Y %H:%M}")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reports.snapshots import take_checkpoint
+
+
+class Command(BaseCommand):
+    help = "Grava um checkpoint do estoque atual, usado nas consultas de estoque em datas passadas"
+
+    def handle(self, *args, **options):
+        checkpoint = take_checkpoint()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{checkpoint}: {checkpoint.lines.count()} linhas gravadas")
+        )
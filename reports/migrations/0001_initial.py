@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('item', '0003_alter_item_options'),
+        ('location', '0007_alter_locationsite_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('direction', models.CharField(choices=[('IN', 'Entrada'), ('OUT', 'Saída')], max_length=3, verbose_name='Sentido')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('movements', models.IntegerField(default=0, verbose_name='Movimentações')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_movements', to='item.item')),
+                ('location_site', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_movements', to='location.locationsite')),
+            ],
+            options={
+                'verbose_name': 'Movimentação Diária',
+                'verbose_name_plural': 'Movimentações Diárias',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['direction', 'day'], name='daily_movement_dir_day_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('location_site__isnull', False)), fields=('day', 'direction', 'item', 'location_site'), name='unique_daily_movement_site'), models.UniqueConstraint(condition=models.Q(('location_site__isnull', True)), fields=('day', 'direction', 'item'), name='unique_daily_movement_no_site')],
+            },
+        ),
+    ]
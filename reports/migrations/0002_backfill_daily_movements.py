@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    DailyMovement = apps.get_model('reports', 'DailyMovement')
+    Inflow = apps.get_model('inflow', 'Inflow')
+    Outflow = apps.get_model('outflow', 'Outflow')
+
+    inflows = Inflow.objects.order_by().annotate(day=TruncDate('created_at')).values(
+        'day', 'item_id'
+    ).annotate(total=Sum('quantity'), count=Count('id'))
+
+    outflows = Outflow.objects.order_by().annotate(day=TruncDate('created_at')).values(
+        'day', 'inventory_item__item_id', 'claimant__om_id'
+    ).annotate(total=Sum('quantity'), count=Count('id'))
+
+    rows = [
+        DailyMovement(
+            day=row['day'], direction='IN', item_id=row['item_id'], location_site_id=None,
+            quantity=row['total'], movements=row['count'],
+        )
+        for row in inflows
+    ]
+    rows += [
+        DailyMovement(
+            day=row['day'], direction='OUT', item_id=row['inventory_item__item_id'],
+            location_site_id=row['claimant__om_id'], quantity=row['total'], movements=row['count'],
+        )
+        for row in outflows
+    ]
+    DailyMovement.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear(apps, schema_editor):
+    apps.get_model('reports', 'DailyMovement').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('inflow', '0003_alter_inflow_options'),
+        ('outflow', '0003_alter_outflow_created_by'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
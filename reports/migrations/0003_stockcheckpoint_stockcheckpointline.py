@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('item', '0003_alter_item_options'),
+        ('location', '0007_alter_locationsite_type'),
+        ('reports', '0002_backfill_daily_movements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(unique=True, verbose_name='Registrado em')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Estoque',
+                'verbose_name_plural': 'Checkpoints de Estoque',
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockCheckpointLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='reports.stockcheckpoint')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_checkpoint_lines', to='item.item')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_checkpoint_lines', to='location.location')),
+            ],
+            options={
+                'verbose_name': 'Linha de Checkpoint',
+                'verbose_name_plural': 'Linhas de Checkpoint',
+                'indexes': [models.Index(fields=['checkpoint', 'item'], name='stock_checkpoint_item_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,217 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from item.models import Item
+from location.models import Location, LocationSite
 
-# Create your models here.
+
+class DailyMovement(models.Model):
+    """
+    Consolidado diário de entradas e saídas por item e OM.
+
+    Mantido pelos métodos save()/delete() de Inflow e Outflow (e pelo
+    RollupQuerySet nas alterações em massa) e reconstruído pelo comando
+    `rebuild_daily_movements`.
+    """
+    INFLOW = "IN"
+    OUTFLOW = "OUT"
+
+    DIRECTION_CHOICES = [
+        (INFLOW, "Entrada"),
+        (OUTFLOW, "Saída"),
+    ]
+
+    day = models.DateField("Dia")
+    direction = models.CharField("Sentido", max_length=3, choices=DIRECTION_CHOICES)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='daily_movements')
+    location_site = models.ForeignKey(
+        LocationSite, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_movements'
+    )
+    quantity = models.IntegerField("Quantidade", default=0)
+    movements = models.IntegerField("Movimentações", default=0)
+
+    class Meta:
+        verbose_name = "Movimentação Diária"
+        verbose_name_plural = "Movimentações Diárias"
+        ordering = ['-day']
+        # Entradas não têm OM (location_site NULL) e NULLs não colidem numa
+        # restrição única comum: uma restrição parcial para cada caso
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'direction', 'item', 'location_site'],
+                condition=Q(location_site__isnull=False),
+                name='unique_daily_movement_site'
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'direction', 'item'],
+                condition=Q(location_site__isnull=True),
+                name='unique_daily_movement_no_site'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['direction', 'day'], name='daily_movement_dir_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_direction_display()} - {self.item} ({self.quantity})"
+
+    @classmethod
+    def add(cls, day, direction, item_id, location_site_id, quantity, movements=1):
+        """Soma (ou subtrai, com valores negativos) uma movimentação ao consolidado do dia."""
+        key = {
+            'day': day,
+            'direction': direction,
+            'item_id': item_id,
+            'location_site_id': location_site_id,
+        }
+        increment = {
+            'quantity': F('quantity') + quantity,
+            'movements': F('movements') + movements,
+        }
+        if cls.objects.filter(**key).update(**increment):
+            return
+        try:
+            # Savepoint: outra transação pode criar a mesma linha entre o
+            # UPDATE e o INSERT; a restrição única barra a duplicata e a soma
+            # vai para a linha criada por ela
+            with transaction.atomic():
+                cls.objects.create(quantity=quantity, movements=movements, **key)
+        except IntegrityError:
+            cls.objects.filter(**key).update(**increment)
+
+    @classmethod
+    def apply(cls, movement, sign=1):
+        """Aplica uma Inflow/Outflow ao consolidado. Use sign=-1 para remover."""
+        day, item_id, location_site_id = movement.rollup_key()
+        cls.add(day, movement.ROLLUP_DIRECTION, item_id, location_site_id, sign * movement.quantity, sign)
+
+    @classmethod
+    def apply_many(cls, movements, sign=1):
+        """
+        Aplica várias Inflow/Outflow (ex.: criadas com bulk_create) com uma
+        leitura e gravações em lote, somando primeiro as de mesma chave.
+        """
+        totals = {}
+        for movement in movements:
+            day, item_id, location_site_id = movement.rollup_key()
+            key = (day, movement.ROLLUP_DIRECTION, item_id, location_site_id)
+            quantity, count = totals.get(key, (0, 0))
+            totals[key] = (quantity + sign * movement.quantity, count + sign)
+
+        if not totals:
+            return
+
+        existing = {
+            (row.day, row.direction, row.item_id, row.location_site_id): row
+            for row in cls.objects.filter(
+                day__in={key[0] for key in totals},
+                direction__in={key[1] for key in totals},
+                item_id__in={key[2] for key in totals},
+            )
+        }
+
+        to_update, to_create = [], []
+        for (day, direction, item_id, location_site_id), (quantity, count) in totals.items():
+            row = existing.get((day, direction, item_id, location_site_id))
+            if row is None:
+                to_create.append(cls(
+                    day=day, direction=direction, item_id=item_id, location_site_id=location_site_id,
+                    quantity=quantity, movements=count,
+                ))
+            else:
+                row.quantity = F('quantity') + quantity
+                row.movements = F('movements') + count
+                to_update.append(row)
+
+        cls.objects.bulk_update(to_update, ['quantity', 'movements'])
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create(to_create)
+        except IntegrityError:
+            # Alguma linha foi criada em paralelo: uma a uma, com a mesma
+            # recuperação de add()
+            for row in to_create:
+                cls.add(row.day, row.direction, row.item_id, row.location_site_id, row.quantity, row.movements)
+
+    @classmethod
+    def replace(cls, previous, current):
+        """Troca a contribuição de `previous` pela de `current` (edição de movimentação)."""
+        if previous is not None:
+            cls.apply(previous, sign=-1)
+        cls.apply(current)
+
+
+class RollupQuerySet(models.QuerySet):
+    """
+    QuerySet de Inflow/Outflow que mantém o DailyMovement nas alterações em
+    massa: update() e delete() de queryset não passam por save()/delete() do
+    modelo. O modelo declara ROLLUP_FIELDS (campos que entram na chave ou na
+    soma) e ROLLUP_RELATED (relações lidas por rollup_key()).
+    """
+
+    def _rollup_rows(self):
+        return list(self.select_related(*self.model.ROLLUP_RELATED))
+
+    def update(self, **kwargs):
+        if not set(kwargs) & set(self.model.ROLLUP_FIELDS):
+            return super().update(**kwargs)
+
+        with transaction.atomic():
+            rows = self._rollup_rows()
+            DailyMovement.apply_many(rows, sign=-1)
+            updated = super().update(**kwargs)
+            DailyMovement.apply_many(
+                self.model.objects.filter(pk__in=[row.pk for row in rows]).select_related(*self.model.ROLLUP_RELATED)
+            )
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic():
+            DailyMovement.apply_many(self._rollup_rows(), sign=-1)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class StockCheckpoint(models.Model):
+    """
+    Fotografia do estoque (soma de Inventory.quantity por item e localização)
+    em um instante. Serve de ponto de partida para `reports.snapshots.stock_at`.
+    """
+    taken_at = models.DateTimeField("Registrado em", unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Checkpoint de Estoque"
+        verbose_name_plural = "Checkpoints de Estoque"
+        ordering = ['-taken_at']
+
+    def __str__(self):
+        return f"Checkpoint {timezone.localtime(self.taken_at):%d/%m/%Y %H:%M}"
+
+
+class StockCheckpointLine(models.Model):
+    checkpoint = models.ForeignKey(StockCheckpoint, on_delete=models.CASCADE, related_name='lines')
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='stock_checkpoint_lines')
+    location = models.ForeignKey(
+        Location, on_delete=models.CASCADE, null=True, blank=True, related_name='stock_checkpoint_lines'
+    )
+    quantity = models.IntegerField("Quantidade", default=0)
+
+    class Meta:
+        verbose_name = "Linha de Checkpoint"
+        verbose_name_plural = "Linhas de Checkpoint"
+        indexes = [
+            models.Index(fields=['checkpoint', 'item'], name='stock_checkpoint_item_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item} - {self.location} ({self.quantity})"
+
+
+def local_day(value):
+    """Data local (TIME_ZONE) de um datetime armazenado em UTC."""
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
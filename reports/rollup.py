@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, When
+from django.db.models.functions import TruncDate
+from inflow.models import Inflow
+from outflow.models import Outflow
+from .models import DailyMovement
+
+
+def _inflow_rows():
+    return Inflow.objects.order_by().annotate(
+        day=TruncDate('created_at'),
+    ).values('day', 'item_id').annotate(
+        total=Sum('quantity'),
+        count=Count('id'),
+    )
+
+
+def _outflow_rows():
+    # Ajustes de estoque ficam sem OM, como em Outflow.rollup_key
+    return Outflow.objects.order_by().annotate(
+        day=TruncDate('created_at'),
+        site_id=Case(When(adjustment=True, then=None), default=F('claimant__om_id')),
+    ).values('day', 'inventory_item__item_id', 'site_id').annotate(
+        total=Sum('quantity'),
+        count=Count('id'),
+    )
+
+
+def rebuild_daily_movements(batch_size=1000):
+    """
+    Reconstrói todo o consolidado diário a partir de Inflow e Outflow,
+    agrupando no banco por dia, item e OM. Retorna o número de linhas criadas.
+    """
+    rows = [
+        DailyMovement(
+            day=row['day'],
+            direction=DailyMovement.INFLOW,
+            item_id=row['item_id'],
+            location_site_id=None,
+            quantity=row['total'],
+            movements=row['count'],
+        )
+        for row in _inflow_rows().iterator()
+    ]
+    rows += [
+        DailyMovement(
+            day=row['day'],
+            direction=DailyMovement.OUTFLOW,
+            item_id=row['inventory_item__item_id'],
+            location_site_id=row['site_id'],
+            quantity=row['total'],
+            movements=row['count'],
+        )
+        for row in _outflow_rows().iterator()
+    ]
+
+    with transaction.atomic():
+        DailyMovement.objects.all().delete()
+        DailyMovement.objects.bulk_create(rows, batch_size=batch_size)
+
+    return len(rows)
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from inflow.models import Inflow
+from inventory.models import Inventory
+from item.models import Item, ItemEquivalent
+from location.models import Location, LocationSite
+from order.models import Order
+from outflow.models import Outflow
+from . import cache
+
+
+def invalidate_dashboard(sender, **kwargs):
+    # Só invalida após o commit, para que nenhuma requisição concorrente
+    # grave em cache dados anteriores à transação
+    label = sender._meta.label_lower
+    transaction.on_commit(lambda: cache.bump_generation(label))
+
+
+# Item, ItemEquivalent e Location: resultados de buscas salvas (inventory/saved_searches.py)
+for model in (Inventory, Order, Inflow, Outflow, Item, ItemEquivalent, Location, LocationSite):
+    post_save.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard_save_{model._meta.label_lower}')
+    post_delete.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard_delete_{model._meta.label_lower}')
@@ -0,0 +1,126 @@
+from datetime import datetime, time
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from inflow.models import Inflow
+from inventory.models import Inventory
+from outflow.models import Outflow
+from .models import StockCheckpoint, StockCheckpointLine
+
+
+def _current_stock(item_ids=None):
+    queryset = Inventory.objects.order_by()
+    if item_ids is not None:
+        queryset = queryset.filter(item_id__in=item_ids)
+
+    return queryset.values('item_id', 'location_id').annotate(total=Sum('quantity'))
+
+
+def take_checkpoint(taken_at=None, batch_size=1000):
+    """
+    Grava um checkpoint com o estoque atual agrupado por item e localização.
+    Retorna o checkpoint criado.
+    """
+    taken_at = taken_at or timezone.now()
+
+    with transaction.atomic():
+        checkpoint = StockCheckpoint.objects.create(taken_at=taken_at)
+        StockCheckpointLine.objects.bulk_create(
+            [
+                StockCheckpointLine(
+                    checkpoint=checkpoint,
+                    item_id=row['item_id'],
+                    location_id=row['location_id'],
+                    quantity=row['total'] or 0,
+                )
+                for row in _current_stock().iterator()
+            ],
+            batch_size=batch_size,
+        )
+
+    return checkpoint
+
+
+def _nearest_base(when, now):
+    """
+    Checkpoint mais próximo de `when`, antes ou depois. O estoque atual
+    (Inventory) conta como um checkpoint em `now`. Retorna (checkpoint, instante);
+    checkpoint é None quando a base é o estoque atual.
+    """
+    before = StockCheckpoint.objects.filter(taken_at__lte=when).order_by('-taken_at').first()
+    after = StockCheckpoint.objects.filter(taken_at__gt=when, taken_at__lte=now).order_by('taken_at').first()
+
+    candidates = [(now, None)]
+    if before:
+        candidates.append((before.taken_at, before))
+    if after:
+        candidates.append((after.taken_at, after))
+
+    taken_at, checkpoint = min(candidates, key=lambda candidate: abs(candidate[0] - when))
+    return checkpoint, taken_at
+
+
+def stock_at(when, item_ids=None, now=None):
+    """
+    Reconstrói o estoque de cada item em `when` a partir do checkpoint mais
+    próximo, reaplicando apenas as entradas e saídas entre o checkpoint e
+    `when` (para frente ou para trás). O custo depende do número de
+    movimentações nesse intervalo, não do histórico completo.
+
+    Retorna {item_id: quantidade}. O resultado é por item e não por
+    localização: entradas não registram localização e saídas só apontam para
+    o registro de estoque, cuja localização atual pode não ser a da época
+    (transferências não geram movimentações). Ajustes feitos direto no
+    inventário (sem Inflow/Outflow) só são refletidos a partir do primeiro
+    checkpoint posterior a eles.
+    """
+    now = now or timezone.now()
+    when = min(when, now)
+    checkpoint, base_at = _nearest_base(when, now)
+
+    if checkpoint is None:
+        rows = _current_stock(item_ids).values_list('item_id', 'total')
+    else:
+        rows = checkpoint.lines.all()
+        if item_ids is not None:
+            rows = rows.filter(item_id__in=item_ids)
+        rows = rows.values_list('item_id', 'quantity')
+
+    stock = defaultdict(int)
+    for item_id, quantity in rows:
+        stock[item_id] += quantity or 0
+
+    # Avançando a partir de um checkpoint antigo soma as entradas; voltando
+    # a partir de um checkpoint mais recente, desfaz
+    if base_at <= when:
+        sign, window = 1, {'created_at__gt': base_at, 'created_at__lte': when}
+    else:
+        sign, window = -1, {'created_at__gt': when, 'created_at__lte': base_at}
+
+    inflows = Inflow.objects.filter(**window).order_by()
+    outflows = Outflow.objects.filter(**window).order_by()
+    if item_ids is not None:
+        inflows = inflows.filter(item_id__in=item_ids)
+        outflows = outflows.filter(inventory_item__item_id__in=item_ids)
+
+    for row in inflows.values('item_id').annotate(total=Sum('quantity')):
+        stock[row['item_id']] += sign * row['total']
+
+    for row in outflows.values('inventory_item__item_id').annotate(total=Sum('quantity')):
+        stock[row['inventory_item__item_id']] -= sign * row['total']
+
+    return {item_id: quantity for item_id, quantity in stock.items() if quantity}
+
+
+def parse_moment(value):
+    """
+    Converte 'AAAA-MM-DD' (fim do dia) ou 'AAAA-MM-DDTHH:MM' / 'AAAA-MM-DD HH:MM'
+    em datetime com fuso. Levanta ValueError para formatos inválidos.
+    """
+    value = value.strip().replace(' ', 'T')
+    if 'T' in value:
+        moment = datetime.strptime(value, '%Y-%m-%dT%H:%M')
+    else:
+        moment = datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), time.max)
+    return timezone.make_aware(moment)
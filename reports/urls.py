@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+
+urlpatterns = [
+    path('reports/stock-at/', views.StockAtView.as_view(), name='stock_at'),
+    path('reports/monthly/', views.MonthlyComparisonView.as_view(), name='monthly_comparison'),
+]
@@ -1,3 +1,107 @@
+import csv
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.db.models import Q
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.views.generic import ListView, View
+from item.models import Item
+from .comparison import DEFAULT_MONTHS, DEFAULT_TOP, MAX_MONTHS, MAX_TOP, monthly_comparison
+from .snapshots import parse_moment, stock_at
 
-# Create your views here.
+
+class StockAtView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+    """Estoque por item em uma data passada."""
+    template_name = 'stock_at.html'
+    context_object_name = 'rows'
+    paginate_by = 10
+    permission_required = 'inventory.view_inventory'
+
+    def get_moment(self):
+        value = self.request.GET.get('at', '').strip()
+        if not value:
+            return None
+        try:
+            return parse_moment(value)
+        except ValueError:
+            messages.error(self.request, 'Data inválida.')
+            return None
+
+    def get_queryset(self):
+        self.moment = self.get_moment()
+        if self.moment is None:
+            return []
+
+        item_ids = None
+        search = self.request.GET.get('search', '').strip()
+        if search:
+            item_ids = list(Item.objects.filter(
+                Q(mpn__icontains=search) | Q(pn__icontains=search) | Q(name__icontains=search)
+            ).values_list('id', flat=True))
+
+        stock = stock_at(self.moment, item_ids=item_ids)
+        items = Item.objects.in_bulk(stock.keys())
+
+        rows = [{'item': items[item_id], 'total': quantity} for item_id, quantity in stock.items()]
+        return sorted(rows, key=lambda row: row['item'].mpn)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['moment'] = self.moment
+        context['now'] = timezone.localtime()
+        return context
+
+
+def _bounded_int(value, default, maximum):
+    try:
+        return min(max(int(value), 1), maximum)
+    except (TypeError, ValueError):
+        return default
+
+
+class MonthlyComparisonView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Comparativo mensal de entradas e saídas, em HTML ou CSV (?format=csv)."""
+    permission_required = ('inflow.view_inflow', 'outflow.view_outflow')
+
+    def get(self, request):
+        months = _bounded_int(request.GET.get('months'), DEFAULT_MONTHS, MAX_MONTHS)
+        top = _bounded_int(request.GET.get('top'), DEFAULT_TOP, MAX_TOP)
+        report = monthly_comparison(months, top)
+
+        if request.GET.get('format') == 'csv':
+            return self.render_csv(report)
+
+        return render(request, 'monthly_comparison.html', {
+            'report': report,
+            'months': months,
+            'top': top,
+            'month_choices': [3, 6, 12, 24, 36],
+        })
+
+    def render_csv(self, report):
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = (
+            f'attachment; filename="comparativo_mensal_{report["start"]}_{report["end"]}.csv"'
+        )
+        # BOM e ponto e vírgula para abrir direto no Excel em pt-BR
+        response.write('\ufeff')
+        writer = csv.writer(response, delimiter=';')
+
+        writer.writerow(['Mês', 'Entradas', 'Saídas', 'Saldo', 'Variação entradas (%)', 'Variação saídas (%)'])
+        for month in report['months']:
+            writer.writerow([
+                month['label'],
+                month['inflows'],
+                month['outflows'],
+                month['net'],
+                '' if month['inflows_change'] is None else month['inflows_change'],
+                '' if month['outflows_change'] is None else month['outflows_change'],
+            ])
+
+        writer.writerow([])
+        writer.writerow(['MPN', 'Nome', 'Entradas', 'Saídas', 'Saldo'])
+        for row in report['top_movers']:
+            writer.writerow([row['mpn'], row['name'], row['inflows'], row['outflows'], row['net']])
+
+        return response
@@ -33,8 +33,28 @@
     
     // Initialize Select2
     $(document).ready(function() {
-        $('.select2').select2({
+        $('.select2').not('[data-autocomplete-url]').select2({
             theme: 'bootstrap-5',
             placeholder: 'Selecione...'
         });
+
+        // Select2 com busca no servidor (app/autocomplete.py): as opções são
+        // carregadas conforme o usuário digita
+        $('select[data-autocomplete-url]').each(function() {
+            const $select = $(this);
+            $select.select2({
+                theme: 'bootstrap-5',
+                placeholder: 'Digite para buscar...',
+                allowClear: !this.required,
+                minimumInputLength: parseInt($select.data('minimum-input-length'), 10) || 0,
+                ajax: {
+                    url: $select.data('autocomplete-url'),
+                    dataType: 'json',
+                    delay: 250,
+                    data: function(params) {
+                        return {q: params.term || '', page: params.page || 1};
+                    }
+                }
+            });
+        });
     });
\ No newline at end of file